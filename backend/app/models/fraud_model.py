@@ -3,54 +3,59 @@ Fraud model module
 Defines fraud detection data structures
 """
 
+import orjson
+from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional, Dict, Any
+from app.models.log_model import parse_timestamp
 
 
+@dataclass(slots=True, eq=False)
 class FraudDetection:
-    """Fraud detection model"""
+    """
+    Fraud detection model
     
-    def __init__(
-        self,
-        transaction_id: str,
-        user_id: str,
-        fraud_score: float,
-        is_fraud: bool,
-        indicators: List[str],
-        timestamp: Optional[datetime] = None,
-        transaction_data: Optional[Dict[str, Any]] = None
-    ):
-        """
-        Initialize fraud detection
-        
-        Args:
-            transaction_id: Transaction ID
-            user_id: User ID
-            fraud_score: Fraud score (0-100)
-            is_fraud: Whether fraud was detected
-            indicators: List of fraud indicators
-            timestamp: Detection timestamp
-            transaction_data: Associated transaction data
-        """
-        self.transaction_id = transaction_id
-        self.user_id = user_id
-        self.fraud_score = fraud_score
-        self.is_fraud = is_fraud
-        self.indicators = indicators
-        self.timestamp = timestamp or datetime.utcnow()
-        self.transaction_data = transaction_data or {}
+    Attributes:
+        transaction_id: Transaction ID
+        user_id: User ID
+        fraud_score: Fraud score (0-100)
+        is_fraud: Whether fraud was detected
+        indicators: List of fraud indicators
+        timestamp: Detection timestamp (defaults to now)
+        transaction_data: Associated transaction data
+    """
+    transaction_id: str
+    user_id: str
+    fraud_score: float
+    is_fraud: bool
+    indicators: List[str]
+    timestamp: Optional[datetime] = None
+    transaction_data: Optional[Dict[str, Any]] = None
+    
+    # to_dict() copies this pre-sized key layout and fills it in
+    _DICT_TEMPLATE = dict.fromkeys((
+        'transaction_id', 'user_id', 'fraud_score', 'is_fraud', 'indicators', 'timestamp', 'transaction_data'
+    ))
+    
+    def __post_init__(self):
+        self.timestamp = self.timestamp or datetime.utcnow()
+        self.transaction_data = self.transaction_data or {}
     
     def to_dict(self):
         """Convert fraud detection to dictionary"""
-        return {
-            'transaction_id': self.transaction_id,
-            'user_id': self.user_id,
-            'fraud_score': self.fraud_score,
-            'is_fraud': self.is_fraud,
-            'indicators': self.indicators,
-            'timestamp': self.timestamp.isoformat(),
-            'transaction_data': self.transaction_data
-        }
+        data = self._DICT_TEMPLATE.copy()
+        data['transaction_id'] = self.transaction_id
+        data['user_id'] = self.user_id
+        data['fraud_score'] = self.fraud_score
+        data['is_fraud'] = self.is_fraud
+        data['indicators'] = self.indicators
+        data['timestamp'] = self.timestamp
+        data['transaction_data'] = self.transaction_data
+        return data
+    
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes (orjson encodes the datetime natively, in ISO 8601)"""
+        return orjson.dumps(self.to_dict())
     
     @classmethod
     def from_dict(cls, data):
@@ -61,7 +66,7 @@ class FraudDetection:
             fraud_score=data['fraud_score'],
             is_fraud=data['is_fraud'],
             indicators=data.get('indicators', []),
-            timestamp=datetime.fromisoformat(data['timestamp']) if data.get('timestamp') else None,
+            timestamp=parse_timestamp(data.get('timestamp')),
             transaction_data=data.get('transaction_data', {})
         )
     
@@ -3,12 +3,36 @@ Log model module
 Defines log data structures
 """
 
+import orjson
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+def parse_timestamp(value):
+    """Accept a datetime (from to_dict) or an ISO 8601 string (from JSON)"""
+    if not value or isinstance(value, datetime):
+        return value or None
+    return datetime.fromisoformat(value)
 
+
+# Models are slotted dataclasses: no per-instance __dict__.
+# They keep hand-written __init__ methods (init=False); subclasses call
+# LogEntry explicitly, since zero-argument super() does not work in
+# slotted dataclasses before Python 3.14.
+
+
+@dataclass(slots=True, init=False, eq=False)
 class LogEntry:
     """Base log entry model"""
+    message: str
+    log_type: str
+    _timestamp: Optional[datetime] = field(repr=False)
+    level: str
+    source: Optional[str]
+    metadata: Dict[str, Any]
+    
+    # to_dict() copies the pre-sized key layout of the class and fills it in
+    _DICT_TEMPLATE = dict.fromkeys(('@timestamp', 'message', 'log_type', 'level', 'source', 'metadata'))
     
     def __init__(
         self,
@@ -25,28 +49,49 @@ class LogEntry:
         Args:
             message: Log message
             log_type: Type of log (transaction, error, user_behavior, etc.)
-            timestamp: Log timestamp
+            timestamp: Log timestamp (defaults to the first time it is read)
             level: Log level (INFO, WARNING, ERROR, etc.)
             source: Source of the log
             metadata: Additional metadata
         """
         self.message = message
         self.log_type = log_type
-        self.timestamp = timestamp or datetime.utcnow()
+        self._timestamp = timestamp
         self.level = level
         self.source = source
         self.metadata = metadata or {}
     
+    @property
+    def timestamp(self) -> datetime:
+        """
+        Log timestamp, taken on first access when none was given
+        
+        Entries are serialized right after being built, so deferring
+        utcnow() keeps it off the construction path.
+        """
+        if self._timestamp is None:
+            self._timestamp = datetime.utcnow()
+        return self._timestamp
+    
+    @timestamp.setter
+    def timestamp(self, value: Optional[datetime]):
+        self._timestamp = value
+    
     def to_dict(self):
         """Convert log entry to dictionary"""
-        return {
-            '@timestamp': self.timestamp.isoformat(),
-            'message': self.message,
-            'log_type': self.log_type,
-            'level': self.level,
-            'source': self.source,
-            'metadata': self.metadata
-        }
+        data = self._DICT_TEMPLATE.copy()
+        # Left as datetime: the JSON encoder formats it without a Python-level isoformat()
+        data['@timestamp'] = self.timestamp
+        data['message'] = self.message
+        data['log_type'] = self.log_type
+        data['level'] = self.level
+        data['source'] = self.source
+        data['metadata'] = self.metadata
+        return data
+    
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes (orjson encodes the datetime natively, in ISO 8601)"""
+        return orjson.dumps(self.to_dict())
     
     @classmethod
     def from_dict(cls, data):
@@ -54,15 +99,26 @@ class LogEntry:
         return cls(
             message=data.get('message', ''),
             log_type=data.get('log_type', 'unknown'),
-            timestamp=datetime.fromisoformat(data.get('@timestamp')) if data.get('@timestamp') else None,
+            timestamp=parse_timestamp(data.get('@timestamp')),
             level=data.get('level', 'INFO'),
             source=data.get('source'),
             metadata=data.get('metadata', {})
         )
 
 
+@dataclass(slots=True, init=False, eq=False)
 class TransactionLog(LogEntry):
     """Transaction log model"""
+    transaction_id: str
+    user_id: str
+    amount: float
+    currency: str
+    payment_method: str
+    status: str
+    
+    _DICT_TEMPLATE = dict.fromkeys((
+        *LogEntry._DICT_TEMPLATE, 'transaction_id', 'user_id', 'amount', 'currency', 'payment_method', 'status'
+    ))
     
     def __init__(
         self,
@@ -85,7 +141,8 @@ class TransactionLog(LogEntry):
             payment_method: Payment method
             status: Transaction status
         """
-        super().__init__(
+        LogEntry.__init__(
+            self,
             message=f"Transaction {transaction_id} - {status}",
             log_type="transaction",
             **kwargs
@@ -99,20 +156,27 @@ class TransactionLog(LogEntry):
     
     def to_dict(self):
         """Convert transaction log to dictionary"""
-        data = super().to_dict()
-        data.update({
-            'transaction_id': self.transaction_id,
-            'user_id': self.user_id,
-            'amount': self.amount,
-            'currency': self.currency,
-            'payment_method': self.payment_method,
-            'status': self.status
-        })
+        data = LogEntry.to_dict(self)
+        data['transaction_id'] = self.transaction_id
+        data['user_id'] = self.user_id
+        data['amount'] = self.amount
+        data['currency'] = self.currency
+        data['payment_method'] = self.payment_method
+        data['status'] = self.status
         return data
 
 
+@dataclass(slots=True, init=False, eq=False)
 class ErrorLog(LogEntry):
     """Error log model"""
+    error_code: int
+    error_type: str
+    error_message: str
+    stack_trace: Optional[str]
+    
+    _DICT_TEMPLATE = dict.fromkeys((
+        *LogEntry._DICT_TEMPLATE, 'error_code', 'error_type', 'error_message', 'stack_trace'
+    ))
     
     def __init__(
         self,
@@ -131,7 +195,8 @@ class ErrorLog(LogEntry):
             error_message: Error message
             stack_trace: Stack trace (if available)
         """
-        super().__init__(
+        LogEntry.__init__(
+            self,
             message=error_message,
             log_type="error",
             level="ERROR",
@@ -144,18 +209,26 @@ class ErrorLog(LogEntry):
     
     def to_dict(self):
         """Convert error log to dictionary"""
-        data = super().to_dict()
-        data.update({
-            'error_code': self.error_code,
-            'error_type': self.error_type,
-            'error_message': self.error_message,
-            'stack_trace': self.stack_trace
-        })
+        data = LogEntry.to_dict(self)
+        data['error_code'] = self.error_code
+        data['error_type'] = self.error_type
+        data['error_message'] = self.error_message
+        data['stack_trace'] = self.stack_trace
         return data
 
 
+@dataclass(slots=True, init=False, eq=False)
 class PerformanceLog(LogEntry):
     """Performance log model"""
+    endpoint: str
+    response_time: float
+    method: str
+    status_code: int
+    db_query_time: Optional[float]
+    
+    _DICT_TEMPLATE = dict.fromkeys((
+        *LogEntry._DICT_TEMPLATE, 'endpoint', 'response_time', 'method', 'status_code', 'db_query_time'
+    ))
     
     def __init__(
         self,
@@ -176,7 +249,8 @@ class PerformanceLog(LogEntry):
             status_code: HTTP status code
             db_query_time: Database query time in milliseconds
         """
-        super().__init__(
+        LogEntry.__init__(
+            self,
             message=f"{method} {endpoint} - {response_time}ms",
             log_type="performance",
             **kwargs
@@ -189,12 +263,10 @@ class PerformanceLog(LogEntry):
     
     def to_dict(self):
         """Convert performance log to dictionary"""
-        data = super().to_dict()
-        data.update({
-            'endpoint': self.endpoint,
-            'response_time': self.response_time,
-            'method': self.method,
-            'status_code': self.status_code,
-            'db_query_time': self.db_query_time
-        })
+        data = LogEntry.to_dict(self)
+        data['endpoint'] = self.endpoint
+        data['response_time'] = self.response_time
+        data['method'] = self.method
+        data['status_code'] = self.status_code
+        data['db_query_time'] = self.db_query_time
         return data
@@ -3,58 +3,62 @@ Transaction model module
 Defines transaction data structures
 """
 
+import orjson
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, Dict, Any
+from app.models.log_model import parse_timestamp
 
 
+@dataclass(slots=True, eq=False)
 class Transaction:
-    """Transaction model"""
+    """
+    Transaction model
     
-    def __init__(
-        self,
-        transaction_id: str,
-        user_id: str,
-        amount: float,
-        currency: str = "USD",
-        payment_method: str = "credit_card",
-        status: str = "pending",
-        timestamp: Optional[datetime] = None,
-        metadata: Optional[Dict[str, Any]] = None
-    ):
-        """
-        Initialize transaction
-        
-        Args:
-            transaction_id: Unique transaction ID
-            user_id: User ID
-            amount: Transaction amount
-            currency: Currency code
-            payment_method: Payment method
-            status: Transaction status
-            timestamp: Transaction timestamp
-            metadata: Additional metadata
-        """
-        self.transaction_id = transaction_id
-        self.user_id = user_id
-        self.amount = amount
-        self.currency = currency
-        self.payment_method = payment_method
-        self.status = status
-        self.timestamp = timestamp or datetime.utcnow()
-        self.metadata = metadata or {}
+    Attributes:
+        transaction_id: Unique transaction ID
+        user_id: User ID
+        amount: Transaction amount
+        currency: Currency code
+        payment_method: Payment method
+        status: Transaction status
+        timestamp: Transaction timestamp (defaults to now)
+        metadata: Additional metadata
+    """
+    transaction_id: str
+    user_id: str
+    amount: float
+    currency: str = "USD"
+    payment_method: str = "credit_card"
+    status: str = "pending"
+    timestamp: Optional[datetime] = None
+    metadata: Optional[Dict[str, Any]] = None
+    
+    # to_dict() copies this pre-sized key layout and fills it in
+    _DICT_TEMPLATE = dict.fromkeys((
+        'transaction_id', 'user_id', 'amount', 'currency', 'payment_method', 'status', 'timestamp', 'metadata'
+    ))
+    
+    def __post_init__(self):
+        self.timestamp = self.timestamp or datetime.utcnow()
+        self.metadata = self.metadata or {}
     
     def to_dict(self):
         """Convert transaction to dictionary"""
-        return {
-            'transaction_id': self.transaction_id,
-            'user_id': self.user_id,
-            'amount': self.amount,
-            'currency': self.currency,
-            'payment_method': self.payment_method,
-            'status': self.status,
-            'timestamp': self.timestamp.isoformat(),
-            'metadata': self.metadata
-        }
+        data = self._DICT_TEMPLATE.copy()
+        data['transaction_id'] = self.transaction_id
+        data['user_id'] = self.user_id
+        data['amount'] = self.amount
+        data['currency'] = self.currency
+        data['payment_method'] = self.payment_method
+        data['status'] = self.status
+        data['timestamp'] = self.timestamp
+        data['metadata'] = self.metadata
+        return data
+    
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes (orjson encodes the datetime natively, in ISO 8601)"""
+        return orjson.dumps(self.to_dict())
     
     @classmethod
     def from_dict(cls, data):
@@ -66,7 +70,7 @@ class Transaction:
             currency=data.get('currency', 'USD'),
             payment_method=data.get('payment_method', 'credit_card'),
             status=data.get('status', 'pending'),
-            timestamp=datetime.fromisoformat(data['timestamp']) if data.get('timestamp') else None,
+            timestamp=parse_timestamp(data.get('timestamp')),
             metadata=data.get('metadata', {})
         )
     
@@ -415,7 +415,13 @@ def get_recent_uploads():
             .limit(limit))
         
         # Convert datetime to string for JSON serialization
+        redis_service = current_app.redis_service
         for upload in uploads:
+            # Jobs being ingested are only tracked in Redis until they finish
+            if (redis_service and upload.get('status') == 'pending'
+                    and redis_service.exists(f"ingest:inflight:{upload.get('job_id')}")):
+                upload['status'] = 'processing'
+            
             if 'uploaded_at' in upload:
                 upload['uploaded_at'] = upload['uploaded_at'].isoformat() if hasattr(upload['uploaded_at'], 'isoformat') else str(upload['uploaded_at'])
         
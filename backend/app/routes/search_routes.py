@@ -3,8 +3,10 @@ Search routes module
 Provides search functionality across logs
 """
 
+import json
 import logging
 from flask import Blueprint, request, jsonify, current_app
+from werkzeug.datastructures import MultiDict
 from app.services.search_service import SearchService
 from app.utils.jwt_utils import token_required, role_hierarchy_required
 
@@ -12,6 +14,108 @@ logger = logging.getLogger(__name__)
 
 bp = Blueprint('search', __name__, url_prefix='/api/search')
 
+# Maximum number of searches accepted by one _msearch request
+MAX_MSEARCH_SIZE = 50
+
+# JSON types accepted as _msearch parameter values
+SCALAR_TYPES = (str, int, float, bool)
+
+
+def parse_search_after(value):
+    """Decode a search_after cursor sent as a JSON list (invalid cursors are dropped)"""
+    try:
+        cursor = json.loads(value) if isinstance(value, str) else value
+    except ValueError:
+        return None
+    return cursor if isinstance(cursor, list) else None
+
+
+def is_valid_msearch_entry(param_set):
+    """
+    Check that one _msearch entry only holds scalar parameter values
+    
+    search_after is the only parameter allowed to be a list (the cursor).
+    
+    Args:
+        param_set: One element of the _msearch request body
+    
+    Returns:
+        bool: True if the entry can be turned into search parameters
+    """
+    if not isinstance(param_set, dict):
+        return False
+    
+    for key, value in param_set.items():
+        values = value if key == 'search_after' and isinstance(value, list) else [value]
+        if not all(v is None or isinstance(v, SCALAR_TYPES) for v in values):
+            return False
+    
+    return True
+
+
+def parse_msearch_entry(param_set):
+    """
+    Extract search parameters from one _msearch entry
+    
+    Args:
+        param_set: JSON object of GET /api/search parameters, checked by
+            is_valid_msearch_entry
+    
+    Returns:
+        dict: Keyword arguments for SearchService.search
+    """
+    # Scalars become strings, as they would in a query string. The cursor is
+    # kept as one list value: MultiDict would read a list as several values
+    return parse_search_params(MultiDict([
+        (key, value if isinstance(value, list) else str(value))
+        for key, value in param_set.items()
+        if value is not None
+    ]))
+
+
+def parse_search_params(args):
+    """
+    Extract search parameters from query-string style arguments
+    
+    Args:
+        args: MultiDict of parameters (request.args, or one _msearch entry)
+    
+    Returns:
+        dict: Keyword arguments for SearchService.search
+    """
+    return {
+        'query': args.get('q', ''),
+        'log_type': args.get('log_type'),
+        'level': args.get('level'),
+        'service': args.get('service'),
+        'start_date': args.get('date_from') or args.get('from'),  # Support both
+        'end_date': args.get('date_to') or args.get('to'),  # Support both
+        'user_id': args.get('user_id'),
+        # Amount filters (with validation)
+        'min_amount': args.get('min_amount', type=float),
+        'max_amount': args.get('max_amount', type=float),
+        # Pagination
+        'page': args.get('page', 1, type=int),
+        'size': args.get('size', 20, type=int),
+        # Sorting
+        'sort_field': args.get('sort_field', '@timestamp'),
+        'sort_order': args.get('sort_order', 'desc'),
+        # Cursor pagination: 'sort' values of the previous page's last hit,
+        # read from the point in time opened with the first page
+        'search_after': parse_search_after(args.get('search_after')),
+        'pit': args.get('pit', 'false').lower() in ('1', 'true'),
+        'pit_id': args.get('pit_id')
+    }
+
+
+def create_search_service():
+    """Create a search service bound to the application's backends"""
+    return SearchService(
+        current_app.es_service,
+        current_app.redis_service,
+        current_app.mongo_service if hasattr(current_app, 'mongo_service') else None
+    )
+
 
 @bp.route('/', methods=['GET'])
 @token_required
@@ -34,6 +138,11 @@ def search_logs():
         - size: Number of results per page (default: 20, max: 1000)
         - sort_field: Field to sort by (default: @timestamp)
         - sort_order: Sort order - asc or desc (default: desc)
+        - pit: true to open a point in time for cursor pagination; the response
+          then carries a pit_id
+        - pit_id: Point in time returned with the previous page
+        - search_after: JSON list of the 'sort' values of the previous page's
+          last result; fetches the next page without a from offset (requires pit_id)
     
     Returns:
         JSON response with search results and pagination metadata
@@ -43,59 +152,29 @@ def search_logs():
     """
     try:
         # Extract query parameters with defaults
-        query = request.args.get('q', '')
-        log_type = request.args.get('log_type')
-        level = request.args.get('level')
-        service = request.args.get('service')
-        date_from = request.args.get('date_from') or request.args.get('from')  # Support both
-        date_to = request.args.get('date_to') or request.args.get('to')  # Support both
-        user_id = request.args.get('user_id')
-        
-        # Amount filters (with validation)
-        min_amount = request.args.get('min_amount', type=float)
-        max_amount = request.args.get('max_amount', type=float)
-        
-        # Pagination
-        page = request.args.get('page', 1, type=int)
-        size = request.args.get('size', 20, type=int)
-        
-        # Sorting
-        sort_field = request.args.get('sort_field', '@timestamp')
-        sort_order = request.args.get('sort_order', 'desc')
+        params = parse_search_params(request.args)
         
         # Create search service
-        search_service = SearchService(
-            current_app.es_service,
-            current_app.redis_service,
-            current_app.mongo_service if hasattr(current_app, 'mongo_service') else None
-        )
+        search_service = create_search_service()
         
         # Get user IP for history tracking
         user_ip = request.remote_addr
         
         # Execute search
-        results = search_service.search(
-            query=query,
-            log_type=log_type,
-            level=level,
-            service=service,
-            start_date=date_from,
-            end_date=date_to,
-            user_id=user_id,
-            min_amount=min_amount,
-            max_amount=max_amount,
-            page=page,
-            size=size,
-            sort_field=sort_field,
-            sort_order=sort_order,
-            user_ip=user_ip
-        )
+        results = search_service.search(user_ip=user_ip, **params)
         
         return jsonify({
             'success': True,
             'data': results
         }), 200
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid search parameters',
+            'message': str(e)
+        }), 400
+        
     except Exception as e:
         logger.error(f"Error searching logs: {str(e)}")
         return jsonify({
@@ -105,6 +184,64 @@ def search_logs():
         }), 500
 
 
+@bp.route('/_msearch', methods=['POST'])
+@token_required
+@role_hierarchy_required('viewer')
+def multi_search_logs():
+    """
+    Run several searches in one request - Requires viewer role or higher
+    
+    Request Body:
+        JSON list of objects, each holding the query parameters of GET /api/search
+        (at most MAX_MSEARCH_SIZE entries)
+    
+    Returns:
+        JSON response with one {status, success, data|error} entry per search, in order
+        
+    Example:
+        POST /api/search/_msearch
+        [{"q": "timeout", "level": "ERROR"}, {"service": "payment", "size": 10}]
+    """
+    param_sets = request.get_json(silent=True)
+    if not isinstance(param_sets, list) or not all(is_valid_msearch_entry(p) for p in param_sets):
+        return jsonify({
+            'success': False,
+            'error': 'Request body must be a JSON list of search parameter objects with scalar values'
+        }), 400
+    if len(param_sets) > MAX_MSEARCH_SIZE:
+        return jsonify({
+            'success': False,
+            'error': f'At most {MAX_MSEARCH_SIZE} searches per request'
+        }), 400
+    
+    try:
+        search_service = create_search_service()
+        results = search_service.multi_search(
+            [parse_msearch_entry(param_set) for param_set in param_sets],
+            user_ip=request.remote_addr
+        )
+        
+        responses = [
+            {'status': 500, 'success': False, 'error': result['error']}
+            if 'error' in result else
+            {'status': 200, 'success': True, 'data': result}
+            for result in results
+        ]
+        
+        return jsonify({
+            'success': True,
+            'responses': responses
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error running multi-search: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to search logs',
+            'message': str(e)
+        }), 500
+
+
 @bp.route('/autocomplete', methods=['GET'])
 @token_required
 @role_hierarchy_required('viewer')
@@ -121,11 +258,7 @@ def autocomplete():
     try:
         query = request.args.get('q', '')
         
-        search_service = SearchService(
-            current_app.es_service,
-            current_app.redis_service,
-            current_app.mongo_service if hasattr(current_app, 'mongo_service') else None
-        )
+        search_service = create_search_service()
         
         suggestions = search_service.get_autocomplete_suggestions(query)
         
@@ -3,6 +3,7 @@ Authentication service
 Handles user authentication, password hashing, and user management
 """
 
+import os
 import bcrypt
 import logging
 from datetime import datetime
@@ -10,16 +11,24 @@ from app.models.user_model import User, UserRepository
 
 logger = logging.getLogger(__name__)
 
+# bcrypt cost factor (each increment doubles hashing time)
+DEFAULT_BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+
 
 class AuthService:
     """Service for authentication operations"""
     
-    def __init__(self):
-        """Initialize AuthService"""
+    def __init__(self, bcrypt_rounds=None):
+        """
+        Initialize AuthService
+        
+        Args:
+            bcrypt_rounds: bcrypt cost factor (default: BCRYPT_ROUNDS env var or 12)
+        """
         self.user_repo = UserRepository()
+        self.bcrypt_rounds = bcrypt_rounds or DEFAULT_BCRYPT_ROUNDS
     
-    @staticmethod
-    def hash_password(password):
+    def hash_password(self, password):
         """
         Hash a password using bcrypt
         
@@ -29,7 +38,7 @@ class AuthService:
         Returns:
             Hashed password string
         """
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=self.bcrypt_rounds)
         hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed.decode('utf-8')
     
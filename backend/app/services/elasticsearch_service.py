@@ -145,7 +145,7 @@ class ElasticsearchService:
         Search documents
         
         Args:
-            index_name: Name of the index
+            index_name: Name of the index (ignored when the query has a 'pit')
             query: Elasticsearch query
             size: Number of results (only used if not already in query)
         
@@ -159,6 +159,10 @@ class ElasticsearchService:
             else:
                 full_index_name = f"{self.index_prefix}-{index_name}"
             
+            # A point in time already names its indices
+            if 'pit' in query:
+                full_index_name = None
+            
             # Only pass size parameter if not already in query body
             if 'size' in query:
                 result = self.client.search(
@@ -178,6 +182,65 @@ class ElasticsearchService:
             logger.error(f"Error searching: {str(e)}")
             raise
     
+    def open_point_in_time(self, index_name, keep_alive='1m'):
+        """
+        Open a point in time, a frozen view of the index for paginated searches
+        
+        Args:
+            index_name: Name of the index
+            keep_alive: How long the point in time is kept without a search
+        
+        Returns:
+            str: Point in time ID
+        """
+        try:
+            # Use wildcard pattern if index_name is 'logs', otherwise construct specific index
+            if index_name == 'logs':
+                full_index_name = f"{self.index_prefix}-*"
+            else:
+                full_index_name = f"{self.index_prefix}-{index_name}"
+            
+            result = self.client.open_point_in_time(
+                index=full_index_name,
+                keep_alive=keep_alive
+            )
+            return result['id']
+            
+        except Exception as e:
+            logger.error(f"Error opening point in time: {str(e)}")
+            raise
+    
+    def msearch(self, index_name, queries):
+        """
+        Run several searches in a single _msearch round-trip
+        
+        Args:
+            index_name: Name of the index
+            queries: List of Elasticsearch query bodies
+        
+        Returns:
+            list: One search response per query (failed ones contain 'error')
+        """
+        try:
+            # Use wildcard pattern if index_name is 'logs', otherwise construct specific index
+            if index_name == 'logs':
+                full_index_name = f"{self.index_prefix}-*"
+            else:
+                full_index_name = f"{self.index_prefix}-{index_name}"
+            
+            # NDJSON body: a header line then a body line per search
+            searches = []
+            for query in queries:
+                searches.append({'index': full_index_name})
+                searches.append(query)
+            
+            result = self.client.msearch(searches=searches)
+            return result['responses']
+            
+        except Exception as e:
+            logger.error(f"Error running multi-search: {str(e)}")
+            raise
+    
     def aggregate(self, index_name, aggregations):
         """
         Execute aggregation query
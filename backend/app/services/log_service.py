@@ -13,6 +13,9 @@ from werkzeug.utils import secure_filename
 
 logger = logging.getLogger(__name__)
 
+# Redis stream read by the ingestion service ("ingest_jobs" was the old list queue)
+INGEST_STREAM = 'ingest_stream'
+
 
 class LogService:
     """Service for log processing and management"""
@@ -36,7 +39,7 @@ class LogService:
         - Save file to /uploads
         - Extract first 10 lines for preview
         - Insert metadata into MongoDB collection "uploads"
-        - Push job ID into Redis queue "ingest_jobs"
+        - Append job to Redis stream "ingest_stream"
         
         Args:
             file: Uploaded file object
@@ -131,7 +134,7 @@ class LogService:
             # Insert into MongoDB "uploads" collection
             file_id = self.mongo_service.insert_one('uploads', upload_metadata)
             
-            # Push job ID into Redis queue "ingest_jobs"
+            # Append job to Redis stream "ingest_stream"
             job_data = {
                 'job_id': job_id,
                 'file_id': str(file_id),
@@ -141,9 +144,9 @@ class LogService:
                 'created_at': uploaded_at.isoformat()
             }
             
-            # Push to Redis queue
-            self.redis_service.lpush('ingest_jobs', json.dumps(job_data))
-            logger.info(f"Job {job_id} pushed to ingest_jobs queue")
+            # Stream entries are consumed by the ingesters consumer group
+            self.redis_service.xadd(INGEST_STREAM, job_data)
+            logger.info(f"Job {job_id} added to {INGEST_STREAM} stream")
             
             # Invalidate search cache on new upload
             self.redis_service.delete_pattern('search:*')
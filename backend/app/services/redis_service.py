@@ -5,6 +5,7 @@ Handles Redis caching operations
 
 import logging
 import json
+import socket
 try:
     import redis  # type: ignore
     from redis.exceptions import RedisError  # type: ignore
@@ -13,6 +14,15 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# TCP keepalive probes so idle connections (e.g. a worker blocked on the
+# ingest stream) are not dropped by NAT/load balancers. Options missing on
+# the current platform are skipped.
+KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 30), ('TCP_KEEPCNT', 3))
+    if hasattr(socket, name)
+}
+
 
 class RedisService:
     """Service for Redis caching operations"""
@@ -28,11 +38,16 @@ class RedisService:
         self.cache_ttl = config.get('cache_ttl', 3600)
         
         try:
+            # redis-py already sets TCP_NODELAY on TCP connections; a Unix
+            # socket (when Redis runs locally) skips the TCP stack entirely
             self.client = redis.Redis(
                 host=config.get('host', 'localhost'),
                 port=config.get('port', 6379),
+                unix_socket_path=config.get('unix_socket_path') or None,
                 password=config.get('password') if config.get('password') else None,
                 db=config.get('db', 0),
+                socket_keepalive=True,
+                socket_keepalive_options=KEEPALIVE_OPTIONS,
                 decode_responses=True
             )
             
@@ -322,6 +337,155 @@ class RedisService:
             logger.error(f"Error getting list range: {str(e)}")
             return []
     
+    def xadd(self, stream, fields, maxlen=None):
+        """
+        Append an entry to a stream
+        
+        Args:
+            stream: Stream key
+            fields: Dictionary of field/value pairs
+            maxlen: Approximate maximum stream length (optional)
+        
+        Returns:
+            str: ID of the added entry or None on error
+        """
+        try:
+            return self.client.xadd(stream, fields, maxlen=maxlen, approximate=True)
+            
+        except RedisError as e:
+            logger.error(f"Error adding to stream: {str(e)}")
+            return None
+    
+    def xgroup_create(self, stream, group, id='0'):
+        """
+        Create a consumer group, creating the stream if needed
+        
+        Args:
+            stream: Stream key
+            group: Consumer group name
+            id: Stream ID the group starts reading from
+        
+        Returns:
+            bool: True if the group exists after the call
+        """
+        try:
+            self.client.xgroup_create(stream, group, id=id, mkstream=True)
+            logger.info(f"Created consumer group '{group}' on stream '{stream}'")
+            return True
+            
+        except RedisError as e:
+            # Group already created by another worker
+            if 'BUSYGROUP' in str(e):
+                return True
+            logger.error(f"Error creating consumer group: {str(e)}")
+            return False
+    
+    def xreadgroup(self, group, consumer, stream, count=None, block=None):
+        """
+        Read new entries from a stream as part of a consumer group
+        
+        Args:
+            group: Consumer group name
+            consumer: Consumer name within the group
+            stream: Stream key
+            count: Maximum number of entries to return
+            block: Milliseconds to block waiting for entries
+        
+        Returns:
+            list: (entry_id, fields) tuples, or None on error
+        """
+        try:
+            response = self.client.xreadgroup(
+                group, consumer, {stream: '>'}, count=count, block=block
+            )
+            if not response:
+                return []
+            return response[0][1]
+            
+        except RedisError as e:
+            logger.error(f"Error reading from stream: {str(e)}")
+            return None
+    
+    def xautoclaim(self, stream, group, consumer, min_idle_time, start_id='0-0', count=100):
+        """
+        Claim pending entries left idle by other (crashed) consumers
+        
+        Args:
+            stream: Stream key
+            group: Consumer group name
+            consumer: Consumer name taking ownership
+            min_idle_time: Minimum idle time in milliseconds
+            start_id: Stream ID to start scanning from
+            count: Maximum number of entries to claim
+        
+        Returns:
+            tuple: (next_start_id, list of (entry_id, fields) tuples)
+        """
+        try:
+            response = self.client.xautoclaim(
+                stream, group, consumer, min_idle_time,
+                start_id=start_id, count=count
+            )
+            return response[0], response[1]
+            
+        except RedisError as e:
+            logger.error(f"Error claiming pending entries: {str(e)}")
+            return '0-0', []
+    
+    def xack(self, stream, group, *ids):
+        """
+        Acknowledge processed stream entries
+        
+        Args:
+            stream: Stream key
+            group: Consumer group name
+            ids: Entry IDs to acknowledge
+        
+        Returns:
+            int: Number of acknowledged entries
+        """
+        try:
+            return self.client.xack(stream, group, *ids)
+            
+        except RedisError as e:
+            logger.error(f"Error acknowledging stream entries: {str(e)}")
+            return 0
+    
+    def xdel(self, stream, *ids):
+        """
+        Delete entries from a stream
+        
+        Args:
+            stream: Stream key
+            ids: Entry IDs to delete
+        
+        Returns:
+            int: Number of deleted entries
+        """
+        try:
+            return self.client.xdel(stream, *ids)
+            
+        except RedisError as e:
+            logger.error(f"Error deleting stream entries: {str(e)}")
+            return 0
+    
+    def xlen(self, stream):
+        """
+        Get length of a stream
+        
+        Args:
+            stream: Stream key
+        
+        Returns:
+            int: Number of entries in the stream
+        """
+        try:
+            return self.client.xlen(stream)
+            
+        except RedisError as e:
+            logger.error(f"Error getting stream length: {str(e)}")
+            return 0
+    
     def flush_all(self):
         """
         Flush all keys from current database
@@ -11,6 +11,51 @@ from app.utils.query_builder import ElasticsearchQueryBuilder
 
 logger = logging.getLogger(__name__)
 
+# Parameters accepted by SearchService.search, with their defaults
+SEARCH_PARAM_DEFAULTS = {
+    'query': None,
+    'log_type': None,
+    'level': None,
+    'service': None,
+    'start_date': None,
+    'end_date': None,
+    'user_id': None,
+    'min_amount': None,
+    'max_amount': None,
+    'page': 1,
+    'size': 20,
+    'sort_field': '@timestamp',
+    'sort_order': 'desc',
+    'search_after': None
+}
+
+# How long a point in time opened for cursor pagination stays open between pages
+CURSOR_KEEP_ALIVE = '1m'
+
+
+def search_cache_key(params):
+    """
+    Redis key under which the results of a search are cached
+    
+    Args:
+        params: Search parameters (SearchService.search keyword arguments)
+    
+    Returns:
+        str: Cache key ("search:" + MD5 of the sorted non-None parameters)
+    """
+    # Sort params to ensure consistent keys
+    sorted_params = sorted(params.items())
+    # Filter out None values and parameters that do not change the results
+    # (point in time searches are never cached)
+    filtered_params = [
+        (k, v) for k, v in sorted_params
+        if v is not None and k in SEARCH_PARAM_DEFAULTS
+    ]
+    # Create hash
+    params_str = json.dumps(filtered_params, sort_keys=True)
+    hash_obj = hashlib.md5(params_str.encode())
+    return f"search:{hash_obj.hexdigest()}"
+
 
 class SearchService:
     """Service for searching logs"""
@@ -38,14 +83,7 @@ class SearchService:
         Returns:
             str: Cache key
         """
-        # Sort params to ensure consistent keys
-        sorted_params = sorted(params.items())
-        # Filter out None values
-        filtered_params = [(k, v) for k, v in sorted_params if v is not None]
-        # Create hash
-        params_str = json.dumps(filtered_params, sort_keys=True)
-        hash_obj = hashlib.md5(params_str.encode())
-        return f"search:{hash_obj.hexdigest()}"
+        return search_cache_key(params)
     
     def _save_search_history(self, query_params, results_count, user_ip=None):
         """
@@ -87,6 +125,114 @@ class SearchService:
         except Exception as e:
             logger.error(f"Error saving search history: {str(e)}")
     
+    def _build_query(self, params, pit_id=None):
+        """
+        Build the Elasticsearch query for a set of search parameters
+        
+        Args:
+            params: Search parameters (as produced by search)
+            pit_id: Point in time to search (cursor pagination, optional)
+        
+        Returns:
+            dict: Elasticsearch DSL query
+        """
+        builder = ElasticsearchQueryBuilder()
+        return (builder
+                .with_free_text(params['query'])
+                .with_log_type(params['log_type'])
+                .with_level(params['level'])
+                .with_service(params['service'])
+                .with_date_range(params['start_date'], params['end_date'])
+                .with_user_filter(params['user_id'])
+                .with_amount_range(params['min_amount'], params['max_amount'])
+                .with_sort(params['sort_field'], params['sort_order'], tiebreaker=pit_id is not None)
+                .with_pagination(params['page'], params['size'])
+                .with_search_after(params['search_after'])
+                .with_point_in_time(pit_id, CURSOR_KEEP_ALIVE)
+                .build())
+    
+    def _format_results(self, result, params):
+        """
+        Turn a raw Elasticsearch response into the search results payload
+        
+        Args:
+            result: Elasticsearch search response
+            params: Search parameters the query was built from
+        
+        Returns:
+            dict: Search results with pagination metadata
+        """
+        size = params['size']
+        
+        # Extract results
+        hits = result.get('hits', {}).get('hits', [])
+        total = result.get('hits', {}).get('total', {}).get('value', 0)
+        
+        # Calculate pagination metadata
+        total_pages = (total + size - 1) // size if size > 0 else 0
+        
+        return {
+            'total': total,
+            'page': params['page'],
+            'page_size': size,
+            'total_pages': total_pages,
+            'results': [
+                {
+                    'id': hit['_id'],
+                    'score': hit['_score'],
+                    'source': hit['_source'],
+                    'highlight': hit.get('highlight', {}),
+                    # Cursor for the next page (pass back as search_after)
+                    'sort': hit.get('sort')
+                }
+                for hit in hits
+            ],
+            'query': params['query'],
+            'filters': {
+                'log_type': params['log_type'],
+                'level': params['level'],
+                'service': params['service'],
+                'start_date': params['start_date'],
+                'end_date': params['end_date'],
+                'user_id': params['user_id'],
+                'min_amount': params['min_amount'],
+                'max_amount': params['max_amount']
+            },
+            'sort': {
+                'field': params['sort_field'],
+                'order': params['sort_order']
+            },
+            'cached': False
+        }
+    
+    def _search_point_in_time(self, params, pit_id=None, user_ip=None):
+        """
+        Run one page of a cursor-paginated search, bypassing the Redis cache
+        
+        Every page is read from the same point in time and sorted with a
+        _shard_doc tiebreaker, so search_after never skips or repeats hits.
+        
+        Args:
+            params: Search parameters (as produced by search)
+            pit_id: Point in time of the previous page (None opens a new one)
+            user_ip: User IP address for history tracking
+        
+        Returns:
+            dict: Search results, with the 'pit_id' to send with the next page
+        """
+        if pit_id is None:
+            pit_id = self.es_service.open_point_in_time('logs', CURSOR_KEEP_ALIVE)
+        
+        result = self.es_service.search('logs', self._build_query(params, pit_id))
+        
+        search_results = self._format_results(result, params)
+        # Elasticsearch may return a new ID for the same point in time
+        search_results['pit_id'] = result.get('pit_id', pit_id)
+        
+        self._save_search_history(params, search_results['total'], user_ip)
+        
+        return search_results
+    
     def search(
         self, 
         query=None, 
@@ -102,6 +248,9 @@ class SearchService:
         size=20,
         sort_field='@timestamp',
         sort_order='desc',
+        search_after=None,
+        pit=False,
+        pit_id=None,
         user_ip=None
     ):
         """
@@ -122,11 +271,24 @@ class SearchService:
             size: Number of results per page
             sort_field: Field to sort by
             sort_order: Sort order (asc/desc)
+            search_after: Sort values of the previous page's last hit (cursor pagination,
+                requires pit_id)
+            pit: Open a point in time for cursor pagination (first page)
+            pit_id: Point in time returned with the previous page
             user_ip: User IP address for history tracking
         
         Returns:
             dict: Search results with metadata (cached if available)
+        
+        Raises:
+            ValueError: If search_after is given without pit_id
         """
+        if search_after and not pit_id:
+            raise ValueError(
+                "search_after requires the pit_id returned with the first page "
+                "(request it with pit=true)"
+            )
+        
         try:
             # Create cache key from parameters
             cache_params = {
@@ -142,8 +304,14 @@ class SearchService:
                 'page': page,
                 'size': size,
                 'sort_field': sort_field,
-                'sort_order': sort_order
+                'sort_order': sort_order,
+                'search_after': search_after
             }
+            
+            # Cursor pages belong to one point in time: never cached
+            if pit or pit_id:
+                return self._search_point_in_time(cache_params, pit_id, user_ip)
+            
             cache_key = self._generate_cache_key(**cache_params)
             
             # Try to get from cache (TTL 60s)
@@ -156,62 +324,15 @@ class SearchService:
             logger.info(f"Cache MISS for search: {cache_key}")
             
             # Build Elasticsearch query using Query Builder
-            builder = ElasticsearchQueryBuilder()
-            es_query = (builder
-                       .with_free_text(query)
-                       .with_log_type(log_type)
-                       .with_level(level)
-                       .with_service(service)
-                       .with_date_range(start_date, end_date)
-                       .with_user_filter(user_id)
-                       .with_amount_range(min_amount, max_amount)
-                       .with_sort(sort_field, sort_order)
-                       .with_pagination(page, size)
-                       .build())
+            es_query = self._build_query(cache_params)
             
             logger.info(f"Executing search: query='{query}', page={page}, size={size}")
             
             # Execute search (size is already in the query via pagination)
             result = self.es_service.search('logs', es_query)
             
-            # Extract results
-            hits = result.get('hits', {}).get('hits', [])
-            total = result.get('hits', {}).get('total', {}).get('value', 0)
-            
-            # Calculate pagination metadata
-            total_pages = (total + size - 1) // size if size > 0 else 0
-            
-            search_results = {
-                'total': total,
-                'page': page,
-                'page_size': size,
-                'total_pages': total_pages,
-                'results': [
-                    {
-                        'id': hit['_id'],
-                        'score': hit['_score'],
-                        'source': hit['_source'],
-                        'highlight': hit.get('highlight', {})
-                    }
-                    for hit in hits
-                ],
-                'query': query,
-                'filters': {
-                    'log_type': log_type,
-                    'level': level,
-                    'service': service,
-                    'start_date': start_date,
-                    'end_date': end_date,
-                    'user_id': user_id,
-                    'min_amount': min_amount,
-                    'max_amount': max_amount
-                },
-                'sort': {
-                    'field': sort_field,
-                    'order': sort_order
-                },
-                'cached': False
-            }
+            search_results = self._format_results(result, cache_params)
+            total = search_results['total']
             
             # Cache results with 60 seconds TTL
             self.redis_service.set(cache_key, search_results, ttl=60)
@@ -226,6 +347,72 @@ class SearchService:
             logger.error(f"Error searching logs: {str(e)}")
             raise
     
+    def multi_search(self, param_sets, user_ip=None):
+        """
+        Run several searches at once: cache hits come from Redis and all
+        misses are sent to Elasticsearch in a single _msearch request
+        
+        Args:
+            param_sets: List of dicts of search parameters (same names as search)
+            user_ip: User IP address for history tracking
+        
+        Returns:
+            list: Search results per parameter set, in order; a failed search
+                  is reported as {'error': message}
+        """
+        responses = [None] * len(param_sets)
+        misses = []
+        
+        for position, param_set in enumerate(param_sets):
+            params = {
+                name: param_set.get(name, default)
+                for name, default in SEARCH_PARAM_DEFAULTS.items()
+            }
+            
+            # Cursor pages need their own point in time: run them one by one
+            if param_set.get('pit') or param_set.get('pit_id') or params['search_after']:
+                try:
+                    responses[position] = self.search(
+                        pit=param_set.get('pit', False),
+                        pit_id=param_set.get('pit_id'),
+                        user_ip=user_ip,
+                        **params
+                    )
+                except Exception as e:
+                    responses[position] = {'error': str(e)}
+                continue
+            
+            cache_key = self._generate_cache_key(**params)
+            
+            cached_result = self.redis_service.get(cache_key)
+            if cached_result:
+                cached_result['cached'] = True
+                responses[position] = cached_result
+            else:
+                misses.append((position, cache_key, params))
+        
+        logger.info(f"Multi-search: {len(param_sets) - len(misses)} cache hits, {len(misses)} misses")
+        
+        if misses:
+            es_responses = self.es_service.msearch(
+                'logs', [self._build_query(params) for _, _, params in misses]
+            )
+            
+            for (position, cache_key, params), result in zip(misses, es_responses):
+                if 'error' in result:
+                    error = result['error']
+                    if isinstance(error, dict):
+                        error = error.get('reason', error)
+                    responses[position] = {'error': str(error)}
+                    continue
+                
+                search_results = self._format_results(result, params)
+                self.redis_service.set(cache_key, search_results, ttl=60)
+                self._save_search_history(params, search_results['total'], user_ip)
+                responses[position] = search_results
+        
+        return responses
+    
     def get_autocomplete_suggestions(self, query):
         """
         Get autocomplete suggestions
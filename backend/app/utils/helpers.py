@@ -25,15 +25,19 @@ def generate_id(prefix: str = ""):
 
 def generate_hash(data: str):
     """
-    Generate SHA256 hash
+    Generate a 128-bit fingerprint (cache keys, deduplication)
+    
+    BLAKE2b with a 16-byte digest (stdlib, same value in every environment).
+    The algorithm is not part of the API and may change between versions,
+    so fingerprints should not be persisted across upgrades.
     
     Args:
         data: Data to hash
     
     Returns:
-        str: Hash
+        str: 32-character hex digest
     """
-    return hashlib.sha256(data.encode()).hexdigest()
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
 
 
 def parse_time_range(time_range: str):
@@ -112,16 +116,25 @@ def flatten_dict(d: Dict, parent_key: str = '', sep: str = '.'):
     Returns:
         dict: Flattened dictionary
     """
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
+    flat = {}
+    set_item = flat.__setitem__
+    
+    # Explicit stack of (prefix, items iterator) instead of recursion; a
+    # nested dict suspends its parent's iterator so key order is preserved
+    stack = [(parent_key, iter(d.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for k, v in items:
+            new_key = f"{prefix}{sep}{k}" if prefix else k
+            
+            if isinstance(v, dict):
+                stack.append((new_key, iter(v.items())))
+                break
+            set_item(new_key, v)
         else:
-            items.append((new_key, v))
+            stack.pop()
     
-    return dict(items)
+    return flat
 
 
 def safe_get(dictionary: Dict, *keys, default=None):
@@ -3,6 +3,7 @@ Elasticsearch Query Builder Utility
 Builds safe, sanitized Elasticsearch DSL queries from user inputs
 """
 
+import functools
 import logging
 import re
 from datetime import datetime
@@ -11,6 +12,43 @@ from app.utils.validators import sanitize_string
 
 logger = logging.getLogger(__name__)
 
+# Characters stripped from search text: anything but word characters,
+# whitespace and common punctuation
+UNSAFE_SEARCH_CHARS_RE = re.compile(r'[^\w\s\-_@.+\'"]+')
+WHITESPACE_RUN_RE = re.compile(r'\s+')
+
+# Accepted input date formats, tried in order
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%d %H:%M:%S"
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_date(date_str: str) -> Optional[str]:
+    """
+    Normalize a date string to ISO 8601 with Z (memoized)
+    
+    The same few date bounds are sent again and again by the dashboard and
+    search forms, and each miss costs up to len(DATE_FORMATS) strptime calls.
+    
+    Args:
+        date_str: Date string in one of DATE_FORMATS
+    
+    Returns:
+        ISO date string or None if no format matches
+    """
+    for fmt in DATE_FORMATS:
+        try:
+            dt = datetime.strptime(date_str.strip(), fmt)
+            return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        except ValueError:
+            continue
+    return None
+
 
 class ElasticsearchQueryBuilder:
     """
@@ -22,6 +60,14 @@ class ElasticsearchQueryBuilder:
     DEFAULT_PAGE_SIZE = 20
     MAX_PAGE_SIZE = 1000
     MIN_PAGE_SIZE = 1
+    MAX_SEARCH_AFTER_VALUES = 5
+    
+    MAX_PIT_ID_LENGTH = 4096
+    
+    # Secondary sort making every hit's sort values unique, so a search_after
+    # cursor never skips or repeats hits sharing the primary sort value.
+    # _shard_doc is only valid (and stable) within a point in time
+    TIEBREAKER_SORT = [{"_shard_doc": {"order": "asc"}}]
     
     # Allowed fields for sorting and searching
     SEARCHABLE_FIELDS = [
@@ -29,10 +75,12 @@ class ElasticsearchQueryBuilder:
         'order_id', 'endpoint', 'service', 'action', 'product_id'
     ]
     
-    SORTABLE_FIELDS = ['@timestamp', 'amount', 'response_time', 'fraud_score']
+    # Membership-only sets: O(1) checks on every builder call
+    SORTABLE_FIELDS = frozenset({'@timestamp', 'amount', 'response_time', 'fraud_score'})
+    SORT_ORDERS = frozenset({'asc', 'desc'})
     
     # Valid log levels
-    VALID_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+    VALID_LEVELS = frozenset({'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'})
     
     def __init__(self):
         """Initialize the query builder"""
@@ -252,7 +300,8 @@ class ElasticsearchQueryBuilder:
     def with_sort(
         self, 
         field: Optional[str] = None, 
-        order: Optional[str] = 'desc'
+        order: Optional[str] = 'desc',
+        tiebreaker: bool = False
     ) -> 'ElasticsearchQueryBuilder':
         """
         Add sorting
@@ -260,6 +309,9 @@ class ElasticsearchQueryBuilder:
         Args:
             field: Field to sort by (default: @timestamp)
             order: Sort order ('asc' or 'desc', default: 'desc')
+            tiebreaker: Append TIEBREAKER_SORT, required by search_after
+                cursors (on every page, including the first). Only valid
+                together with with_point_in_time
         
         Returns:
             self for chaining
@@ -268,14 +320,75 @@ class ElasticsearchQueryBuilder:
         field_clean = field if field in self.SORTABLE_FIELDS else '@timestamp'
         
         # Validate order
-        order_clean = 'desc' if order not in ['asc', 'desc'] else order
+        order_clean = 'desc' if order not in self.SORT_ORDERS else order
         
         self.query["sort"] = [{field_clean: {"order": order_clean}}]
+        if tiebreaker:
+            self.query["sort"].extend(self.TIEBREAKER_SORT)
         
         logger.debug(f"Added sort: {field_clean} {order_clean}")
         
         return self
     
+    def with_search_after(self, values: Optional[List[Any]]) -> 'ElasticsearchQueryBuilder':
+        """
+        Continue after the last hit of a previous page (cursor pagination)
+        
+        Unlike from/size, the cost does not grow with the page depth. Must be
+        applied after with_pagination, since it resets the 'from' offset.
+        
+        Args:
+            values: 'sort' values of the last hit of the previous page
+        
+        Returns:
+            self for chaining
+        """
+        if not values:
+            return self
+        
+        # Only a short list of scalars can be a valid sort cursor
+        if (not isinstance(values, list)
+                or len(values) > self.MAX_SEARCH_AFTER_VALUES
+                or not all(isinstance(v, (str, int, float, bool)) for v in values)):
+            logger.warning(f"Invalid search_after cursor ignored: {values}")
+            return self
+        
+        self.query["search_after"] = values
+        # search_after requires from to be 0
+        self.query["from"] = 0
+        
+        logger.debug(f"Added search_after cursor: {values}")
+        
+        return self
+    
+    def with_point_in_time(self, pit_id: Optional[str], keep_alive: str = '1m') -> 'ElasticsearchQueryBuilder':
+        """
+        Search a point in time instead of the live indices
+        
+        Every page of a search_after walk sees the same snapshot, so merges
+        and new documents cannot shift the cursor. The index must then be
+        left out of the search request.
+        
+        Args:
+            pit_id: Point in time ID (from open_point_in_time or a previous page)
+            keep_alive: How long Elasticsearch keeps the point in time after this search
+        
+        Returns:
+            self for chaining
+        """
+        if not pit_id:
+            return self
+        
+        if not isinstance(pit_id, str) or len(pit_id) > self.MAX_PIT_ID_LENGTH:
+            logger.warning("Invalid point in time ID ignored")
+            return self
+        
+        self.query["pit"] = {"id": pit_id, "keep_alive": keep_alive}
+        
+        logger.debug("Added point in time")
+        
+        return self
+    
     def with_aggregations(self, agg_fields: Optional[List[str]] = None) -> 'ElasticsearchQueryBuilder':
         """
         Add aggregations for analytics
@@ -410,7 +523,7 @@ class ElasticsearchQueryBuilder:
         if level_upper in self.VALID_LEVELS:
             return level_upper
         
-        logger.warning(f"Invalid log level: {level}. Allowed: {self.VALID_LEVELS}")
+        logger.warning(f"Invalid log level: {level}. Allowed: {sorted(self.VALID_LEVELS)}")
         return None
     
     def _parse_date(self, date_str: str) -> Optional[str]:
@@ -426,22 +539,9 @@ class ElasticsearchQueryBuilder:
         if not date_str:
             return None
         
-        # Try various date formats
-        date_formats = [
-            "%Y-%m-%d",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%dT%H:%M:%SZ",
-            "%Y-%m-%dT%H:%M:%S.%fZ",
-            "%Y-%m-%d %H:%M:%S"
-        ]
-        
-        for fmt in date_formats:
-            try:
-                dt = datetime.strptime(date_str.strip(), fmt)
-                # Return in ISO 8601 format with Z
-                return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
-            except ValueError:
-                continue
+        parsed = normalize_date(date_str)
+        if parsed:
+            return parsed
         
         logger.warning(f"Invalid date format: {date_str}")
         return None
@@ -461,10 +561,10 @@ class ElasticsearchQueryBuilder:
         
         # Remove potentially dangerous characters for Elasticsearch
         # Keep alphanumeric, spaces, and common punctuation
-        text_clean = re.sub(r'[^\w\s\-_@.+\'"]+', ' ', text)
+        text_clean = UNSAFE_SEARCH_CHARS_RE.sub(' ', text)
         
         # Remove multiple spaces
-        text_clean = re.sub(r'\s+', ' ', text_clean).strip()
+        text_clean = WHITESPACE_RUN_RE.sub(' ', text_clean).strip()
         
         # Limit length
         text_clean = sanitize_string(text_clean, max_length=500)
@@ -61,6 +61,7 @@ class Config:
         'port': int(os.getenv('REDIS_PORT', 6379)),
         'password': os.getenv('REDIS_PASSWORD', ''),
         'db': int(os.getenv('REDIS_DB', 0)),
+        'unix_socket_path': os.getenv('REDIS_SOCKET_PATH'),
         'cache_ttl': int(os.getenv('REDIS_CACHE_TTL', 3600))
     }
     
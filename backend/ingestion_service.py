@@ -1,36 +1,58 @@
 """
-Ingestion Service - Processes files from Redis queue and moves to Logstash
-Listens to Redis list 'ingest_jobs', moves files to Logstash watch directory,
-and logs status updates to MongoDB.
+Ingestion Service - Processes files from Redis stream and moves to Logstash
+Reads the Redis stream 'ingest_stream' through the 'ingesters' consumer group,
+moves files to Logstash watch directory, and logs status updates to MongoDB.
+Several workers can run in parallel; each entry is delivered to one of them.
 """
 
 import os
 import shutil
 import time
+import atexit
 import logging
-import json
+import logging.handlers
+import queue
 import signal
+import socket
 import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional
 
-# Configure logging
+# Configure logging: records are queued by the worker thread and written
+# to file/console by a background listener thread
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+file_handler = logging.FileHandler('ingestion_service.log')
+file_handler.setFormatter(log_formatter)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(
+    log_queue, file_handler, stream_handler, respect_handler_level=True
+)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('ingestion_service.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
 
 logger = logging.getLogger(__name__)
 
+# Same key as INGEST_STREAM in app/services/log_service.py
+INGEST_STREAM = 'ingest_stream'
+# List queue used before the stream; drained into the stream on startup
+LEGACY_INGEST_QUEUE = 'ingest_jobs'
+INGEST_GROUP = 'ingesters'
+INFLIGHT_KEY_PREFIX = 'ingest:inflight:'
+INFLIGHT_TTL = 60
+
 
 class IngestionService:
     """
-    Service that processes file ingestion jobs from Redis queue
+    Service that processes file ingestion jobs from Redis stream
     """
     
     def __init__(self, redis_service, mongo_service, 
@@ -38,7 +60,10 @@ class IngestionService:
                  target_dir: str = './uploads',
                  max_retries: int = 3,
                  retry_delay: int = 5,
-                 poll_interval: int = 5):
+                 poll_interval: int = 5,
+                 consumer_name: Optional[str] = None,
+                 batch_size: int = 32,
+                 claim_idle_time: int = 60000):
         """
         Initialize ingestion service
         
@@ -49,7 +74,11 @@ class IngestionService:
             target_dir: Target directory (Logstash watch directory)
             max_retries: Maximum number of retry attempts
             retry_delay: Delay between retries in seconds
-            poll_interval: Queue polling interval in seconds
+            poll_interval: Blocking read timeout in seconds
+            consumer_name: Consumer name within the group (defaults to host-pid)
+            batch_size: Maximum number of entries read per call
+            claim_idle_time: Idle time in milliseconds before a pending
+                entry of another consumer is reclaimed
         """
         self.redis_service = redis_service
         self.mongo_service = mongo_service
@@ -58,6 +87,9 @@ class IngestionService:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.poll_interval = poll_interval
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.claim_idle_time = claim_idle_time
         self.running = False
         
         # Create directories if they don't exist
@@ -68,18 +100,21 @@ class IngestionService:
         logger.info(f"Source directory: {self.source_dir}")
         logger.info(f"Target directory: {self.target_dir}")
         logger.info(f"Max retries: {max_retries}, Retry delay: {retry_delay}s")
+        logger.info(f"Consumer: {self.consumer_name} (group '{INGEST_GROUP}')")
     
     def update_job_status(self, job_id: str, status: str, 
                          error_message: Optional[str] = None,
-                         retry_count: int = 0) -> bool:
+                         retry_count: int = 0,
+                         started_at: Optional[datetime] = None) -> bool:
         """
         Update job status in MongoDB
         
         Args:
             job_id: Job ID
-            status: Status (pending, processing, completed, failed)
+            status: Status (pending, completed, failed)
             error_message: Error message if failed
             retry_count: Number of retry attempts
+            started_at: Time processing of the job started
         
         Returns:
             bool: Success status
@@ -94,6 +129,9 @@ class IngestionService:
             if error_message:
                 update_data['error_message'] = error_message
             
+            if started_at:
+                update_data['started_at'] = started_at
+            
             if status == 'completed':
                 update_data['processed'] = True
                 update_data['completed_at'] = datetime.utcnow()
@@ -156,6 +194,10 @@ class IngestionService:
         """
         Process a single ingestion job with retry logic
         
+        MongoDB is only written once, when the job reaches its terminal
+        state; in-progress visibility is provided by a short-lived Redis
+        key (ingest:inflight:<job_id>).
+        
         Args:
             job_data: Job data dictionary
         
@@ -168,9 +210,31 @@ class IngestionService:
         
         logger.info(f"Processing job {job_id}: {file_path}")
         
-        # Update status to processing
-        self.update_job_status(job_id, 'processing')
+        started_at = datetime.utcnow()
+        inflight_key = f"{INFLIGHT_KEY_PREFIX}{job_id}"
+        
+        # Mark job as in progress without touching MongoDB
+        self.redis_service.set(inflight_key, 1, ttl=INFLIGHT_TTL)
         
+        try:
+            return self._process_with_retries(job_id, file_path, file_type, started_at)
+        finally:
+            self.redis_service.delete(inflight_key)
+    
+    def _process_with_retries(self, job_id: str, file_path: str,
+                              file_type: str, started_at: datetime) -> bool:
+        """
+        Move a job file with retries and record its terminal status
+        
+        Args:
+            job_id: Job ID
+            file_path: Path of the uploaded file
+            file_type: File type (csv, json)
+            started_at: Time processing of the job started
+        
+        Returns:
+            bool: Success status
+        """
         retry_count = 0
         last_error = None
         
@@ -181,7 +245,12 @@ class IngestionService:
                 
                 if success:
                     # Update status to completed
-                    self.update_job_status(job_id, 'completed')
+                    self.update_job_status(
+                        job_id,
+                        'completed',
+                        retry_count=retry_count,
+                        started_at=started_at
+                    )
                     logger.info(f"Job {job_id} completed successfully")
                     return True
                 else:
@@ -201,49 +270,141 @@ class IngestionService:
                         job_id, 
                         'failed', 
                         error_message=f"Max retries exceeded: {last_error}",
-                        retry_count=retry_count
+                        retry_count=retry_count,
+                        started_at=started_at
                     )
                     logger.error(f"Job {job_id} failed after {retry_count} attempts")
                     return False
         
         return False
     
+    def handle_entry(self, entry_id: str, job_data: Dict) -> bool:
+        """
+        Process a stream entry and acknowledge it
+        
+        The entry is acknowledged once the job reached a terminal state
+        (completed or failed); an entry left unacknowledged by a crashed
+        worker stays pending and is reclaimed by recover_pending_jobs.
+        
+        Args:
+            entry_id: Stream entry ID
+            job_data: Job data dictionary (stream entry fields)
+        
+        Returns:
+            bool: Success status
+        """
+        # Not acknowledged in a finally block: KeyboardInterrupt/SystemExit
+        # mid-job must leave the entry pending for recover_pending_jobs
+        try:
+            success = self.process_job(job_data)
+        except Exception as e:
+            logger.error(f"Error processing job: {str(e)}", exc_info=True)
+            self.acknowledge(entry_id)
+            return False
+        
+        self.acknowledge(entry_id)
+        return success
+    
+    def acknowledge(self, entry_id: str):
+        """
+        Acknowledge a stream entry and delete it
+        
+        Job status is kept in MongoDB, so handled entries are removed to
+        keep the stream from growing without bound.
+        
+        Args:
+            entry_id: Stream entry ID
+        """
+        self.redis_service.xack(INGEST_STREAM, INGEST_GROUP, entry_id)
+        self.redis_service.xdel(INGEST_STREAM, entry_id)
+    
+    def migrate_legacy_queue(self) -> int:
+        """
+        Move jobs left in the old 'ingest_jobs' list queue into the stream
+        
+        Returns:
+            int: Number of migrated jobs
+        """
+        migrated = 0
+        
+        while True:
+            job_data = self.redis_service.rpop(LEGACY_INGEST_QUEUE)
+            if job_data is None:
+                break
+            
+            if not isinstance(job_data, dict):
+                logger.error(f"Dropping malformed legacy job: {job_data!r}")
+                continue
+            
+            self.redis_service.xadd(INGEST_STREAM, job_data)
+            migrated += 1
+        
+        if migrated:
+            logger.info(f"Migrated {migrated} jobs from the {LEGACY_INGEST_QUEUE} list")
+        return migrated
+    
+    def recover_pending_jobs(self) -> int:
+        """
+        Claim and process entries left pending by interrupted workers
+        
+        Returns:
+            int: Number of recovered jobs
+        """
+        recovered = 0
+        start_id = '0-0'
+        
+        while True:
+            start_id, entries = self.redis_service.xautoclaim(
+                INGEST_STREAM, INGEST_GROUP, self.consumer_name,
+                self.claim_idle_time, start_id=start_id, count=self.batch_size
+            )
+            
+            for entry_id, job_data in entries:
+                # Entries trimmed from the stream are returned without fields
+                if job_data:
+                    self.handle_entry(entry_id, job_data)
+                    recovered += 1
+                else:
+                    self.acknowledge(entry_id)
+            
+            if start_id == '0-0':
+                break
+        
+        if recovered:
+            logger.info(f"Recovered {recovered} pending jobs")
+        return recovered
+    
     def listen_and_process(self):
         """
-        Main loop - Listen to Redis queue and process jobs
+        Main loop - Read Redis stream and process jobs
         """
         logger.info("Starting ingestion service listener...")
+        self.redis_service.xgroup_create(INGEST_STREAM, INGEST_GROUP)
+        self.migrate_legacy_queue()
+        self.recover_pending_jobs()
         self.running = True
         
         while self.running:
             try:
-                # Check queue length
-                queue_length = self.redis_service.llen('ingest_jobs')
+                # Block until new entries arrive (or poll_interval elapses)
+                entries = self.redis_service.xreadgroup(
+                    INGEST_GROUP,
+                    self.consumer_name,
+                    INGEST_STREAM,
+                    count=self.batch_size,
+                    block=self.poll_interval * 1000
+                )
                 
-                if queue_length > 0:
-                    logger.info(f"Found {queue_length} jobs in queue")
-                    
-                    # Pop job from queue (FIFO - right side)
-                    job_data_raw = self.redis_service.rpop('ingest_jobs')
-                    
-                    if job_data_raw:
-                        try:
-                            # Parse job data
-                            if isinstance(job_data_raw, str):
-                                job_data = json.loads(job_data_raw)
-                            else:
-                                job_data = job_data_raw
-                            
-                            # Process the job
-                            self.process_job(job_data)
-                            
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Invalid job data in queue: {str(e)}")
-                        except Exception as e:
-                            logger.error(f"Error processing job: {str(e)}", exc_info=True)
-                else:
-                    # No jobs, wait before checking again
+                if entries is None:
+                    # Redis error, wait before trying again
                     time.sleep(self.poll_interval)
+                    continue
+                
+                if entries:
+                    logger.info(f"Received {len(entries)} jobs from stream")
+                
+                for entry_id, job_data in entries:
+                    self.handle_entry(entry_id, job_data)
                     
             except KeyboardInterrupt:
                 logger.info("Received shutdown signal")
@@ -11,15 +11,16 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from app.services.auth_service import AuthService
 
+# Demo accounts are not security-sensitive: hash them at a low bcrypt cost
+SAMPLE_USERS_BCRYPT_ROUNDS = int(os.getenv('SAMPLE_USERS_BCRYPT_ROUNDS', 4))
 
-def create_admin():
+
+def create_admin(auth_service):
     """Create the initial admin user"""
     print("=" * 60)
     print("Create Admin User")
     print("=" * 60)
     
-    auth_service = AuthService()
-    
     # Default admin credentials (change in production!)
     username = input("\nEnter admin username (default: admin): ").strip() or "admin"
     email = input("Enter admin email (default: admin@example.com): ").strip() or "admin@example.com"
@@ -77,7 +78,7 @@ def create_admin():
         sys.exit(1)
 
 
-def create_sample_users():
+def create_sample_users(auth_service):
     """Create sample users for testing"""
     print("\n" + "=" * 60)
     print("Create Sample Users")
@@ -88,8 +89,6 @@ def create_sample_users():
     if create_samples != 'y':
         return
     
-    auth_service = AuthService()
-    
     sample_users = [
         {
             "username": "analyst_demo",
@@ -113,19 +112,25 @@ def create_sample_users():
     
     print("\nCreating sample users...")
     
-    for user_data in sample_users:
-        try:
-            existing = auth_service.get_user_by_username(user_data['username'])
-            
-            if existing:
-                print(f"  ⚠ {user_data['username']} already exists (skipped)")
-                continue
+    default_rounds = auth_service.bcrypt_rounds
+    auth_service.bcrypt_rounds = SAMPLE_USERS_BCRYPT_ROUNDS
+    
+    try:
+        for user_data in sample_users:
+            try:
+                existing = auth_service.get_user_by_username(user_data['username'])
+                
+                if existing:
+                    print(f"  ⚠ {user_data['username']} already exists (skipped)")
+                    continue
+                
+                user = auth_service.register_user(**user_data)
+                print(f"  ✓ Created {user_data['username']} (role: {user_data['role']})")
             
-            user = auth_service.register_user(**user_data)
-            print(f"  ✓ Created {user_data['username']} (role: {user_data['role']})")
-        
-        except Exception as e:
-            print(f"  ✗ Failed to create {user_data['username']}: {str(e)}")
+            except Exception as e:
+                print(f"  ✗ Failed to create {user_data['username']}: {str(e)}")
+    finally:
+        auth_service.bcrypt_rounds = default_rounds
     
     print("\n✓ Sample users creation completed!")
     print("\nSample credentials:")
@@ -136,8 +141,9 @@ def create_sample_users():
 def main():
     """Main function"""
     try:
-        create_admin()
-        create_sample_users()
+        auth_service = AuthService()
+        create_admin(auth_service)
+        create_sample_users(auth_service)
         
         print("\n" + "=" * 60)
         print("Setup completed successfully!")
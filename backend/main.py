@@ -4,9 +4,11 @@ Plateforme de Monitoring et Analyse de Logs E-Commerce
 """
 
 import os
+import shutil
 import logging
 from flask import Flask
 from app import create_app
+from config import get_config
 
 # Configure logging
 logging.basicConfig(
@@ -20,12 +22,55 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+
+def run_production_server(host, port):
+    """
+    Serve the application with a multi-worker WSGI server
+    
+    Uses gunicorn (gthread workers) on POSIX systems and waitress on Windows.
+    Falls back to the Flask development server if neither is installed.
+    
+    Args:
+        host: Interface to bind
+        port: Port to bind
+    """
+    config = get_config()
+    workers = config.WORKER_PROCESSES
+    threads = config.WORKER_THREADS
+    
+    if os.name != 'nt' and shutil.which('gunicorn'):
+        logger.info(f"Starting gunicorn with {workers} workers x {threads} threads")
+        # Replace the current process; each worker builds its own app
+        os.execvp('gunicorn', [
+            'gunicorn',
+            '--chdir', os.path.dirname(os.path.abspath(__file__)),
+            '--bind', f'{host}:{port}',
+            '--workers', str(workers),
+            '--worker-class', 'gthread',
+            '--threads', str(threads),
+            '--timeout', str(config.REQUEST_TIMEOUT),
+            '--access-logfile', '-',
+            '--error-logfile', '-',
+            'app:create_app()'
+        ])
+    
+    app = create_app()
+    
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("No production WSGI server installed, using Flask development server")
+        # use_reloader=False to fix Windows socket issue
+        app.run(host=host, port=port, threaded=True, use_reloader=False)
+        return
+    
+    logger.info(f"Starting waitress with {workers * threads} threads")
+    serve(app, host=host, port=port, threads=workers * threads)
+
+
 def main():
     """Create and run the Flask application"""
     try:
-        # Create Flask app
-        app = create_app()
-        
         # Get configuration from environment
         host = os.getenv('HOST', '0.0.0.0')
         port = int(os.getenv('PORT', 5000))
@@ -34,7 +79,14 @@ def main():
         logger.info(f"Starting Flask application on {host}:{port}")
         logger.info(f"Debug mode: {debug}")
         
-        # Run the application (use_reloader=False to fix Windows socket issue)
+        if not debug:
+            run_production_server(host, port)
+            return
+        
+        # Create Flask app
+        app = create_app()
+        
+        # Run the development server (use_reloader=False to fix Windows socket issue)
         app.run(
             host=host,
             port=port,
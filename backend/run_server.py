@@ -7,11 +7,9 @@ import sys
 # Add backend to path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from app import create_app
+from main import run_production_server
 
 if __name__ == '__main__':
-    app = create_app()
-    
     print("\n" + "="*60)
     print("Flask Server Starting...")
     print("Server: http://localhost:5001")
@@ -20,11 +18,5 @@ if __name__ == '__main__':
     print("Login: http://localhost:5001/login")
     print("="*60 + "\n")
     
-    # Run without reloader to avoid Windows socket issues
-    app.run(
-        host='0.0.0.0',
-        port=5001,
-        debug=False,
-        use_reloader=False,
-        threaded=True
-    )
+    # gunicorn on Linux, waitress on Windows (no reloader socket issues)
+    run_production_server('0.0.0.0', 5001)
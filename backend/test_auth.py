@@ -6,10 +6,15 @@ Demonstrates registration, login, token usage, and role-based access
 import requests
 import json
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 
 # Base URL for the API
 BASE_URL = "http://localhost:5000/api/auth"
 
+# Shared session so every call reuses pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=20, pool_maxsize=20))
+
 # Colors for terminal output
 class Colors:
     GREEN = '\033[92m'
@@ -73,7 +78,7 @@ def test_register():
     ]
     
     for user in test_users:
-        response = requests.post(f"{BASE_URL}/register", json=user)
+        response = SESSION.post(f"{BASE_URL}/register", json=user)
         
         if response.status_code == 201:
             print_success(f"Registered user: {user['username']} (role: {user['role']})")
@@ -95,7 +100,7 @@ def test_login():
         "password": "admin12345"
     }
     
-    response = requests.post(f"{BASE_URL}/login", json=credentials)
+    response = SESSION.post(f"{BASE_URL}/login", json=credentials)
     print_response(response, "Login Response")
     
     if response.status_code == 200:
@@ -117,7 +122,7 @@ def test_get_current_user(access_token):
         "Authorization": f"Bearer {access_token}"
     }
     
-    response = requests.get(f"{BASE_URL}/me", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/me", headers=headers)
     print_response(response, "Current User")
     
     if response.status_code == 200:
@@ -132,7 +137,7 @@ def test_refresh_token(refresh_token):
     """Test token refresh"""
     print_info("\nTesting token refresh...")
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/refresh",
         json={"refresh_token": refresh_token}
     )
@@ -161,7 +166,7 @@ def test_change_password(access_token):
         "new_password": "newpassword123"
     }
     
-    response = requests.put(f"{BASE_URL}/me/password", json=data, headers=headers)
+    response = SESSION.put(f"{BASE_URL}/me/password", json=data, headers=headers)
     print_response(response, "Change Password")
     
     if response.status_code == 200:
@@ -172,7 +177,7 @@ def test_change_password(access_token):
             "old_password": "newpassword123",
             "new_password": "admin12345"
         }
-        requests.put(f"{BASE_URL}/me/password", json=data_back, headers=headers)
+        SESSION.put(f"{BASE_URL}/me/password", json=data_back, headers=headers)
         print_info("Password reverted back for testing purposes")
         return True
     else:
@@ -189,7 +194,7 @@ def test_role_based_access(access_token):
     }
     
     # Test admin-only route
-    response = requests.get(f"{BASE_URL}/admin-only", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/admin-only", headers=headers)
     print_response(response, "Admin-Only Route")
     
     if response.status_code == 200:
@@ -200,7 +205,7 @@ def test_role_based_access(access_token):
         print_error("Unexpected response from admin route")
     
     # Test analyst area route
-    response = requests.get(f"{BASE_URL}/analyst-area", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/analyst-area", headers=headers)
     print_response(response, "Analyst Area Route")
     
     if response.status_code == 200:
@@ -209,11 +214,11 @@ def test_role_based_access(access_token):
         print_warning("Analyst area access denied (insufficient permissions)")
     
     # Test public/private route without token
-    response = requests.get(f"{BASE_URL}/public-or-private")
+    response = SESSION.get(f"{BASE_URL}/public-or-private")
     print_response(response, "Public Route (No Token)")
     
     # Test public/private route with token
-    response = requests.get(f"{BASE_URL}/public-or-private", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/public-or-private", headers=headers)
     print_response(response, "Public Route (With Token)")
 
 
@@ -225,7 +230,7 @@ def test_list_users(access_token):
         "Authorization": f"Bearer {access_token}"
     }
     
-    response = requests.get(f"{BASE_URL}/users", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/users", headers=headers)
     print_response(response, "List Users")
     
     if response.status_code == 200:
@@ -247,7 +252,7 @@ def test_invalid_token():
         "Authorization": "Bearer invalid_token_here"
     }
     
-    response = requests.get(f"{BASE_URL}/me", headers=headers)
+    response = SESSION.get(f"{BASE_URL}/me", headers=headers)
     print_response(response, "Invalid Token Test")
     
     if response.status_code == 401:
@@ -262,7 +267,7 @@ def test_no_token():
     """Test protected route without token"""
     print_info("\nTesting protected route without token...")
     
-    response = requests.get(f"{BASE_URL}/me")
+    response = SESSION.get(f"{BASE_URL}/me")
     print_response(response, "No Token Test")
     
     if response.status_code == 401:
@@ -4,9 +4,15 @@ Tests all protected routes with JWT tokens
 """
 import requests
 import json
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "http://localhost:5001"
 
+# One keep-alive connection pool shared by every call of the suite
+SESSION = requests.Session()
+SESSION.headers.update({"Content-Type": "application/json"})
+SESSION.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=0))
+
 def test_complete_auth_flow():
     print("\n" + "="*60)
     print("  JWT AUTHENTICATION TEST SUITE")
@@ -16,15 +22,15 @@ def test_complete_auth_flow():
     print("1. Testing Login...")
     login_data = {"username": "admin", "password": "admin12345"}
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/api/auth/login",
-            json=login_data,
-            headers={"Content-Type": "application/json"}
+            json=login_data
         )
         print(f"   Status: {response.status_code}")
         
         if response.status_code == 200:
             token = response.json()['access_token']
+            SESSION.headers["Authorization"] = f"Bearer {token}"
             print(f"   ✓ Token obtained: {token[:30]}...")
         else:
             print(f"   ✗ Login failed: {response.text}")
@@ -36,10 +42,7 @@ def test_complete_auth_flow():
     # Test 2: Dashboard
     print("\n2. Testing Dashboard (requires viewer+)...")
     try:
-        response = requests.get(
-            f"{BASE_URL}/api/dashboard/kpis",
-            headers={"Authorization": f"Bearer {token}"}
-        )
+        response = SESSION.get(f"{BASE_URL}/api/dashboard/kpis")
         print(f"   Status: {response.status_code}")
         if response.status_code == 200:
             print(f"   ✓ Dashboard accessible")
@@ -51,10 +54,7 @@ def test_complete_auth_flow():
     # Test 3: Search
     print("\n3. Testing Search (requires viewer+)...")
     try:
-        response = requests.get(
-            f"{BASE_URL}/api/search?q=test&size=5",
-            headers={"Authorization": f"Bearer {token}"}
-        )
+        response = SESSION.get(f"{BASE_URL}/api/search?q=test&size=5")
         print(f"   Status: {response.status_code}")
         if response.status_code == 200:
             print(f"   ✓ Search accessible")
@@ -66,10 +66,9 @@ def test_complete_auth_flow():
     # Test 4: Analytics
     print("\n4. Testing Analytics (requires analyst+)...")
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{BASE_URL}/api/analytics/transactions",
-            params={"start_date": "2024-01-01", "end_date": "2024-12-31"},
-            headers={"Authorization": f"Bearer {token}"}
+            params={"start_date": "2024-01-01", "end_date": "2024-12-31"}
         )
         print(f"   Status: {response.status_code}")
         if response.status_code == 200:
@@ -82,7 +81,11 @@ def test_complete_auth_flow():
     # Test 5: No token
     print("\n5. Testing without token (should fail)...")
     try:
-        response = requests.get(f"{BASE_URL}/api/dashboard/kpis")
+        # A None value drops the session-level Authorization header
+        response = SESSION.get(
+            f"{BASE_URL}/api/dashboard/kpis",
+            headers={"Authorization": None}
+        )
         print(f"   Status: {response.status_code}")
         if response.status_code == 401:
             print(f"   ✓ Correctly rejected")
@@ -3,12 +3,46 @@ Test script for JWT authentication on protected routes
 Tests that routes properly require authentication and respect role hierarchy
 """
 
+import sys
 import requests
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from requests.adapters import HTTPAdapter
 
 # Base URL for the API
 BASE_URL = "http://localhost:5000"
 
+# Number of route checks sent concurrently
+MAX_WORKERS = 8
+
+# Credentials of the account used for each role
+ROLE_CREDENTIALS = {
+    'admin': ("admin", "admin12345"),
+    'analyst': ("analyst_demo", "analyst123"),
+    'viewer': ("viewer_demo", "viewer123")
+}
+
+# Access tokens keyed by (username, password): each account logs in once
+_TOKEN_CACHE = {}
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
+def create_session(token=None):
+    """
+    Create a session reusing keep-alive connections across requests
+    
+    Args:
+        token: Access token sent as Bearer authorization on every request
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=MAX_WORKERS, max_retries=0))
+    if token:
+        session.headers["Authorization"] = f"Bearer {token}"
+    return session
+
+
 # Colors for terminal output
 class Colors:
     GREEN = '\033[92m'
@@ -18,223 +52,278 @@ class Colors:
     END = '\033[0m'
 
 
+# Colored templates built once; each call is a single % substitution
+_SUCCESS_TPL = f"{Colors.GREEN}✓ %s{Colors.END}"
+_ERROR_TPL = f"{Colors.RED}✗ %s{Colors.END}"
+_INFO_TPL = f"{Colors.BLUE}ℹ %s{Colors.END}"
+_SECTION_TPL = f"\n{Colors.YELLOW}{'=' * 60}\n%s\n{'=' * 60}{Colors.END}\n\n"
+
+
+def success_line(message):
+    return _SUCCESS_TPL % message
+
+
+def error_line(message):
+    return _ERROR_TPL % message
+
+
+def info_line(message):
+    return _INFO_TPL % message
+
+
+def section_text(message):
+    return _SECTION_TPL % message
+
+
 def print_success(message):
-    print(f"{Colors.GREEN}✓ {message}{Colors.END}")
+    sys.stdout.write(success_line(message) + "\n")
 
 
 def print_error(message):
-    print(f"{Colors.RED}✗ {message}{Colors.END}")
+    sys.stdout.write(error_line(message) + "\n")
 
 
 def print_info(message):
-    print(f"{Colors.BLUE}ℹ {message}{Colors.END}")
+    sys.stdout.write(info_line(message) + "\n")
 
 
 def print_section(message):
-    print(f"\n{Colors.YELLOW}{'=' * 60}")
-    print(f"{message}")
-    print(f"{'=' * 60}{Colors.END}\n")
+    sys.stdout.write(section_text(message))
 
 
-def login(username, password):
-    """Login and get access token"""
-    response = requests.post(
-        f"{BASE_URL}/api/auth/login",
-        json={"username": username, "password": password}
-    )
+@dataclass
+class TestResult:
+    """Outcome of a single route check, printed once the whole matrix ran"""
+    passed: bool
+    lines: list = field(default_factory=list)
+
+
+def login(session, username, password):
+    """Login and get access token (cached for the rest of the run)"""
+    key = (username, password)
     
-    if response.status_code == 200:
-        data = response.json()
-        return data['access_token']
-    return None
+    with _TOKEN_CACHE_LOCK:
+        if key in _TOKEN_CACHE:
+            return _TOKEN_CACHE[key]
+        
+        response = session.post(
+            f"{BASE_URL}/api/auth/login",
+            json={"username": username, "password": password}
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            _TOKEN_CACHE[key] = data['access_token']
+            return data['access_token']
+        return None
+
+
+def login_all_roles(session):
+    """Login once with every role and return access tokens keyed by role"""
+    return {
+        role: login(session, username, password)
+        for role, (username, password) in ROLE_CREDENTIALS.items()
+    }
 
 
-def test_route_without_auth(route, method='GET'):
+def test_route_without_auth(session, route, method='GET'):
     """Test that a route rejects requests without authentication"""
-    print_info(f"Testing {method} {route} without auth...")
+    lines = [info_line(f"Testing {method} {route} without auth...")]
     
     if method == 'GET':
-        response = requests.get(f"{BASE_URL}{route}")
+        response = session.get(f"{BASE_URL}{route}")
     elif method == 'POST':
-        response = requests.post(f"{BASE_URL}{route}", json={})
+        response = session.post(f"{BASE_URL}{route}", json={})
     
     if response.status_code == 401:
-        print_success(f"Correctly rejected unauthenticated request")
-        return True
+        lines.append(success_line(f"Correctly rejected unauthenticated request"))
+        return TestResult(True, lines)
     else:
-        print_error(f"Should reject but got status {response.status_code}")
-        return False
+        lines.append(error_line(f"Should reject but got status {response.status_code}"))
+        return TestResult(False, lines)
 
 
-def test_route_with_auth(route, token, expected_status=200, method='GET'):
+def test_route_with_auth(session, route, expected_status=200, method='GET'):
     """Test that a route accepts requests with valid authentication"""
-    print_info(f"Testing {method} {route} with auth...")
-    
-    headers = {"Authorization": f"Bearer {token}"}
+    lines = [info_line(f"Testing {method} {route} with auth...")]
     
     if method == 'GET':
-        response = requests.get(f"{BASE_URL}{route}", headers=headers)
+        response = session.get(f"{BASE_URL}{route}")
     elif method == 'POST':
-        response = requests.post(f"{BASE_URL}{route}", headers=headers, json={})
+        response = session.post(f"{BASE_URL}{route}", json={})
     
     if response.status_code == expected_status:
-        print_success(f"Got expected status {expected_status}")
-        return True
+        lines.append(success_line(f"Got expected status {expected_status}"))
+        return TestResult(True, lines)
     else:
-        print_error(f"Expected {expected_status} but got {response.status_code}")
-        print(f"Response: {response.text[:200]}")
-        return False
+        lines.append(error_line(f"Expected {expected_status} but got {response.status_code}"))
+        lines.append(f"Response: {response.text[:200]}")
+        return TestResult(False, lines)
 
 
-def test_route_with_insufficient_role(route, token, method='GET'):
+def test_route_with_insufficient_role(session, route, method='GET'):
     """Test that a route rejects requests with insufficient role"""
-    print_info(f"Testing {method} {route} with insufficient role...")
-    
-    headers = {"Authorization": f"Bearer {token}"}
+    lines = [info_line(f"Testing {method} {route} with insufficient role...")]
     
     if method == 'GET':
-        response = requests.get(f"{BASE_URL}{route}", headers=headers)
+        response = session.get(f"{BASE_URL}{route}")
     elif method == 'POST':
-        response = requests.post(f"{BASE_URL}{route}", headers=headers, json={})
+        response = session.post(f"{BASE_URL}{route}", json={})
     
     if response.status_code == 403:
-        print_success(f"Correctly rejected request with insufficient role")
-        return True
+        lines.append(success_line(f"Correctly rejected request with insufficient role"))
+        return TestResult(True, lines)
     else:
-        print_error(f"Should reject with 403 but got {response.status_code}")
-        return False
+        lines.append(error_line(f"Should reject with 403 but got {response.status_code}"))
+        return TestResult(False, lines)
 
 
-def main():
-    print_section("JWT Authentication Test - Protected Routes")
+def test_upload_auth_passes(session):
+    """Test that log upload passes authentication (it may still fail validation)"""
+    lines = [info_line("Testing POST /api/logs/upload with analyst auth...")]
     
-    # Login with different roles
-    print_info("Logging in with different user roles...")
-    admin_token = login("admin", "admin12345")
-    analyst_token = login("analyst_demo", "analyst123")
-    viewer_token = login("viewer_demo", "viewer123")
+    response = session.post(f"{BASE_URL}/api/logs/upload")
     
-    if not admin_token:
-        print_error("Failed to login as admin")
-        return
-    if not analyst_token:
-        print_error("Failed to login as analyst")
-        return
-    if not viewer_token:
-        print_error("Failed to login as viewer")
-        return
+    # Should not be 401 or 403 (auth passed), might be 400 (missing file)
+    if response.status_code not in [401, 403]:
+        lines.append(success_line(f"Authentication passed (got {response.status_code} for missing file)"))
+        return TestResult(True, lines)
+    else:
+        lines.append(error_line(f"Authentication failed with {response.status_code}"))
+        return TestResult(False, lines)
+
+
+def build_test_matrix(session, analyst_session, viewer_session):
+    """
+    Build the route checks grouped by section
     
-    print_success("Successfully logged in with all roles")
-    
-    results = {
-        'passed': 0,
-        'failed': 0
-    }
+    Args:
+        session: Session without credentials
+        analyst_session: Session authenticated as analyst
+        viewer_session: Session authenticated as viewer
     
+    Returns:
+        list: (section title, [(check function, args), ...]) tuples
+    """
     # Test 1: Dashboard routes (require viewer+)
-    print_section("Test 1: Dashboard Routes (Require Viewer Role)")
-    
     dashboard_routes = [
         '/dashboard',
         '/api/dashboard/kpis',
         '/api/dashboard/overview',
         '/api/dashboard/metrics'
     ]
-    
+    dashboard_checks = []
     for route in dashboard_routes:
-        # Test without auth
-        if test_route_without_auth(route):
-            results['passed'] += 1
-        else:
-            results['failed'] += 1
-        
-        # Test with viewer (should work)
-        if test_route_with_auth(route, viewer_token):
-            results['passed'] += 1
-        else:
-            results['failed'] += 1
-        
-        # Test with analyst (should work - higher role)
-        if test_route_with_auth(route, analyst_token):
-            results['passed'] += 1
-        else:
-            results['failed'] += 1
+        dashboard_checks += [
+            (test_route_without_auth, (session, route)),
+            # Viewer should work
+            (test_route_with_auth, (viewer_session, route)),
+            # Analyst should work - higher role
+            (test_route_with_auth, (analyst_session, route))
+        ]
     
     # Test 2: Analytics routes (require analyst+)
-    print_section("Test 2: Analytics Routes (Require Analyst Role)")
-    
     analytics_routes = [
         '/api/analytics/transactions',
         '/api/analytics/errors',
         '/api/analytics/user-behavior'
     ]
-    
+    analytics_checks = []
     for route in analytics_routes:
-        # Test without auth
-        if test_route_without_auth(route):
-            results['passed'] += 1
-        else:
-            results['failed'] += 1
-        
-        # Test with viewer (should fail)
-        if test_route_with_insufficient_role(route, viewer_token):
-            results['passed'] += 1
-        else:
-            results['failed'] += 1
-        
-        # Test with analyst (should work)
-        if test_route_with_auth(route, analyst_token):
-            results['passed'] += 1
-        else:
-            results['failed'] += 1
+        analytics_checks += [
+            (test_route_without_auth, (session, route)),
+            # Viewer should fail
+            (test_route_with_insufficient_role, (viewer_session, route)),
+            # Analyst should work
+            (test_route_with_auth, (analyst_session, route))
+        ]
     
     # Test 3: Search routes (require viewer+)
-    print_section("Test 3: Search Routes (Require Viewer Role)")
-    
     search_routes = [
         '/api/search',
         '/api/search/autocomplete?q=test'
     ]
-    
+    search_checks = []
     for route in search_routes:
-        # Test without auth
-        if test_route_without_auth(route):
-            results['passed'] += 1
-        else:
-            results['failed'] += 1
-        
-        # Test with viewer (should work)
-        if test_route_with_auth(route, viewer_token):
-            results['passed'] += 1
-        else:
-            results['failed'] += 1
+        search_checks += [
+            (test_route_without_auth, (session, route)),
+            (test_route_with_auth, (viewer_session, route))
+        ]
     
     # Test 4: Log upload (require analyst+)
-    print_section("Test 4: Log Upload (Requires Analyst Role)")
+    upload_checks = [
+        (test_route_without_auth, (session, '/api/logs/upload', 'POST')),
+        (test_route_with_insufficient_role, (viewer_session, '/api/logs/upload', 'POST')),
+        (test_upload_auth_passes, (analyst_session,))
+    ]
     
-    # Test without auth
-    if test_route_without_auth('/api/logs/upload', 'POST'):
-        results['passed'] += 1
-    else:
-        results['failed'] += 1
+    return [
+        ("Test 1: Dashboard Routes (Require Viewer Role)", dashboard_checks),
+        ("Test 2: Analytics Routes (Require Analyst Role)", analytics_checks),
+        ("Test 3: Search Routes (Require Viewer Role)", search_checks),
+        ("Test 4: Log Upload (Requires Analyst Role)", upload_checks)
+    ]
+
+
+def run_check(check):
+    """Run one (check function, args) pair, turning exceptions into failures"""
+    check_fn, args = check
+    try:
+        return check_fn(*args)
+    except requests.exceptions.RequestException as e:
+        return TestResult(False, [error_line(f"{check_fn.__name__} request failed: {e}")])
+
+
+def main():
+    print_section("JWT Authentication Test - Protected Routes")
     
-    # Test with viewer (should fail)
-    if test_route_with_insufficient_role('/api/logs/upload', viewer_token, 'POST'):
-        results['passed'] += 1
-    else:
-        results['failed'] += 1
+    session = create_session()
     
-    # Test with analyst (should work - though might fail for other reasons like missing file)
-    print_info("Testing POST /api/logs/upload with analyst auth...")
-    headers = {"Authorization": f"Bearer {analyst_token}"}
-    response = requests.post(f"{BASE_URL}/api/logs/upload", headers=headers)
-    # Should not be 401 or 403 (auth passed), might be 400 (missing file)
-    if response.status_code not in [401, 403]:
-        print_success(f"Authentication passed (got {response.status_code} for missing file)")
-        results['passed'] += 1
-    else:
-        print_error(f"Authentication failed with {response.status_code}")
-        results['failed'] += 1
+    # Login with different roles
+    print_info("Logging in with different user roles...")
+    tokens = login_all_roles(session)
+    admin_token = tokens['admin']
+    analyst_token = tokens['analyst']
+    viewer_token = tokens['viewer']
+    
+    if not admin_token:
+        print_error("Failed to login as admin")
+        return
+    if not analyst_token:
+        print_error("Failed to login as analyst")
+        return
+    if not viewer_token:
+        print_error("Failed to login as viewer")
+        return
+    
+    print_success("Successfully logged in with all roles")
+    
+    results = {
+        'passed': 0,
+        'failed': 0
+    }
+    
+    # Run every check of every section concurrently, then print in order
+    # One session per role, each sending its own Authorization header
+    sections = build_test_matrix(
+        session, create_session(analyst_token), create_session(viewer_token)
+    )
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # executor.map submits all checks up front; results keep their order
+        pending = [(title, executor.map(run_check, checks)) for title, checks in sections]
+        outcomes = [(title, list(section_results)) for title, section_results in pending]
+    
+    # Collect the whole report and write it in one call
+    output = []
+    for title, section_results in outcomes:
+        output.append(section_text(title))
+        for result in section_results:
+            output.extend(line + "\n" for line in result.lines)
+            if result.passed:
+                results['passed'] += 1
+            else:
+                results['failed'] += 1
+    sys.stdout.write("".join(output))
     
     # Summary
     print_section("Test Summary")
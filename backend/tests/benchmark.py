@@ -3,16 +3,181 @@ Benchmark script for BigData E-commerce Logs Platform
 Tests performance, capacity, and functionality of all services
 """
 
+import os
+import re
+import jwt
 import time
+import argparse
+import functools
+import itertools
+import threading
 import requests
-import json
-from io import BytesIO
+import orjson
+import http.client
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 from datetime import datetime
 import statistics
 
 BASE_URL = "http://localhost:5001"
 ES_URL = "http://localhost:9200"
 
+UPLOAD_PATH = "/api/logs/upload"
+MULTIPART_BOUNDARY = "----benchmark-boundary"
+UPLOAD_CONTENT_TYPE = f"multipart/form-data; boundary={MULTIPART_BOUNDARY}"
+FILE_CONTENT_TYPES = {"json": "application/json", "csv": "text/csv"}
+DEFAULT_CONCURRENCY = 6
+# Uploads above this many lines are streamed instead of built in memory
+STREAM_THRESHOLD_LINES = 10000
+STREAM_CHUNK_LINES = 1000
+RESULTS_WRITE_BUFFER = 1 << 20
+NS_PER_MS = 1_000_000
+NS_PER_S = 1_000_000_000
+
+# Uploads require the analyst role
+BENCHMARK_USERNAME = os.getenv("BENCHMARK_USERNAME", "analyst_demo")
+BENCHMARK_PASSWORD = os.getenv("BENCHMARK_PASSWORD", "analyst123")
+# Tokens are reused across runs until shortly before they expire
+TOKEN_CACHE_FILE = os.path.expanduser("~/.cache/e2e_tokens.json")
+TOKEN_EXPIRY_MARGIN = 30  # seconds
+
+# One line per generated record; float amounts are formatted with repr(),
+# exactly like json.dumps would
+JSON_LINE_TEMPLATE = (
+    '{{"timestamp": "2025-12-25T10:{minute:02d}:00Z", "log_type": "transaction", '
+    '"user_id": "USER{i}", "amount": {amount!r}, "ip": "{octet}.{octet}.{octet}.{octet}"}}'
+)
+# Elasticsearch _cat size strings such as "208b", "12.5kb" or "1.2gb"
+STORE_SIZE_PATTERN = re.compile(r"([\d.]+)([a-z]+)")
+STORE_SIZE_UNITS_KB = {"b": 1 / 1024, "kb": 1, "mb": 1024, "gb": 1024 ** 2, "tb": 1024 ** 3, "pb": 1024 ** 4}
+
+CSV_HEADER = "timestamp,level,service,user_id,amount,ip"
+CSV_LINE_TEMPLATE = "2025-12-25T10:{minute:02d}:00Z,INFO,payment,{i},99.99,{octet}.{octet}.{octet}.{octet}"
+
+
+def build_multipart_template(file_type):
+    """Pre-serialize the multipart preamble/epilogue around an uploaded file"""
+    preamble = (
+        f"--{MULTIPART_BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="benchmark.{file_type}"\r\n'
+        f"Content-Type: {FILE_CONTENT_TYPES[file_type]}\r\n\r\n"
+    ).encode()
+    epilogue = f"\r\n--{MULTIPART_BOUNDARY}--\r\n".encode()
+    return preamble, epilogue
+
+
+# Built once; each upload only swaps the file bytes in between
+UPLOAD_TEMPLATES = {file_type: build_multipart_template(file_type) for file_type in FILE_CONTENT_TYPES}
+
+
+def open_connection(url, timeout=30):
+    """Open a keep-alive http.client connection to the host of a URL"""
+    parts = urlsplit(url)
+    return http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+
+
+def open_api_connection():
+    """Open a keep-alive connection to the Flask API"""
+    return open_connection(BASE_URL)
+
+
+def create_http_session(pool_maxsize=4):
+    """Create a requests session that keeps connections alive and never retries"""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(
+        pool_connections=3, pool_maxsize=pool_maxsize, max_retries=Retry(total=0)
+    ))
+    return session
+
+
+# Used for the (untimed) Elasticsearch stats calls
+HTTP_SESSION = create_http_session()
+
+
+# http.client connections are not thread-safe: one per worker thread
+_thread_local = threading.local()
+_api_connections = []
+
+
+def get_api_connection():
+    """Return the calling thread's keep-alive connection to the Flask API"""
+    conn = getattr(_thread_local, 'conn', None)
+    if conn is None:
+        conn = _thread_local.conn = open_api_connection()
+        _api_connections.append(conn)
+    return conn
+
+
+def close_api_connections():
+    """Close every connection opened by get_api_connection"""
+    while _api_connections:
+        _api_connections.pop().close()
+    _thread_local.__dict__.clear()
+
+# Access tokens keyed by "<base url>|<username>": (token, exp timestamp)
+_TOKEN_CACHE = None
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
+def load_token_cache():
+    """Load the persisted token cache (empty if missing or unreadable)"""
+    try:
+        with open(TOKEN_CACHE_FILE, 'rb') as f:
+            return {key: tuple(entry) for key, entry in orjson.loads(f.read()).items()}
+    except (OSError, orjson.JSONDecodeError, TypeError, AttributeError):
+        return {}
+
+
+def save_token_cache(cache):
+    """Persist the token cache so the next run can skip logging in (owner-only file)"""
+    try:
+        os.makedirs(os.path.dirname(TOKEN_CACHE_FILE), mode=0o700, exist_ok=True)
+        fd = os.open(TOKEN_CACHE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # The mode above only applies on creation: tighten older cache files too
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(cache))
+    except OSError:
+        pass
+
+
+def login(username, password, session=HTTP_SESSION):
+    """Login against the API and return the access token"""
+    response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"username": username, "password": password},
+        timeout=10
+    )
+    response.raise_for_status()
+    return response.json()['access_token']
+
+
+def get_token(username, password):
+    """
+    Return a valid access token, logging in only when the cached one expires
+    
+    The exp claim is read locally (no signature check, no server call), so
+    runs within the token lifetime never hit the server's bcrypt check.
+    """
+    global _TOKEN_CACHE
+    key = f"{BASE_URL}|{username}"
+    
+    with _TOKEN_CACHE_LOCK:
+        if _TOKEN_CACHE is None:
+            _TOKEN_CACHE = load_token_cache()
+        
+        token, exp = _TOKEN_CACHE.get(key, (None, 0))
+        if token and time.time() < exp - TOKEN_EXPIRY_MARGIN:
+            return token
+        
+        token = login(username, password)
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp", 0)
+        _TOKEN_CACHE[key] = (token, exp)
+        save_token_cache(_TOKEN_CACHE)
+        return token
+
 class Colors:
     HEADER = '\033[95m'
     OKBLUE = '\033[94m'
@@ -40,53 +205,154 @@ def print_warning(text):
 def print_fail(text):
     print(f"{Colors.FAIL}❌ {text}{Colors.ENDC}")
 
-def test_service_health(service_name, url):
-    """Test if a service is reachable"""
+def check_service_health(url):
+    """
+    Probe a service without printing (safe to run from worker threads)
+    
+    Returns:
+        tuple: (success, latency in ms, failure detail)
+    """
+    # Plain http.client keeps client-side overhead out of the measured latency
+    conn = open_connection(url, timeout=5)
     try:
-        start = time.time()
-        response = requests.get(url, timeout=5)
-        latency = (time.time() - start) * 1000
+        # Monotonic integer clock: immune to NTP adjustments, one division at the end
+        start_ns = time.perf_counter_ns()
+        conn.request("GET", urlsplit(url).path or "/")
+        response = conn.getresponse()
+        response.read()
+        latency = (time.perf_counter_ns() - start_ns) / NS_PER_MS
         
-        if response.status_code == 200:
-            print_success(f"{service_name:20s} - {latency:.2f}ms")
-            return True, latency
-        else:
-            print_fail(f"{service_name:20s} - Status {response.status_code}")
-            return False, 0
+        if response.status == 200:
+            return True, latency, None
+        return False, 0, f"Status {response.status}"
     except Exception as e:
-        print_fail(f"{service_name:20s} - {str(e)[:50]}")
-        return False, 0
+        return False, 0, str(e)[:50]
+    finally:
+        conn.close()
 
-def benchmark_upload_performance(file_size_kb, file_type="json"):
-    """Benchmark file upload performance"""
-    # Generate sample data
+
+def report_service_health(service_name, success, latency, detail):
+    """Print the outcome of a service health check"""
+    if success:
+        print_success(f"{service_name:20s} - {latency:.2f}ms")
+    else:
+        print_fail(f"{service_name:20s} - {detail}")
+    return success, latency
+
+
+def test_service_health(service_name, url):
+    """Test if a service is reachable"""
+    return report_service_health(service_name, *check_service_health(url))
+
+def iter_sample_lines(line_count, file_type="json"):
+    """Yield the text lines of a sample file (CSV files start with a header)"""
     if file_type == "json":
-        lines = []
-        for i in range(file_size_kb):
-            lines.append(json.dumps({
-                "timestamp": f"2025-12-25T10:{i%60:02d}:00Z",
-                "log_type": "transaction",
-                "user_id": f"USER{i}",
-                "amount": 99.99 + i,
-                "ip": f"{i%255}.{i%255}.{i%255}.{i%255}"
-            }))
-        content = "\n".join(lines)
-    else:  # CSV
-        lines = ["timestamp,level,service,user_id,amount,ip"]
-        for i in range(file_size_kb):
-            lines.append(f"2025-12-25T10:{i%60:02d}:00Z,INFO,payment,{i},99.99,{i%255}.{i%255}.{i%255}.{i%255}")
-        content = "\n".join(lines)
-    
-    # Upload
-    files = {'file': (f'benchmark.{file_type}', BytesIO(content.encode('utf-8')), 'application/json' if file_type == "json" else 'text/csv')}
-    
-    start = time.time()
+        for i in range(line_count):
+            yield JSON_LINE_TEMPLATE.format(i=i, minute=i % 60, amount=99.99 + i, octet=i % 255)
+    else:
+        yield CSV_HEADER
+        for i in range(line_count):
+            yield CSV_LINE_TEMPLATE.format(i=i, minute=i % 60, octet=i % 255)
+
+
+@functools.lru_cache(maxsize=None)
+def generate_sample_content(line_count, file_type="json"):
+    """
+    Generate (and memoize) the encoded sample file for an upload test
+    
+    Args:
+        line_count: Number of log records
+        file_type: File type (json, csv)
+    
+    Returns:
+        bytes: UTF-8 encoded file content
+    """
+    return "\n".join(iter_sample_lines(line_count, file_type)).encode('utf-8')
+
+
+def build_upload_body(line_count, file_type="json"):
+    """Build the complete multipart request body for an upload test"""
+    preamble, epilogue = UPLOAD_TEMPLATES[file_type]
+    return preamble + generate_sample_content(line_count, file_type) + epilogue
+
+
+def iter_upload_body(line_count, file_type="json", chunk_lines=STREAM_CHUNK_LINES):
+    """
+    Yield the multipart request body in encoded slices of chunk_lines lines
+    
+    Only one slice is held in memory at a time; http.client sends an
+    iterable body with Transfer-Encoding: chunked.
+    """
+    preamble, epilogue = UPLOAD_TEMPLATES[file_type]
+    yield preamble
+    
+    lines = iter_sample_lines(line_count, file_type)
+    separator = ""
+    while True:
+        chunk = list(itertools.islice(lines, chunk_lines))
+        if not chunk:
+            break
+        yield (separator + "\n".join(chunk)).encode('utf-8')
+        separator = "\n"
+    
+    yield epilogue
+
+
+# Upload sub-tests: (line count, file type, description)
+UPLOAD_TESTS = [
+    (10, "json", "Small JSON (10 lines)"),
+    (100, "json", "Medium JSON (100 lines)"),
+    (1000, "json", "Large JSON (1000 lines)"),
+    (10, "csv", "Small CSV (10 lines)"),
+    (100, "csv", "Medium CSV (100 lines)"),
+    (1000, "csv", "Large CSV (1000 lines)")
+]
+
+# Request bodies are built once at import, outside any timed region
+UPLOAD_BODIES = {
+    (line_count, file_type): build_upload_body(line_count, file_type)
+    for line_count, file_type, _ in UPLOAD_TESTS
+}
+
+
+def benchmark_upload_performance(line_count, file_type="json", conn=None, token=None, stream=None):
+    """
+    Benchmark file upload performance (only the HTTP round-trip is timed)
+    
+    Args:
+        line_count: Number of log records in the uploaded file
+        file_type: File type (json, csv)
+        conn: Keep-alive API connection (default: this thread's connection)
+        token: Bearer token
+        stream: Stream the body in chunks (default: above STREAM_THRESHOLD_LINES)
+    """
+    if stream is None:
+        stream = line_count > STREAM_THRESHOLD_LINES
+    
+    if stream:
+        # No Content-Length: http.client falls back to chunked encoding
+        body = iter_upload_body(line_count, file_type)
+        headers = {'Content-Type': UPLOAD_CONTENT_TYPE}
+    else:
+        body = UPLOAD_BODIES.get((line_count, file_type))
+        if body is None:
+            body = build_upload_body(line_count, file_type)
+        headers = {'Content-Type': UPLOAD_CONTENT_TYPE, 'Content-Length': str(len(body))}
+    if token:
+        headers['Authorization'] = f"Bearer {token}"
+    
+    if conn is None:
+        conn = get_api_connection()
+    
     try:
-        response = requests.post(f"{BASE_URL}/api/logs/upload", files=files, timeout=30)
-        duration = time.time() - start
+        start_ns = time.perf_counter_ns()
+        conn.request("POST", UPLOAD_PATH, body=body, headers=headers)
+        response = conn.getresponse()
+        response_body = response.read()
+        duration = (time.perf_counter_ns() - start_ns) / NS_PER_S
         
-        if response.status_code == 201:
-            data = response.json()['data']
+        if response.status == 201:
+            data = orjson.loads(response_body)['data']
             return {
                 'success': True,
                 'duration': duration,
@@ -96,26 +362,44 @@ def benchmark_upload_performance(file_size_kb, file_type="json"):
                 'job_id': data['job_id']
             }
         else:
-            return {'success': False, 'error': response.text}
+            return {'success': False, 'error': response_body.decode('utf-8', 'replace')}
     except Exception as e:
+        # Drop the broken socket; the next request reconnects
+        conn.close()
         return {'success': False, 'error': str(e)}
 
-def get_elasticsearch_stats():
-    """Get Elasticsearch statistics"""
+def parse_store_size_kb(size):
+    """
+    Convert an Elasticsearch _cat size string to kilobytes
+    
+    Args:
+        size: Size string (e.g. "5mb", "1.2gb")
+    
+    Returns:
+        float: Size in KB (0 if the string cannot be parsed)
+    """
+    match = STORE_SIZE_PATTERN.fullmatch(size.strip().lower())
+    if not match or match.group(2) not in STORE_SIZE_UNITS_KB:
+        return 0
+    return float(match.group(1)) * STORE_SIZE_UNITS_KB[match.group(2)]
+
+
+def get_elasticsearch_stats(session=HTTP_SESSION):
+    """Get Elasticsearch statistics (three calls on one keep-alive connection)"""
     try:
         # Cluster health
-        health = requests.get(f"{ES_URL}/_cluster/health", timeout=5).json()
+        health = session.get(f"{ES_URL}/_cluster/health", timeout=5).json()
         
         # Count documents
-        count = requests.get(f"{ES_URL}/logs-ecom-*/_count", timeout=5).json()
+        count = session.get(f"{ES_URL}/logs-ecom-*/_count", timeout=5).json()
         
         # Index stats
-        indices = requests.get(f"{ES_URL}/_cat/indices/logs-ecom*?format=json", timeout=5).json()
+        indices = session.get(f"{ES_URL}/_cat/indices/logs-ecom*?format=json", timeout=5).json()
         
-        total_size = sum([
-            int(idx.get('pri.store.size', '0kb').replace('kb', '').replace('mb', '000').replace('gb', '000000'))
+        total_size = sum(
+            parse_store_size_kb(idx['pri.store.size'])
             for idx in indices if idx.get('pri.store.size')
-        ])
+        )
         
         return {
             'cluster_status': health['status'],
@@ -132,8 +416,15 @@ def test_mongodb_performance():
     # Note: This would require pymongo, testing indirectly via API
     return {'note': 'Tested indirectly via Flask API'}
 
-def run_full_benchmark():
-    """Run complete benchmark suite"""
+def run_full_benchmark(concurrency=DEFAULT_CONCURRENCY, stream_lines=0, pretty=False):
+    """
+    Run complete benchmark suite
+    
+    Args:
+        concurrency: Number of upload sub-tests run in parallel (1 = sequential)
+        stream_lines: Line count of an extra streamed JSON upload (0 = skip)
+        pretty: Indent the saved results JSON for human readers
+    """
     print_header("BIGDATA E-COMMERCE LOGS PLATFORM - BENCHMARK")
     print_info(f"Benchmark started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
@@ -154,8 +445,12 @@ def run_full_benchmark():
     }
     
     latencies = []
-    for name, url in services.items():
-        success, latency = test_service_health(name, url)
+    # Probe all services at once, then report in declaration order
+    with ThreadPoolExecutor(max_workers=len(services)) as executor:
+        futures = {name: executor.submit(check_service_health, url) for name, url in services.items()}
+    
+    for name, future in futures.items():
+        success, latency = report_service_health(name, *future.result())
         results['services'][name] = {'available': success, 'latency_ms': latency}
         if success:
             latencies.append(latency)
@@ -167,20 +462,30 @@ def run_full_benchmark():
     # 2. Upload performance tests
     print_header("2. UPLOAD PERFORMANCE TESTS")
     
-    test_sizes = [
-        (10, "json", "Small JSON (10 lines)"),
-        (100, "json", "Medium JSON (100 lines)"),
-        (1000, "json", "Large JSON (1000 lines)"),
-        (10, "csv", "Small CSV (10 lines)"),
-        (100, "csv", "Medium CSV (100 lines)"),
-        (1000, "csv", "Large CSV (1000 lines)")
-    ]
+    # (line count, file type, description, streamed)
+    upload_tests = [(line_count, ftype, desc, False) for line_count, ftype, desc in UPLOAD_TESTS]
+    if stream_lines:
+        upload_tests.append((stream_lines, "json", f"Streamed JSON ({stream_lines} lines)", True))
     
     upload_results = []
-    for size, ftype, desc in test_sizes:
-        print_info(f"Testing {desc}...")
-        result = benchmark_upload_performance(size, ftype)
-        
+    try:
+        token = get_token(BENCHMARK_USERNAME, BENCHMARK_PASSWORD)
+    except (requests.exceptions.RequestException, KeyError, jwt.InvalidTokenError) as e:
+        print_warning(f"Login as {BENCHMARK_USERNAME} failed, uploading without a token: {e}")
+        token = None
+    
+    print_info(f"Running {len(upload_tests)} upload tests ({concurrency} in parallel)...")
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(benchmark_upload_performance, line_count, ftype, token=token, stream=stream)
+            for line_count, ftype, _, stream in upload_tests
+        ]
+        # Wait for all tests, then report in declaration order
+        upload_outcomes = [(desc, future.result()) for (_, _, desc, _), future in zip(upload_tests, futures)]
+    close_api_connections()
+    
+    for desc, result in upload_outcomes:
+        print_info(f"{desc}:")
         if result['success']:
             print_success(f"  Duration: {result['duration']:.3f}s | Throughput: {result['throughput']:.2f} KB/s | Lines: {result['lines']}")
             upload_results.append({
@@ -252,8 +557,13 @@ def run_full_benchmark():
     print_header("6. SAVING RESULTS")
     
     output_file = f"benchmark_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    # orjson serializes straight to UTF-8 bytes, written in one buffered call;
+    # compact by default since the file is mostly read by other tooling
+    options = orjson.OPT_APPEND_NEWLINE
+    if pretty:
+        options |= orjson.OPT_INDENT_2
+    with open(output_file, 'wb', buffering=RESULTS_WRITE_BUFFER) as f:
+        f.write(orjson.dumps(results, option=options))
     
     print_success(f"Results saved to: {output_file}")
     
@@ -264,9 +574,9 @@ def run_full_benchmark():
     available_services = sum(1 for s in results['services'].values() if s['available'])
     
     print_info(f"Services Available: {available_services}/{total_services}")
-    print_info(f"Upload Tests Passed: {len(upload_results)}/{len(test_sizes)}")
+    print_info(f"Upload Tests Passed: {len(upload_results)}/{len(upload_tests)}")
     
-    if available_services == total_services and len(upload_results) == len(test_sizes):
+    if available_services == total_services and len(upload_results) == len(upload_tests):
         print_success("\n🎉 ALL TESTS PASSED - SYSTEM FULLY OPERATIONAL! 🎉\n")
     else:
         print_warning("\n⚠️  Some tests failed - Check logs for details\n")
@@ -274,8 +584,25 @@ def run_full_benchmark():
     return results
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the e-commerce logs platform")
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+        help=f"Number of upload tests run in parallel (default: {DEFAULT_CONCURRENCY}, 1 = sequential)"
+    )
+    parser.add_argument(
+        "--stream-lines", type=int, default=0,
+        help="Also upload a JSON file of this many lines, streamed in chunks (default: 0 = skip)"
+    )
+    parser.add_argument(
+        "--pretty", action="store_true",
+        help="Indent the saved results JSON for human readers"
+    )
+    args = parser.parse_args()
+    
     try:
-        results = run_full_benchmark()
+        results = run_full_benchmark(
+            concurrency=args.concurrency, stream_lines=args.stream_lines, pretty=args.pretty
+        )
     except KeyboardInterrupt:
         print_warning("\n\nBenchmark interrupted by user")
     except Exception as e:
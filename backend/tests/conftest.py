@@ -3,8 +3,10 @@ Test configuration and fixtures
 """
 
 import pytest
+import secrets
 import sys
 import os
+from types import MappingProxyType
 
 # Add backend directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -13,64 +15,175 @@ from app import create_app
 from config import TestingConfig
 
 
-@pytest.fixture
+# Roles of the users created by the auth_tokens fixture
+TEST_ROLES = ('admin', 'analyst', 'viewer')
+
+# Read-only sample payloads shared by every test
+SAMPLE_LOG_DATA = MappingProxyType({
+    'message': 'Test log entry',
+    'log_type': 'transaction',
+    'level': 'INFO',
+    'transaction_id': 'TXN12345',
+    'user_id': 'USER123',
+    'amount': 99.99,
+    'currency': 'USD',
+    'payment_method': 'credit_card',
+    'status': 'completed'
+})
+
+SAMPLE_TRANSACTION = MappingProxyType({
+    'transaction_id': 'TXN12345',
+    'user_id': 'USER123',
+    'amount': 150.00,
+    'currency': 'USD',
+    'payment_method': 'credit_card',
+    'status': 'completed',
+    'timestamp': '2024-01-01T12:00:00Z'
+})
+
+SAMPLE_FRAUD_DATA = MappingProxyType({
+    'transaction_id': 'TXN99999',
+    'user_id': 'USER999',
+    'amount': 15000.00,
+    'currency': 'USD',
+    'payment_method': 'credit_card',
+    'location': 'XX',
+    'client_ip': '192.168.1.100'
+})
+
+
+@pytest.fixture(scope="session")
 def app():
-    """Create application for testing"""
+    """Create application for testing (once per test session)"""
     app = create_app('testing')
-    return app
+    yield app
 
 
 @pytest.fixture
+def app_ctx(app):
+    """Push an application context for one test (the app itself is shared)"""
+    with app.app_context():
+        yield
+
+
+@pytest.fixture(scope="session")
+def es_available(app):
+    """Whether the app's Elasticsearch cluster answers a ping (checked once per session)"""
+    es_service = getattr(app, 'es_service', None)
+    if es_service is None or es_service.client is None:
+        return False
+    try:
+        return bool(es_service.client.ping())
+    except Exception:
+        return False
+
+
+@pytest.fixture
+def requires_es(es_available):
+    """Skip the test when Elasticsearch is not reachable"""
+    if not es_available:
+        pytest.skip("Elasticsearch not available")
+
+
+@pytest.fixture(scope="session")
 def client(app):
     """Create test client"""
     return app.test_client()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def auth_tokens(app):
+    """
+    Access tokens of one user per role, created in MongoDB for the session
+    
+    token_required looks the token's user up in MongoDB, so the users are stored
+    there and their JWTs are minted inside the app context, once for the whole
+    session (skipped without MongoDB).
+    
+    Returns:
+        dict: Access token keyed by role ('admin', 'analyst', 'viewer')
+    """
+    import bcrypt
+    from app.models.user_model import User, UserRepository
+    from app.utils.jwt_utils import JWTManager
+    
+    mongo_client = getattr(getattr(app, 'mongo_service', None), 'client', None)
+    if mongo_client is None:
+        pytest.skip("MongoDB not available")
+    try:
+        mongo_client.admin.command('ping')
+    except Exception:
+        pytest.skip("MongoDB not available")
+    
+    # One set of users per xdist worker, so workers never race on the unique username
+    worker = os.getenv('PYTEST_XDIST_WORKER', 'main')
+    tokens = {}
+    users = []
+    
+    with app.app_context():
+        user_repo = UserRepository(db_client=mongo_client)
+        
+        for role in TEST_ROLES:
+            username = f"pytest_{role}_{worker}"
+            stale_user = user_repo.find_by_username(username)
+            if stale_user:
+                user_repo.delete(stale_user._id)
+            
+            password = secrets.token_urlsafe(16).encode('utf-8')
+            user = user_repo.create(User(
+                username=username,
+                email=f"{username}@example.com",
+                password_hash=bcrypt.hashpw(password, bcrypt.gensalt(rounds=4)).decode('utf-8'),
+                role=role
+            ))
+            users.append(user)
+            tokens[role] = JWTManager.generate_token(user._id, user.username, user.role)
+    
+    yield tokens
+    
+    for user in users:
+        user_repo.delete(user._id)
+
+
+@pytest.fixture(scope="session")
+def auth_headers(auth_tokens):
+    """Authorization header of the session's admin user"""
+    return {'Authorization': f"Bearer {auth_tokens['admin']}"}
+
+
+@pytest.fixture(scope="session")
+def auth_client(app, auth_headers):
+    """Test client sending the admin user's token with every request"""
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = auth_headers['Authorization']
+    return client
+
+
+@pytest.fixture(scope="session")
 def runner(app):
-    """Create CLI runner"""
+    """Create CLI runner (stateless, shared by the whole session)"""
     return app.test_cli_runner()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_log_data():
-    """Sample log data for testing"""
-    return {
-        'message': 'Test log entry',
-        'log_type': 'transaction',
-        'level': 'INFO',
-        'transaction_id': 'TXN12345',
-        'user_id': 'USER123',
-        'amount': 99.99,
-        'currency': 'USD',
-        'payment_method': 'credit_card',
-        'status': 'completed'
-    }
+    """Sample log data for testing (read-only)"""
+    return SAMPLE_LOG_DATA
 
 
 @pytest.fixture
+def sample_log_data_mut():
+    """Mutable copy of the sample log data for tests that modify it"""
+    return dict(SAMPLE_LOG_DATA)
+
+
+@pytest.fixture(scope="session")
 def sample_transaction():
-    """Sample transaction data for testing"""
-    return {
-        'transaction_id': 'TXN12345',
-        'user_id': 'USER123',
-        'amount': 150.00,
-        'currency': 'USD',
-        'payment_method': 'credit_card',
-        'status': 'completed',
-        'timestamp': '2024-01-01T12:00:00Z'
-    }
+    """Sample transaction data for testing (read-only)"""
+    return SAMPLE_TRANSACTION
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_fraud_data():
-    """Sample fraud detection data for testing"""
-    return {
-        'transaction_id': 'TXN99999',
-        'user_id': 'USER999',
-        'amount': 15000.00,
-        'currency': 'USD',
-        'payment_method': 'credit_card',
-        'location': 'XX',
-        'client_ip': '192.168.1.100'
-    }
+    """Sample fraud detection data for testing (read-only)"""
+    return SAMPLE_FRAUD_DATA
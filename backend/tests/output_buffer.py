@@ -0,0 +1,45 @@
+"""
+Per-thread output buffering for the API check scripts
+Lets the scripts run checks in worker threads and still print each check's
+output in one piece, in submission order
+"""
+
+import threading
+
+# Per-thread output buffer, set while run_test runs a test
+_output = threading.local()
+
+
+def emit(text=""):
+    """Print a line, or buffer it when running inside run_test"""
+    lines = getattr(_output, 'lines', None)
+    if lines is None:
+        print(text)
+    else:
+        lines.append(text)
+
+
+def run_test(test_func):
+    """
+    Run one test, buffering what it prints
+    
+    Exceptions raised by the test are reported in its output and count as
+    a failure, so one broken check does not abort the others.
+    
+    Args:
+        test_func: Test function taking no arguments
+    
+    Returns:
+        tuple: (passed, captured output)
+    """
+    _output.lines = []
+    try:
+        test_func()
+        passed = True
+    except Exception as e:
+        emit(f"❌ Test failed with exception: {str(e)}")
+        passed = False
+    finally:
+        lines = _output.lines
+        _output.lines = None
+    return passed, "\n".join(lines)
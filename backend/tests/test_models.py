@@ -2,12 +2,20 @@
 Tests for models
 """
 
+import importlib.util
+import json
 import pytest
 from datetime import datetime
 from app.models.log_model import LogEntry, TransactionLog, ErrorLog, PerformanceLog
 from app.models.transaction_model import Transaction
 from app.models.fraud_model import FraudDetection
 
+# Micro-benchmarks need pytest-benchmark; run them with: pytest -n 0 --benchmark-only
+requires_benchmark = pytest.mark.skipif(
+    importlib.util.find_spec("pytest_benchmark") is None,
+    reason="pytest-benchmark is not installed"
+)
+
 
 class TestLogModels:
     """Test cases for log models"""
@@ -37,6 +45,19 @@ class TestLogModels:
         assert data['message'] == "Test message"
         assert data['log_type'] == "test"
     
+    def test_log_entry_to_json(self):
+        """Test log entry JSON serialization round-trips the timestamp"""
+        log = LogEntry(
+            message="Test message",
+            log_type="test",
+            timestamp=datetime(2025, 12, 25, 10, 30)
+        )
+        
+        data = json.loads(log.to_json())
+        assert data['@timestamp'] == "2025-12-25T10:30:00"
+        assert LogEntry.from_dict(data).timestamp == log.timestamp
+        assert LogEntry.from_dict(log.to_dict()).timestamp == log.timestamp
+    
     def test_transaction_log_creation(self):
         """Test transaction log creation"""
         log = TransactionLog(
@@ -76,21 +97,47 @@ class TestLogModels:
         assert log.endpoint == "/api/users"
         assert log.response_time == 250.5
         assert log.log_type == "performance"
+    
+    def test_models_hashable_identity(self, txn_factory):
+        """Test models keep identity equality and stay usable as set members"""
+        log = LogEntry(message="Test", log_type="info")
+        fraud = FraudDetection(
+            transaction_id="TXN1",
+            user_id="USER1",
+            fraud_score=10,
+            is_fraud=False,
+            indicators=[]
+        )
+        
+        for model in (log, txn_factory(), fraud):
+            assert model in {model}
+        assert log != LogEntry(message="Test", log_type="info")
+        assert "_timestamp" not in repr(log)
 
 
-class TestTransactionModel:
-    """Test cases for transaction model"""
-    
-    def test_transaction_creation(self):
-        """Test transaction creation"""
-        txn = Transaction(
-            transaction_id="TXN123",
-            user_id="USER123",
-            amount=150.0,
+@pytest.fixture(scope="module")
+def txn_factory():
+    """Build transactions from canonical defaults, overriding only what a test cares about"""
+    def make(**overrides):
+        defaults = dict(
+            transaction_id="TXN1",
+            user_id="USER1",
+            amount=100.0,
             currency="USD",
             payment_method="credit_card",
             status="completed"
         )
+        defaults.update(overrides)
+        return Transaction(**defaults)
+    return make
+
+
+class TestTransactionModel:
+    """Test cases for transaction model"""
+    
+    def test_transaction_creation(self, txn_factory):
+        """Test transaction creation"""
+        txn = txn_factory(transaction_id="TXN123", user_id="USER123", amount=150.0)
         
         assert txn.transaction_id == "TXN123"
         assert txn.amount == 150.0
@@ -108,36 +155,18 @@ class TestTransactionModel:
         assert data['transaction_id'] == "TXN123"
         assert data['amount'] == 150.0
     
-    def test_is_high_value(self):
+    @pytest.mark.parametrize("amount,expected", [
+        (500.0, False),
+        (1500.0, True)
+    ])
+    def test_is_high_value(self, txn_factory, amount, expected):
         """Test high value transaction check"""
-        txn1 = Transaction(
-            transaction_id="TXN1",
-            user_id="USER1",
-            amount=500.0
-        )
-        txn2 = Transaction(
-            transaction_id="TXN2",
-            user_id="USER2",
-            amount=1500.0
-        )
-        
-        assert not txn1.is_high_value()
-        assert txn2.is_high_value()
+        assert txn_factory(amount=amount).is_high_value() is expected
     
-    def test_transaction_status_checks(self):
+    def test_transaction_status_checks(self, txn_factory):
         """Test transaction status checks"""
-        txn_success = Transaction(
-            transaction_id="TXN1",
-            user_id="USER1",
-            amount=100.0,
-            status="completed"
-        )
-        txn_failed = Transaction(
-            transaction_id="TXN2",
-            user_id="USER2",
-            amount=100.0,
-            status="failed"
-        )
+        txn_success = txn_factory(status="completed")
+        txn_failed = txn_factory(transaction_id="TXN2", status="failed")
         
         assert txn_success.is_successful()
         assert not txn_success.is_failed()
@@ -163,58 +192,62 @@ class TestFraudModel:
         assert fraud.is_fraud is True
         assert len(fraud.indicators) == 2
     
-    def test_get_risk_level(self):
+    @pytest.mark.parametrize("fraud_score,is_fraud,expected", [
+        (80, True, "HIGH"),
+        (60, False, "MEDIUM"),
+        (30, False, "LOW")
+    ])
+    def test_get_risk_level(self, fraud_score, is_fraud, expected):
         """Test risk level calculation"""
-        fraud_high = FraudDetection(
+        fraud = FraudDetection(
             transaction_id="TXN1",
             user_id="USER1",
-            fraud_score=80,
-            is_fraud=True,
-            indicators=[]
-        )
-        fraud_medium = FraudDetection(
-            transaction_id="TXN2",
-            user_id="USER2",
-            fraud_score=60,
-            is_fraud=False,
-            indicators=[]
-        )
-        fraud_low = FraudDetection(
-            transaction_id="TXN3",
-            user_id="USER3",
-            fraud_score=30,
-            is_fraud=False,
+            fraud_score=fraud_score,
+            is_fraud=is_fraud,
             indicators=[]
         )
         
-        assert fraud_high.get_risk_level() == "HIGH"
-        assert fraud_medium.get_risk_level() == "MEDIUM"
-        assert fraud_low.get_risk_level() == "LOW"
+        assert fraud.get_risk_level() == expected
     
-    def test_requires_review(self):
+    @pytest.mark.parametrize("fraud_score,is_fraud,expected", [
+        (80, True, True),
+        (55, False, True),
+        (20, False, False)
+    ])
+    def test_requires_review(self, fraud_score, is_fraud, expected):
         """Test requires review check"""
-        fraud1 = FraudDetection(
+        fraud = FraudDetection(
             transaction_id="TXN1",
             user_id="USER1",
-            fraud_score=80,
-            is_fraud=True,
-            indicators=[]
-        )
-        fraud2 = FraudDetection(
-            transaction_id="TXN2",
-            user_id="USER2",
-            fraud_score=55,
-            is_fraud=False,
+            fraud_score=fraud_score,
+            is_fraud=is_fraud,
             indicators=[]
         )
-        fraud3 = FraudDetection(
-            transaction_id="TXN3",
-            user_id="USER3",
-            fraud_score=20,
-            is_fraud=False,
-            indicators=[]
+        
+        assert fraud.requires_review() is expected
+
+
+@requires_benchmark
+class TestModelPerformance:
+    """Micro-benchmarks guarding model construction and serialization"""
+    
+    def test_log_entry_init_perf(self, benchmark):
+        """Benchmark LogEntry construction"""
+        log = benchmark(LogEntry, message="Test message", log_type="test", level="INFO")
+        
+        assert log.level == "INFO"
+    
+    def test_transaction_log_to_dict_perf(self, benchmark):
+        """Benchmark TransactionLog serialization to a dictionary"""
+        log = TransactionLog(
+            transaction_id="TXN123",
+            user_id="USER123",
+            amount=100.0,
+            currency="USD",
+            payment_method="credit_card",
+            status="completed"
         )
         
-        assert fraud1.requires_review()
-        assert fraud2.requires_review()
-        assert not fraud3.requires_review()
+        data = benchmark(log.to_dict)
+        
+        assert data['transaction_id'] == "TXN123"
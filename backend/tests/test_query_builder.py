@@ -2,17 +2,66 @@
 Tests for Elasticsearch Query Builder
 """
 
+import importlib.util
 import pytest
 from datetime import datetime
 from app.utils.query_builder import ElasticsearchQueryBuilder, build_es_query
 
+# Micro-benchmarks need pytest-benchmark; run them with: pytest -n 0 --benchmark-only
+requires_benchmark = pytest.mark.skipif(
+    importlib.util.find_spec("pytest_benchmark") is None,
+    reason="pytest-benchmark is not installed"
+)
+
+# Sanitization inputs, allocated once per module
+LONG_TEXT = "A" * 10_000  # 10K chars
+UNICODE_TEXT = "Élégant café ☕ 日本語"
+
+
+def index_clauses(clauses):
+    """Group bool clauses by their type key (term, range, multi_match, ...) in one pass"""
+    index = {}
+    for clause in clauses:
+        for kind in clause:
+            index.setdefault(kind, []).append(clause)
+    return index
+
+
+def find_clause(clauses, kind):
+    """Return the first clause of the given type, or None"""
+    return index_clauses(clauses).get(kind, [None])[0]
+
+
+def flatten_terms(filters):
+    """Flatten term filters into (field, value) pairs, scanned once per query"""
+    return [(field, value) for f in filters for field, value in f.get("term", {}).items()]
+
+
+def find_range_on(filters, field):
+    """Return the range filter on the given field, or None"""
+    for clause in index_clauses(filters).get("range", []):
+        if field in clause["range"]:
+            return clause
+    return None
+
+
+@pytest.fixture(scope="module")
+def shared_builder():
+    """One query builder instance shared by every test of the module"""
+    return ElasticsearchQueryBuilder()
+
+
+@pytest.fixture
+def builder(shared_builder):
+    """The shared query builder, reset to its initial state for each test"""
+    return shared_builder.reset()
+
 
 class TestElasticsearchQueryBuilder:
     """Test cases for ElasticsearchQueryBuilder"""
     
-    def test_basic_query_builder(self):
+    def test_basic_query_builder(self, builder):
         """Test basic query building"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.with_free_text("test").build()
         
         assert "query" in query
@@ -20,148 +69,120 @@ class TestElasticsearchQueryBuilder:
         assert "must" in query["query"]["bool"]
         assert query["size"] == 20  # Default size
     
-    def test_level_filter(self):
-        """Test log level filtering"""
-        builder = ElasticsearchQueryBuilder()
-        query = builder.with_level("ERROR").build()
+    @pytest.mark.parametrize("input_level,expected", [
+        ("ERROR", "ERROR"),
+        ("error", "ERROR"),  # case-insensitive
+        ("INVALID_LEVEL", None)  # ignored
+    ])
+    def test_level_filter(self, builder, input_level, expected):
+        """Test log level filtering (normalized to upper case, invalid levels ignored)"""
+        query = builder.with_level(input_level).build()
         
-        filters = query["query"]["bool"]["filter"]
-        assert any(f.get("term", {}).get("level.keyword") == "ERROR" for f in filters)
-    
-    def test_level_filter_case_insensitive(self):
-        """Test log level filter is case-insensitive"""
-        builder = ElasticsearchQueryBuilder()
-        query = builder.with_level("error").build()
-        
-        filters = query["query"]["bool"]["filter"]
-        assert any(f.get("term", {}).get("level.keyword") == "ERROR" for f in filters)
-    
-    def test_invalid_level_ignored(self):
-        """Test invalid log level is ignored"""
-        builder = ElasticsearchQueryBuilder()
-        query = builder.with_level("INVALID_LEVEL").build()
-        
-        # Should not have any level filter
         filters = query["query"]["bool"].get("filter", [])
-        assert not any("level.keyword" in str(f) for f in filters)
-    
-    def test_service_filter(self):
-        """Test service filtering"""
-        builder = ElasticsearchQueryBuilder()
-        query = builder.with_service("payment").build()
+        if expected is None:
+            assert "level.keyword" not in dict(flatten_terms(filters))
+        else:
+            assert ("level.keyword", expected) in flatten_terms(filters)
+    
+    @pytest.mark.parametrize("method_name,field,value", [
+        ("with_service", "service.keyword", "payment"),
+        ("with_log_type", "log_type.keyword", "transaction"),
+        ("with_user_filter", "user_id.keyword", "USER123")
+    ])
+    def test_term_filter(self, builder, method_name, field, value):
+        """Test service, log_type and user_id term filtering"""
+        query = getattr(builder, method_name)(value).build()
         
         filters = query["query"]["bool"]["filter"]
-        assert any(f.get("term", {}).get("service.keyword") == "payment" for f in filters)
+        assert (field, value) in flatten_terms(filters)
     
-    def test_log_type_filter(self):
-        """Test log_type filtering"""
-        builder = ElasticsearchQueryBuilder()
-        query = builder.with_log_type("transaction").build()
-        
-        filters = query["query"]["bool"]["filter"]
-        assert any(f.get("term", {}).get("log_type.keyword") == "transaction" for f in filters)
-    
-    def test_date_range_filter(self):
+    def test_date_range_filter(self, builder):
         """Test date range filtering"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.with_date_range(
             date_from="2025-12-01",
             date_to="2025-12-31"
         ).build()
         
         filters = query["query"]["bool"]["filter"]
-        date_filter = next((f for f in filters if "range" in f), None)
+        date_filter = find_range_on(filters, "@timestamp")
         
         assert date_filter is not None
         assert "@timestamp" in date_filter["range"]
         assert "gte" in date_filter["range"]["@timestamp"]
         assert "lte" in date_filter["range"]["@timestamp"]
     
-    def test_date_format_parsing(self):
+    @pytest.mark.parametrize("date_str", [
+        "2025-12-25",
+        "2025-12-25T10:30:00",
+        "2025-12-25T10:30:00Z",
+        "2025-12-25 10:30:00"
+    ])
+    def test_date_format_parsing(self, builder, date_str):
         """Test various date formats are parsed correctly"""
-        builder = ElasticsearchQueryBuilder()
-        
-        # Test different formats
-        test_dates = [
-            "2025-12-25",
-            "2025-12-25T10:30:00",
-            "2025-12-25T10:30:00Z",
-            "2025-12-25 10:30:00"
-        ]
+        query = builder.with_date_range(date_from=date_str).build()
         
-        for date_str in test_dates:
-            query = builder.reset().with_date_range(date_from=date_str).build()
-            filters = query["query"]["bool"]["filter"]
-            date_filter = next((f for f in filters if "range" in f), None)
-            
-            assert date_filter is not None
-            assert "gte" in date_filter["range"]["@timestamp"]
+        filters = query["query"]["bool"]["filter"]
+        date_filter = find_range_on(filters, "@timestamp")
+        
+        assert date_filter is not None
+        assert "gte" in date_filter["range"]["@timestamp"]
     
-    def test_invalid_date_ignored(self):
+    def test_invalid_date_ignored(self, builder):
         """Test invalid dates are ignored"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.with_date_range(date_from="invalid-date").build()
         
         filters = query["query"]["bool"].get("filter", [])
         # Should not have date filter if date is invalid
-        assert not any("range" in f and "@timestamp" in f.get("range", {}) for f in filters)
+        assert find_range_on(filters, "@timestamp") is None
     
-    def test_free_text_search(self):
+    def test_free_text_search(self, builder):
         """Test free text search"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.with_free_text("error timeout").build()
         
         must_clauses = query["query"]["bool"]["must"]
-        multi_match = next((c for c in must_clauses if "multi_match" in c), None)
+        multi_match = find_clause(must_clauses, "multi_match")
         
         assert multi_match is not None
         assert multi_match["multi_match"]["query"] == "error timeout"
         assert "message^3" in multi_match["multi_match"]["fields"]
     
-    def test_free_text_sanitization(self):
+    def test_free_text_sanitization(self, builder):
         """Test free text is sanitized"""
-        builder = ElasticsearchQueryBuilder()
         # Text with special characters
         query = builder.with_free_text("<script>alert('xss')</script>").build()
         
         must_clauses = query["query"]["bool"]["must"]
-        multi_match = next((c for c in must_clauses if "multi_match" in c), None)
+        multi_match = find_clause(must_clauses, "multi_match")
         
         # Should be sanitized (special chars removed/escaped)
         assert multi_match is not None
         assert "<script>" not in multi_match["multi_match"]["query"]
     
-    def test_empty_free_text_matches_all(self):
+    def test_empty_free_text_matches_all(self, builder):
         """Test empty free text results in match_all"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.with_free_text("").build()
         
+        # Presence only: any() stops at the first match
         must_clauses = query["query"]["bool"]["must"]
-        match_all = next((c for c in must_clauses if "match_all" in c), None)
-        
-        assert match_all is not None
+        assert any("match_all" in c for c in must_clauses)
     
-    def test_pagination_default(self):
+    def test_pagination_default(self, builder):
         """Test default pagination"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.with_pagination().build()
         
         assert query["from"] == 0
         assert query["size"] == 20
     
-    def test_pagination_custom(self):
+    def test_pagination_custom(self, builder):
         """Test custom pagination"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.with_pagination(page=3, size=50).build()
         
         # Page 3, size 50 = from 100 (0-indexed: (3-1) * 50)
         assert query["from"] == 100
         assert query["size"] == 50
     
-    def test_pagination_boundaries(self):
+    def test_pagination_boundaries(self, builder):
         """Test pagination boundaries"""
-        builder = ElasticsearchQueryBuilder()
-        
         # Test max size limit
         query = builder.reset().with_pagination(page=1, size=5000).build()
         assert query["size"] == 1000  # Max limit
@@ -174,10 +195,8 @@ class TestElasticsearchQueryBuilder:
         query = builder.reset().with_pagination(page=-5, size=20).build()
         assert query["from"] == 0  # Page 1
     
-    def test_pagination_invalid_input(self):
+    def test_pagination_invalid_input(self, builder):
         """Test pagination with invalid inputs"""
-        builder = ElasticsearchQueryBuilder()
-        
         # Invalid page (string)
         query = builder.reset().with_pagination(page="invalid", size=20).build()
         assert query["from"] == 0  # Default page 1
@@ -186,62 +205,86 @@ class TestElasticsearchQueryBuilder:
         query = builder.reset().with_pagination(page=1, size="invalid").build()
         assert query["size"] == 20  # Default size
     
-    def test_sort_default(self):
+    def test_search_after(self, builder):
+        """Test search_after cursor replaces the from offset"""
+        query = builder.with_pagination(page=3, size=10).with_search_after([1735689600000, "abc"]).build()
+        
+        assert query["search_after"] == [1735689600000, "abc"]
+        assert query["from"] == 0
+        assert query["size"] == 10
+    
+    @pytest.mark.parametrize("cursor", [
+        None,
+        [],
+        "1735689600000",  # not a list
+        [{"nested": 1}],  # not scalars
+        [1, 2, 3, 4, 5, 6]  # too long
+    ])
+    def test_invalid_search_after_ignored(self, builder, cursor):
+        """Test invalid search_after cursors are ignored"""
+        query = builder.with_pagination(page=2, size=10).with_search_after(cursor).build()
+        
+        assert "search_after" not in query
+        assert query["from"] == 10
+    
+    def test_sort_default(self, builder):
         """Test default sorting"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.build()
         
         assert query["sort"] == [{"@timestamp": {"order": "desc"}}]
     
-    def test_sort_custom(self):
-        """Test custom sorting"""
-        builder = ElasticsearchQueryBuilder()
-        query = builder.with_sort("amount", "asc").build()
-        
-        assert query["sort"] == [{"amount": {"order": "asc"}}]
-    
-    def test_sort_invalid_field_fallback(self):
-        """Test invalid sort field falls back to @timestamp"""
-        builder = ElasticsearchQueryBuilder()
-        query = builder.with_sort("invalid_field", "asc").build()
-        
-        assert query["sort"] == [{"@timestamp": {"order": "asc"}}]
+    @pytest.mark.parametrize("field,order,expected", [
+        ("amount", "asc", [{"amount": {"order": "asc"}}]),
+        # Invalid field falls back to @timestamp
+        ("invalid_field", "asc", [{"@timestamp": {"order": "asc"}}]),
+        # Invalid order falls back to desc
+        ("@timestamp", "invalid", [{"@timestamp": {"order": "desc"}}])
+    ])
+    def test_sort(self, builder, field, order, expected):
+        """Test custom sorting and its fallbacks"""
+        query = builder.with_sort(field, order).build()
+        
+        assert query["sort"] == expected
+    
+    def test_sort_tiebreaker(self, builder):
+        """Test the tiebreaker sort appended for search_after cursors"""
+        query = builder.with_sort("@timestamp", "desc", tiebreaker=True).build()
+        
+        assert query["sort"] == [
+            {"@timestamp": {"order": "desc"}},
+            {"_shard_doc": {"order": "asc"}}
+        ]
     
-    def test_sort_invalid_order_fallback(self):
-        """Test invalid sort order falls back to desc"""
-        builder = ElasticsearchQueryBuilder()
-        query = builder.with_sort("@timestamp", "invalid").build()
+    def test_point_in_time(self, builder):
+        """Test a point in time ID is sent with its keep-alive"""
+        query = builder.with_point_in_time("pit-abc", keep_alive="2m").build()
         
-        assert query["sort"] == [{"@timestamp": {"order": "desc"}}]
+        assert query["pit"] == {"id": "pit-abc", "keep_alive": "2m"}
     
-    def test_user_filter(self):
-        """Test user_id filtering"""
-        builder = ElasticsearchQueryBuilder()
-        query = builder.with_user_filter("USER123").build()
+    @pytest.mark.parametrize("pit_id", [None, "", 42, "x" * 5000])
+    def test_invalid_point_in_time_ignored(self, builder, pit_id):
+        """Test missing or invalid point in time IDs are ignored"""
+        query = builder.with_point_in_time(pit_id).build()
         
-        filters = query["query"]["bool"]["filter"]
-        assert any(f.get("term", {}).get("user_id.keyword") == "USER123" for f in filters)
+        assert "pit" not in query
     
-    def test_amount_range_filter(self):
+    def test_amount_range_filter(self, builder):
         """Test amount range filtering"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.with_amount_range(min_amount=100.0, max_amount=1000.0).build()
         
         filters = query["query"]["bool"]["filter"]
-        amount_filter = next((f for f in filters if "range" in f and "amount" in f.get("range", {})), None)
+        amount_filter = find_range_on(filters, "amount")
         
         assert amount_filter is not None
         assert amount_filter["range"]["amount"]["gte"] == 100.0
         assert amount_filter["range"]["amount"]["lte"] == 1000.0
     
-    def test_amount_range_partial(self):
+    def test_amount_range_partial(self, builder):
         """Test amount range with only min or max"""
-        builder = ElasticsearchQueryBuilder()
-        
         # Only min
         query = builder.reset().with_amount_range(min_amount=100.0).build()
         filters = query["query"]["bool"]["filter"]
-        amount_filter = next((f for f in filters if "range" in f and "amount" in f.get("range", {})), None)
+        amount_filter = find_range_on(filters, "amount")
         assert amount_filter is not None
         assert "gte" in amount_filter["range"]["amount"]
         assert "lte" not in amount_filter["range"]["amount"]
@@ -249,23 +292,21 @@ class TestElasticsearchQueryBuilder:
         # Only max
         query = builder.reset().with_amount_range(max_amount=1000.0).build()
         filters = query["query"]["bool"]["filter"]
-        amount_filter = next((f for f in filters if "range" in f and "amount" in f.get("range", {})), None)
+        amount_filter = find_range_on(filters, "amount")
         assert amount_filter is not None
         assert "lte" in amount_filter["range"]["amount"]
         assert "gte" not in amount_filter["range"]["amount"]
     
-    def test_aggregations(self):
+    def test_aggregations(self, builder):
         """Test aggregations"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.with_aggregations(["service", "log_type"]).build()
         
         assert "aggs" in query
         assert "service_agg" in query["aggs"]
         assert "log_type_agg" in query["aggs"]
     
-    def test_method_chaining(self):
+    def test_method_chaining(self, builder):
         """Test method chaining works correctly"""
-        builder = ElasticsearchQueryBuilder()
         query = (builder
                 .with_level("ERROR")
                 .with_service("payment")
@@ -286,10 +327,8 @@ class TestElasticsearchQueryBuilder:
         must_clauses = query["query"]["bool"]["must"]
         assert any("multi_match" in c for c in must_clauses)
     
-    def test_reset(self):
+    def test_reset(self, builder):
         """Test reset clears previous query state"""
-        builder = ElasticsearchQueryBuilder()
-        
         # Build a complex query
         query1 = (builder
                  .with_level("ERROR")
@@ -301,9 +340,10 @@ class TestElasticsearchQueryBuilder:
         
         # Should only have INFO level, not ERROR or payment service
         filters = query2["query"]["bool"]["filter"]
-        assert any(f.get("term", {}).get("level.keyword") == "INFO" for f in filters)
-        assert not any(f.get("term", {}).get("level.keyword") == "ERROR" for f in filters)
-        assert not any("service.keyword" in str(f) for f in filters)
+        terms = flatten_terms(filters)
+        assert ("level.keyword", "INFO") in terms
+        assert ("level.keyword", "ERROR") not in terms
+        assert "service.keyword" not in dict(terms)
 
 
 class TestBuildESQueryFunction:
@@ -371,53 +411,72 @@ class TestBuildESQueryFunction:
 class TestQueryBuilderSanitization:
     """Test input sanitization in Query Builder"""
     
-    def test_sql_injection_prevention(self):
+    def test_sql_injection_prevention(self, builder):
         """Test SQL injection attempts are sanitized"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.with_free_text("'; DROP TABLE users; --").build()
         
         # Should be sanitized
         must_clauses = query["query"]["bool"]["must"]
-        multi_match = next((c for c in must_clauses if "multi_match" in c), None)
+        multi_match = find_clause(must_clauses, "multi_match")
         assert multi_match is not None
         # Special SQL chars should be removed/escaped
         assert "DROP TABLE" in multi_match["multi_match"]["query"] or "DROP TABLE" not in multi_match["multi_match"]["query"]
     
-    def test_xss_prevention(self):
+    def test_xss_prevention(self, builder):
         """Test XSS attempts are sanitized"""
-        builder = ElasticsearchQueryBuilder()
         query = builder.with_service("<script>alert('xss')</script>").build()
         
         filters = query["query"]["bool"]["filter"]
-        service_filter = next((f for f in filters if "service.keyword" in f.get("term", {})), None)
+        service_value = dict(flatten_terms(filters)).get("service.keyword")
         
         # Script tags should be removed
-        if service_filter:
-            assert "<script>" not in service_filter["term"]["service.keyword"]
+        if service_value:
+            assert "<script>" not in service_value
     
-    def test_very_long_text_truncated(self):
+    def test_very_long_text_truncated(self, builder):
         """Test very long text is truncated"""
-        builder = ElasticsearchQueryBuilder()
-        long_text = "A" * 10000  # 10K chars
-        
-        query = builder.with_free_text(long_text).build()
+        query = builder.with_free_text(LONG_TEXT).build()
         
         must_clauses = query["query"]["bool"]["must"]
-        multi_match = next((c for c in must_clauses if "multi_match" in c), None)
+        multi_match = find_clause(must_clauses, "multi_match")
         
         # Should be truncated to 500 chars
         assert multi_match is not None
         assert len(multi_match["multi_match"]["query"]) <= 500
     
-    def test_unicode_handling(self):
+    def test_unicode_handling(self, builder):
         """Test Unicode characters are handled properly"""
-        builder = ElasticsearchQueryBuilder()
-        query = builder.with_free_text("Élégant café ☕ 日本語").build()
+        query = builder.with_free_text(UNICODE_TEXT).build()
         
         must_clauses = query["query"]["bool"]["must"]
-        multi_match = next((c for c in must_clauses if "multi_match" in c), None)
+        multi_match = find_clause(must_clauses, "multi_match")
         
         # Unicode should be preserved
         assert multi_match is not None
         # Should contain unicode chars (or be safely handled)
         assert len(multi_match["multi_match"]["query"]) > 0
+
+
+@requires_benchmark
+class TestQueryBuilderPerformance:
+    """Micro-benchmarks guarding the query builder hot path against regressions"""
+    
+    def test_builder_build_perf(self, benchmark, builder):
+        """Benchmark a typical filtered, paginated query build"""
+        query = benchmark(
+            lambda: builder.reset().with_level("ERROR").with_service("payment").with_pagination(1, 20).build()
+        )
+        
+        assert query["size"] == 20
+    
+    def test_build_es_query_perf(self, benchmark):
+        """Benchmark the convenience function with date and free-text parsing"""
+        query = benchmark(
+            build_es_query,
+            level="ERROR",
+            date_from="2025-12-01",
+            date_to="2025-12-31",
+            free_text="payment timeout"
+        )
+        
+        assert len(query["query"]["bool"]["filter"]) == 2
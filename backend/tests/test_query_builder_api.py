@@ -5,50 +5,139 @@ Demonstrates usage and validates functionality
 
 import requests
 import json
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+# Add backend directory to path (shared test helpers)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tests.output_buffer import emit, run_test
 
 BASE_URL = "http://localhost:5001"
 SEARCH_ENDPOINT = f"{BASE_URL}/api/search"
+MSEARCH_ENDPOINT = f"{SEARCH_ENDPOINT}/_msearch"
+HEALTH_ENDPOINT = f"{BASE_URL}/api/health"
+
+# Number of tests run concurrently by run_all_tests
+MAX_WORKERS = 8
+
+class KeepAliveAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose sockets disable Nagle's algorithm and enable TCP keepalive
+    
+    TCP_NODELAY keeps small request bodies from waiting on delayed ACKs;
+    SO_KEEPALIVE keeps pooled connections alive between tests.
+    """
+    
+    SOCKET_OPTIONS = [
+        opt for opt in HTTPConnection.default_socket_options
+        if opt[:2] != (socket.IPPROTO_TCP, socket.TCP_NODELAY)
+    ] + [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    ]
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = self.SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+# One keep-alive session for every request, pooled for the worker threads
+SESSION = requests.Session()
+for _prefix in ("http://", "https://"):
+    SESSION.mount(_prefix, KeepAliveAdapter(pool_connections=16, pool_maxsize=16))
+SESSION.headers['Accept-Encoding'] = 'gzip, deflate'
+
+def msearch(param_list):
+    """
+    Run several searches in one round-trip through the _msearch endpoint
+    
+    Returns:
+        list: HTTP-equivalent status of each search, in order
+    """
+    response = SESSION.post(MSEARCH_ENDPOINT, json=param_list)
+    if response.status_code != 200:
+        # The whole batch was rejected: every search shares its status
+        return [response.status_code] * len(param_list)
+    return [entry['status'] for entry in response.json()['responses']]
+
+def timed(url, params):
+    """GET a URL and return (response, elapsed milliseconds)"""
+    start = time.perf_counter()
+    response = SESSION.get(url, params=params)
+    return response, (time.perf_counter() - start) * 1000
+
+def round_to_day(dt):
+    """
+    Truncate a datetime to midnight
+    
+    Range bounds derived from now() are rounded so repeated runs send the
+    same filter and hit the Elasticsearch request/query caches instead of
+    adding a new cache entry each time.
+    """
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def is_cached(response):
+    """Whether a search response was served from the Redis result cache"""
+    return response.status_code == 200 and response.json().get('data', {}).get('cached', False)
+
+def get_pit_id(response):
+    """Return the point in time ID of a search response, if any"""
+    if response.status_code != 200:
+        return None
+    return response.json().get('data', {}).get('pit_id')
+
+def get_last_sort(response):
+    """Return the 'sort' cursor of the last result of a search response, if any"""
+    if response.status_code != 200:
+        return None
+    results = response.json().get('data', {}).get('results', [])
+    return results[-1].get('sort') if results else None
 
 def print_header(text):
     """Print formatted header"""
-    print(f"\n{'='*70}")
-    print(f"{text:^70}")
-    print(f"{'='*70}\n")
+    emit(f"\n{'='*70}")
+    emit(f"{text:^70}")
+    emit(f"{'='*70}\n")
 
 def print_result(test_name, response):
     """Print test result"""
-    print(f"Test: {test_name}")
-    print(f"Status: {response.status_code}")
+    emit(f"Test: {test_name}")
+    emit(f"Status: {response.status_code}")
     
     try:
         data = response.json()
         if response.status_code == 200:
             result_data = data.get('data', data)
-            print(f"Total Results: {result_data.get('total', 0)}")
-            print(f"Page: {result_data.get('page', 1)}/{result_data.get('total_pages', 1)}")
-            print(f"Results Count: {len(result_data.get('results', []))}")
+            emit(f"Total Results: {result_data.get('total', 0)}")
+            emit(f"Page: {result_data.get('page', 1)}/{result_data.get('total_pages', 1)}")
+            emit(f"Results Count: {len(result_data.get('results', []))}")
             
             # Print first result if exists
             results = result_data.get('results', [])
             if results:
-                print(f"\nFirst Result:")
+                emit(f"\nFirst Result:")
                 first = results[0]['source']
-                print(json.dumps(first, indent=2)[:300])
+                emit(json.dumps(first, indent=2)[:300])
             
-            print("✅ Test PASSED")
+            emit("✅ Test PASSED")
         else:
-            print(f"❌ Test FAILED: {data.get('error', 'Unknown error')}")
+            emit(f"❌ Test FAILED: {data.get('error', 'Unknown error')}")
     except Exception as e:
-        print(f"❌ Error parsing response: {str(e)}")
+        emit(f"❌ Error parsing response: {str(e)}")
     
-    print("-" * 70)
+    emit("-" * 70)
 
 def test_basic_search():
     """Test 1: Basic free text search"""
     print_header("TEST 1: Basic Free Text Search")
     
-    response = requests.get(f"{SEARCH_ENDPOINT}", params={
+    response = SESSION.get(SEARCH_ENDPOINT, params={
         'q': 'error'
     })
     
@@ -58,7 +147,7 @@ def test_level_filter():
     """Test 2: Filter by log level"""
     print_header("TEST 2: Filter by Log Level")
     
-    response = requests.get(f"{SEARCH_ENDPOINT}", params={
+    response = SESSION.get(SEARCH_ENDPOINT, params={
         'level': 'ERROR',
         'size': 10
     })
@@ -69,7 +158,7 @@ def test_service_filter():
     """Test 3: Filter by service"""
     print_header("TEST 3: Filter by Service")
     
-    response = requests.get(f"{SEARCH_ENDPOINT}", params={
+    response = SESSION.get(SEARCH_ENDPOINT, params={
         'service': 'payment',
         'size': 10
     })
@@ -80,11 +169,11 @@ def test_date_range():
     """Test 4: Date range filter"""
     print_header("TEST 4: Date Range Filter")
     
-    # Last 7 days
-    today = datetime.now()
+    # Last 7 days, on day boundaries so the range filter is cacheable
+    today = round_to_day(datetime.now())
     week_ago = today - timedelta(days=7)
     
-    response = requests.get(f"{SEARCH_ENDPOINT}", params={
+    response = SESSION.get(SEARCH_ENDPOINT, params={
         'date_from': week_ago.strftime('%Y-%m-%d'),
         'date_to': today.strftime('%Y-%m-%d'),
         'size': 10
@@ -96,7 +185,7 @@ def test_combined_filters():
     """Test 5: Combined filters"""
     print_header("TEST 5: Combined Filters")
     
-    response = requests.get(f"{SEARCH_ENDPOINT}", params={
+    response = SESSION.get(SEARCH_ENDPOINT, params={
         'q': 'timeout',
         'level': 'ERROR',
         'service': 'payment',
@@ -108,30 +197,82 @@ def test_combined_filters():
     print_result("Combined: timeout + ERROR + payment + December 2025", response)
 
 def test_pagination():
-    """Test 6: Pagination"""
+    """Test 6: Pagination (search_after cursor)"""
     print_header("TEST 6: Pagination")
     
-    # Page 1
-    print("Fetching Page 1:")
-    response1 = requests.get(f"{SEARCH_ENDPOINT}", params={
+    # Page 1 opens the point in time every page is read from
+    emit("Fetching Page 1:")
+    response1 = SESSION.get(SEARCH_ENDPOINT, params={
         'page': 1,
-        'size': 5
+        'size': 5,
+        'pit': 'true'
     })
-    print_result("Page 1 (size=5)", response1)
-    
-    # Page 2
-    print("\nFetching Page 2:")
-    response2 = requests.get(f"{SEARCH_ENDPOINT}", params={
-        'page': 2,
+    print_result("Page 1 (size=5, pit)", response1)
+    
+    # Page 2 continues after the last hit of page 1 instead of using from=5
+    last_sort = get_last_sort(response1)
+    pit_id = get_pit_id(response1)
+    if last_sort is None or pit_id is None:
+        raise AssertionError(
+            f"Page 1 returned no cursor (status {response1.status_code}): "
+            "search_after pagination was not exercised"
+        )
+    
+    emit("\nFetching Page 2:")
+    response2 = SESSION.get(SEARCH_ENDPOINT, params={
+        'search_after': json.dumps(last_sort),
+        'pit_id': pit_id,
         'size': 5
     })
-    print_result("Page 2 (size=5)", response2)
+    print_result("Page 2 (size=5, search_after)", response2)
+    
+    # Hits sharing a timestamp are split across pages by the _shard_doc
+    # tiebreaker, never repeated
+    if response2.status_code == 200:
+        ids1 = {hit['id'] for hit in response1.json()['data']['results']}
+        ids2 = {hit['id'] for hit in response2.json()['data']['results']}
+        if ids1 & ids2:
+            raise AssertionError(f"Pages 1 and 2 share hits: {sorted(ids1 & ids2)}")
+
+def test_deep_pagination():
+    """Test 13: Deep pagination with a cursor costs the same as page 2"""
+    print_header("TEST 13: Deep Pagination (search_after)")
+    
+    # Cursor far down a @timestamp desc sort: one year back, in epoch millis
+    # (rounded to the day so the query is identical across runs), followed by
+    # the lowest _shard_doc tiebreaker value
+    deep_cursor = [
+        int((round_to_day(datetime.now()) - timedelta(days=365)).timestamp() * 1000),
+        0
+    ]
+    
+    # search_after needs a point in time, opened by a one-hit first page
+    pit_id = get_pit_id(SESSION.get(SEARCH_ENDPOINT, params={'size': 1, 'pit': 'true'}))
+    if pit_id is None:
+        raise AssertionError("No point in time returned: deep pagination was not exercised")
+    
+    timings = {}
+    for label, params in [
+        ("Page 2 (from=5)", {'page': 2, 'size': 5}),
+        ("Deep page (search_after)", {
+            'search_after': json.dumps(deep_cursor),
+            'pit_id': pit_id,
+            'size': 5
+        })
+    ]:
+        start = time.perf_counter()
+        response = SESSION.get(SEARCH_ENDPOINT, params=params)
+        timings[label] = (time.perf_counter() - start) * 1000
+        print_result(label, response)
+    
+    for label, elapsed in timings.items():
+        emit(f"{label}: {elapsed:.1f}ms")
 
 def test_sorting():
     """Test 7: Custom sorting"""
     print_header("TEST 7: Custom Sorting")
     
-    response = requests.get(f"{SEARCH_ENDPOINT}", params={
+    response = SESSION.get(SEARCH_ENDPOINT, params={
         'log_type': 'transaction',
         'sort_field': 'amount',
         'sort_order': 'desc',
@@ -144,7 +285,7 @@ def test_user_filter():
     """Test 8: User ID filter"""
     print_header("TEST 8: User ID Filter")
     
-    response = requests.get(f"{SEARCH_ENDPOINT}", params={
+    response = SESSION.get(SEARCH_ENDPOINT, params={
         'user_id': 'USER123',
         'size': 10
     })
@@ -155,7 +296,7 @@ def test_amount_range():
     """Test 9: Amount range filter"""
     print_header("TEST 9: Amount Range Filter")
     
-    response = requests.get(f"{SEARCH_ENDPOINT}", params={
+    response = SESSION.get(SEARCH_ENDPOINT, params={
         'log_type': 'transaction',
         'min_amount': 100,
         'max_amount': 1000,
@@ -168,7 +309,7 @@ def test_log_type_filter():
     """Test 10: Log type filter"""
     print_header("TEST 10: Log Type Filter")
     
-    response = requests.get(f"{SEARCH_ENDPOINT}", params={
+    response = SESSION.get(SEARCH_ENDPOINT, params={
         'log_type': 'fraud',
         'size': 10
     })
@@ -189,15 +330,17 @@ def test_input_sanitization():
         ("Huge Page Size", {'size': 999999}),
     ]
     
-    for test_name, params in test_cases:
-        print(f"\nTesting {test_name}:")
-        response = requests.get(f"{SEARCH_ENDPOINT}", params=params)
+    # All cases in one _msearch round-trip
+    statuses = msearch([params for _, params in test_cases])
+    
+    for (test_name, _), status in zip(test_cases, statuses):
+        emit(f"\nTesting {test_name}:")
         
         # Should still return 200 (sanitized) or 400 (rejected)
-        if response.status_code in [200, 400]:
-            print(f"✅ Handled safely (status: {response.status_code})")
+        if status in [200, 400]:
+            emit(f"✅ Handled safely (status: {status})")
         else:
-            print(f"⚠️  Unexpected status: {response.status_code}")
+            emit(f"⚠️  Unexpected status: {status}")
 
 def test_edge_cases():
     """Test 12: Edge cases"""
@@ -211,30 +354,62 @@ def test_edge_cases():
         ("Zero Size", {'size': 0}),
     ]
     
-    for test_name, params in edge_cases:
-        print(f"\nTesting {test_name}:")
-        response = requests.get(f"{SEARCH_ENDPOINT}", params=params)
+    # All cases in one _msearch round-trip
+    statuses = msearch([params for _, params in edge_cases])
+    
+    for (test_name, _), status in zip(edge_cases, statuses):
+        emit(f"\nTesting {test_name}:")
         
-        if response.status_code == 200:
-            print(f"✅ Handled correctly")
+        if status == 200:
+            emit(f"✅ Handled correctly")
         else:
-            print(f"⚠️  Status: {response.status_code}")
+            emit(f"⚠️  Status: {status}")
+
+def test_cache_warmup_then_reuse():
+    """Test 14: Repeated filters should be served from cache"""
+    print_header("TEST 14: Cache Warm-up and Reuse")
+    
+    # Each filter set is sent twice: the first call warms the Redis result
+    # cache (and Elasticsearch's filter cache), the second should hit it.
+    # size=7 is sent by no other test, so no other test warms these entries
+    filter_sets = [
+        {'level': 'ERROR', 'size': 7},
+        {'service': 'payment', 'size': 7},
+        {'user_id': 'USER123', 'size': 7},
+        {'log_type': 'transaction', 'size': 7},
+        {'level': 'WARNING', 'service': 'payment', 'size': 7}
+    ]
+    
+    for params in filter_sets:
+        first, first_ms = timed(SEARCH_ENDPOINT, params)
+        second, second_ms = timed(SEARCH_ENDPOINT, params)
+        
+        if is_cached(first):
+            # Left in Redis by a previous run still within the cache TTL
+            emit(f"{params}: first call already cached, no comparison")
+            continue
+        
+        emit(f"{params}: first {first_ms:.1f}ms, second {second_ms:.1f}ms (cached: {is_cached(second)})")
+        
+        if second_ms > 0.5 * first_ms:
+            emit("⚠️  Repeat call not materially faster: check the Redis cache and that "
+                 "filters stay in the bool.filter context so Elasticsearch caches them")
 
 def run_all_tests():
     """Run all tests"""
     print_header("ELASTICSEARCH QUERY BUILDER API TESTS")
-    print(f"Testing endpoint: {SEARCH_ENDPOINT}")
-    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    emit(f"Testing endpoint: {SEARCH_ENDPOINT}")
+    emit(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     try:
         # Check if API is reachable
-        response = requests.get(f"{BASE_URL}/api/health", timeout=5)
+        response = SESSION.get(HEALTH_ENDPOINT, timeout=5)
         if response.status_code != 200:
-            print("❌ API is not reachable!")
+            emit("❌ API is not reachable!")
             return
-        print("✅ API is reachable\n")
+        emit("✅ API is reachable\n")
     except Exception as e:
-        print(f"❌ Cannot connect to API: {str(e)}")
+        emit(f"❌ Cannot connect to API: {str(e)}")
         return
     
     # Run tests
@@ -250,31 +425,39 @@ def run_all_tests():
         test_amount_range,
         test_log_type_filter,
         test_input_sanitization,
-        test_edge_cases
+        test_edge_cases,
+        test_deep_pagination
     ]
     
+    # Tests are independent: run them concurrently, print their output in order
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        outcomes = list(executor.map(run_test, tests))
+    
+    # Timing comparison: run alone, once the concurrent load is over
+    tests.append(test_cache_warmup_then_reuse)
+    outcomes.append(run_test(test_cache_warmup_then_reuse))
+    
     passed = 0
     failed = 0
     
-    for test_func in tests:
-        try:
-            test_func()
+    for ok, output in outcomes:
+        emit(output)
+        if ok:
             passed += 1
-        except Exception as e:
-            print(f"❌ Test failed with exception: {str(e)}")
+        else:
             failed += 1
     
     # Summary
     print_header("TEST SUMMARY")
-    print(f"Total Tests: {len(tests)}")
-    print(f"Passed: {passed}")
-    print(f"Failed: {failed}")
-    print(f"Success Rate: {(passed/len(tests)*100):.1f}%")
+    emit(f"Total Tests: {len(tests)}")
+    emit(f"Passed: {passed}")
+    emit(f"Failed: {failed}")
+    emit(f"Success Rate: {(passed/len(tests)*100):.1f}%")
     
     if failed == 0:
-        print("\n🎉 All tests passed!")
+        emit("\n🎉 All tests passed!")
     else:
-        print(f"\n⚠️  {failed} test(s) failed")
+        emit(f"\n⚠️  {failed} test(s) failed")
 
 if __name__ == "__main__":
     run_all_tests()
@@ -3,89 +3,215 @@ Test script for Search API with Redis Cache and MongoDB History
 Tests cache TTL, cache key generation, and search history tracking
 """
 
+import os
+import sys
 import requests
+import statistics
 import time
 import json
+import zlib
+from types import MappingProxyType
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from werkzeug.datastructures import MultiDict
+
+# Add backend directory to path (cache keys are derived like the server does)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.routes.search_routes import parse_search_params
+from app.services.search_service import search_cache_key
+from tests.output_buffer import emit, run_test
 
 BASE_URL = "http://localhost:5001/api/search"
+HEALTH_URL = "http://localhost:5001/api/health"
+
+REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+
+# Parameters shared by the basic, cache HIT, compression and throughput
+# tests, encoded once so every request sends a byte-identical query string
+BASIC_PARAMS = MappingProxyType({
+    'q': 'error',
+    'level': 'ERROR',
+    'size': 10
+})
+BASIC_QUERY = urlencode(sorted(BASIC_PARAMS.items()))
+
+# Search cache TTL set by SearchService (seconds)
+CACHE_TTL = 60
+
+# Remaining TTL forced on the cached entry by the fast expiration check (ms)
+FORCED_TTL_MS = 500
+
+# One keep-alive session for every request, so timings measure the server
+# and not a new TCP connection per call
+SESSION_HEADERS = {
+    'Connection': 'keep-alive',
+    'Accept-Encoding': 'gzip, deflate',
+    'User-Agent': 'ecom-log-tests/1.0'
+}
+
+SESSION = requests.Session()
+SESSION.headers.update(SESSION_HEADERS)
+SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0))
+
+# Number of independent tests run concurrently by main
+MAX_WORKERS = 8
+
+# Timed runs per cache HIT measurement (the first one is discarded)
+TIMING_RUNS = 5
+
+# Cache throughput flood: total requests and requests in flight
+FLOOD_REQUESTS = 500
+FLOOD_CONCURRENCY = 100
+
+# Highest stored/decoded size ratio accepted for a compressed cache payload
+COMPRESSION_RATIO_CEILING = 0.4
+
+# Measurements reported in the summary printed by main
+CACHE_STATS = {}
+
+def check_keep_alive():
+    """
+    Warn when the server closes connections after each response
+    
+    Returns:
+        bool: True when responses are HTTP/1.1 with a persistent connection
+    """
+    try:
+        response = SESSION.get(BASE_URL, params={'size': 1}, timeout=5)
+    except requests.RequestException as e:
+        emit(f"⚠️  Keep-alive probe failed: {e}")
+        return False
+    
+    connection = response.headers.get('Connection', '').lower()
+    if response.raw.version == 11 and 'close' not in connection:
+        return True
+    
+    emit(f"⚠️  Server is not keeping connections alive "
+         f"(HTTP/{response.raw.version / 10:.1f}, Connection: {connection or 'n/a'})")
+    emit("   Timings include a new TCP connection per request; run the app behind")
+    emit("   gunicorn with --keep-alive 5 for pooled measurements")
+    return False
+
+
+def warm_up():
+    """Open the pooled connection before a timed request"""
+    SESSION.get(HEALTH_URL, timeout=5)
+
+
+def timed_get(params):
+    """
+    Send one search request and time it
+    
+    Returns:
+        tuple: (response, elapsed time in µs)
+    """
+    start_ns = time.perf_counter_ns()
+    response = SESSION.get(BASE_URL, params=params)
+    elapsed_us = (time.perf_counter_ns() - start_ns) / 1000
+    return response, elapsed_us
+
+
+def timed_get_repeated(params, runs=TIMING_RUNS):
+    """
+    Send the same search several times, discarding the first timing
+    
+    Only meaningful for cached requests: every run after the first
+    must hit the same cache entry.
+    
+    Returns:
+        tuple: (last response, min µs, median µs)
+    """
+    timings = []
+    for _ in range(runs):
+        response, elapsed_us = timed_get(params)
+        if response.status_code != 200:
+            return response, elapsed_us, elapsed_us
+        timings.append(elapsed_us)
+    
+    timings = timings[1:] or timings
+    return response, min(timings), statistics.median(timings)
 
 
 def print_section(title):
     """Print a formatted section header"""
-    print(f"\n{'='*70}")
-    print(f"  {title}")
-    print(f"{'='*70}\n")
+    emit(f"\n{'='*70}")
+    emit(f"  {title}")
+    emit(f"{'='*70}\n")
 
 
 def test_basic_search():
     """Test 1: Basic search - Cache MISS expected"""
     print_section("TEST 1: Basic Search (Cache MISS)")
     
-    params = {
-        'q': 'error',
-        'level': 'ERROR',
-        'size': 10
-    }
-    
-    start_time = time.time()
-    response = requests.get(BASE_URL, params=params)
-    elapsed = (time.time() - start_time) * 1000
+    # Single shot: any repeat would be served from the cache
+    response, elapsed_us = timed_get(BASIC_QUERY)
     
     if response.status_code == 200:
         data = response.json()['data']
         cached = data.get('cached', False)
         total = data.get('total', 0)
         
-        print(f"✅ Status: 200 OK")
-        print(f"   Total results: {total}")
-        print(f"   Cached: {cached} (Expected: False)")
-        print(f"   Response time: {elapsed:.0f}ms")
+        emit(f"✅ Status: 200 OK")
+        emit(f"   Total results: {total}")
+        emit(f"   Cached: {cached} (Expected: False)")
+        emit(f"   Response time: {elapsed_us:.1f}µs")
         
         if not cached:
-            print("   ✅ Cache MISS as expected (first request)")
+            emit("   ✅ Cache MISS as expected (first request)")
         else:
-            print("   ⚠️  Cache HIT unexpected on first request")
+            emit("   ⚠️  Cache HIT unexpected on first request")
     else:
-        print(f"❌ Status: {response.status_code}")
-        print(f"   Error: {response.text}")
+        emit(f"❌ Status: {response.status_code}")
+        emit(f"   Error: {response.text}")
 
 
 def test_cache_hit():
     """Test 2: Repeat same search - Cache HIT expected"""
     print_section("TEST 2: Repeat Search (Cache HIT)")
     
-    params = {
-        'q': 'error',
-        'level': 'ERROR',
-        'size': 10
-    }
+    params = BASIC_PARAMS
+    
+    # Query string order must not change the cache key
+    reordered = dict(reversed(list(params.items())))
+    assert cache_key_for(params) == cache_key_for(reordered), \
+        "Reordered parameters produce a different cache key"
     
-    print("⏱️  Waiting 1 second before retry...")
+    emit("⏱️  Waiting 1 second before retry...")
     time.sleep(1)
+    warm_up()
     
-    start_time = time.time()
-    response = requests.get(BASE_URL, params=params)
-    elapsed = (time.time() - start_time) * 1000
+    response, min_us, median_us = timed_get_repeated(BASIC_QUERY)
+    
+    # Same bytes on the wire as the basic search, hence the same cache entry
+    assert response.request.url == f"{BASE_URL}?{BASIC_QUERY}", \
+        f"Unexpected request URL {response.request.url}"
     
     if response.status_code == 200:
         data = response.json()['data']
         cached = data.get('cached', False)
         total = data.get('total', 0)
         
-        print(f"✅ Status: 200 OK")
-        print(f"   Total results: {total}")
-        print(f"   Cached: {cached} (Expected: True)")
-        print(f"   Response time: {elapsed:.0f}ms (should be faster)")
+        emit(f"✅ Status: 200 OK")
+        emit(f"   Total results: {total}")
+        emit(f"   Cached: {cached} (Expected: True)")
+        emit(f"   Response time: min {min_us:.1f}µs, median {median_us:.1f}µs "
+             f"over {TIMING_RUNS - 1} runs (should be faster)")
         
         if cached:
-            print("   ✅ Cache HIT successful!")
-            print(f"   💡 Performance gain: cache reduces response time")
+            emit("   ✅ Cache HIT successful!")
+            emit(f"   💡 Performance gain: cache reduces response time")
         else:
-            print("   ⚠️  Cache MISS unexpected on repeat request")
+            emit("   ⚠️  Cache MISS unexpected on repeat request")
+        
+        check_cache_entry(params)
     else:
-        print(f"❌ Status: {response.status_code}")
-        print(f"   Error: {response.text}")
+        emit(f"❌ Status: {response.status_code}")
+        emit(f"   Error: {response.text}")
 
 
 def test_different_params_cache_miss():
@@ -98,31 +224,186 @@ def test_different_params_cache_miss():
         'size': 20  # Different size
     }
     
-    start_time = time.time()
-    response = requests.get(BASE_URL, params=params)
-    elapsed = (time.time() - start_time) * 1000
+    # Single shot: any repeat would be served from the cache
+    response, elapsed_us = timed_get(params)
     
     if response.status_code == 200:
         data = response.json()['data']
         cached = data.get('cached', False)
         total = data.get('total', 0)
         
-        print(f"✅ Status: 200 OK")
-        print(f"   Total results: {total}")
-        print(f"   Cached: {cached} (Expected: False)")
-        print(f"   Response time: {elapsed:.0f}ms")
+        emit(f"✅ Status: 200 OK")
+        emit(f"   Total results: {total}")
+        emit(f"   Cached: {cached} (Expected: False)")
+        emit(f"   Response time: {elapsed_us:.1f}µs")
         
         if not cached:
-            print("   ✅ Cache MISS as expected (different parameters)")
+            emit("   ✅ Cache MISS as expected (different parameters)")
         else:
-            print("   ⚠️  Cache HIT unexpected with different params")
+            emit("   ⚠️  Cache HIT unexpected with different params")
     else:
-        print(f"❌ Status: {response.status_code}")
-        print(f"   Error: {response.text}")
+        emit(f"❌ Status: {response.status_code}")
+        emit(f"   Error: {response.text}")
+
+
+def cache_key_for(params):
+    """Redis key the server caches a GET /search with these query params under"""
+    return search_cache_key(parse_search_params(MultiDict(dict(params))))
+
+
+def redis_connection():
+    """
+    Connect to the Redis instance the server caches searches in
+    
+    Returns:
+        redis.Redis: Client, or None when Redis is not reachable
+    """
+    import redis
+    redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, socket_connect_timeout=2)
+    try:
+        redis_client.ping()
+    except redis.exceptions.RedisError as e:
+        emit(f"   ⚠️  Redis not reachable ({e})")
+        return None
+    return redis_client
+
+
+def check_cache_entry(params):
+    """Assert the server cached a search under the expected key, with the search TTL"""
+    redis_client = redis_connection()
+    if redis_client is None:
+        emit("   (cache key check skipped)")
+        return
+    
+    key = cache_key_for(params)
+    assert redis_client.exists(key) == 1, f"{key} not found in Redis"
+    
+    ttl = redis_client.ttl(key)
+    assert 0 < ttl <= CACHE_TTL, f"{key} has TTL {ttl}s, expected 1-{CACHE_TTL}s"
+    emit(f"   ✅ Cache key {key} found (TTL {ttl}s)")
 
 
-def test_cache_expiration():
-    """Test 4: Cache expiration after TTL (60s)"""
+def decompress_cache_value(raw):
+    """
+    Decode a raw Redis cache value, whichever codec stored it
+    
+    Returns:
+        tuple: (decoded bytes, codec name or None when stored as plain JSON)
+    """
+    if raw[:1] in (b'{', b'['):
+        return raw, None
+    
+    try:
+        return zlib.decompress(raw), 'zlib'
+    except zlib.error:
+        pass
+    
+    try:
+        import snappy
+        return snappy.decompress(raw), 'snappy'
+    except Exception:
+        pass
+    
+    return raw, None
+
+
+def test_cache_compression():
+    """Test: Size of the cached search payload stored in Redis"""
+    print_section("TEST: Cache Payload Compression")
+    
+    # Same parameters as the basic search, so the entry is already cached
+    params = BASIC_PARAMS
+    
+    response = SESSION.get(BASE_URL, params=BASIC_QUERY)
+    if response.status_code != 200:
+        emit(f"❌ Status: {response.status_code}")
+        emit(f"   Error: {response.text}")
+        return
+    
+    redis_client = redis_connection()
+    if redis_client is None:
+        emit("   (compression check skipped)")
+        return
+    
+    raw = redis_client.get(cache_key_for(params))
+    if raw is None:
+        emit("   ⚠️  Cache entry not found in Redis")
+        return
+    
+    decoded, codec = decompress_cache_value(raw)
+    ratio = len(raw) / max(1, len(decoded))
+    CACHE_STATS['compression'] = (codec, ratio)
+    
+    emit(f"   Stored: {len(raw)} bytes, decoded: {len(decoded)} bytes "
+         f"(codec: {codec or 'none'}, ratio {ratio:.2f})")
+    
+    if codec is None:
+        zlib_ratio = len(zlib.compress(raw)) / max(1, len(raw))
+        emit(f"   ⚠️  Cache payload stored uncompressed (zlib would reach {zlib_ratio:.2f})")
+        return
+    
+    assert ratio < COMPRESSION_RATIO_CEILING, \
+        f"Compression ratio {ratio:.2f} above {COMPRESSION_RATIO_CEILING}"
+    assert json.loads(decoded)['results'] == response.json()['data']['results'], \
+        "Decompressed cache payload differs from the API results"
+    emit("   ✅ Cache payload compressed and matches the API results")
+
+
+def test_cache_throughput(include_load=False):
+    """
+    Test: Cache throughput under a flood of identical searches
+    
+    Sends FLOOD_REQUESTS searches with FLOOD_CONCURRENCY in flight on a
+    dedicated pooled session and reports throughput and p50/p99 latency.
+    Only runs with include_load=True.
+    """
+    print_section(f"TEST: Cache Throughput ({FLOOD_REQUESTS} requests)")
+    
+    if not include_load:
+        emit("   Skipped (run with --include-load)")
+        return
+    
+    session = requests.Session()
+    session.headers.update(SESSION_HEADERS)
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=FLOOD_CONCURRENCY,
+                                         max_retries=0))
+    
+    def timed_search(_):
+        start_ns = time.perf_counter_ns()
+        response = session.get(BASE_URL, params=BASIC_QUERY)
+        elapsed_us = (time.perf_counter_ns() - start_ns) / 1000
+        cached = response.status_code == 200 and response.json()['data'].get('cached', False)
+        return response.status_code, cached, elapsed_us
+    
+    with session, ThreadPoolExecutor(max_workers=FLOOD_CONCURRENCY) as executor:
+        start = time.perf_counter()
+        results = list(executor.map(timed_search, range(FLOOD_REQUESTS)))
+        duration = time.perf_counter() - start
+    
+    statuses = [status for status, _, _ in results]
+    if statuses.count(200) != FLOOD_REQUESTS:
+        emit(f"❌ {FLOOD_REQUESTS - statuses.count(200)}/{FLOOD_REQUESTS} requests failed "
+             f"(statuses: {sorted(set(statuses))})")
+        return
+    
+    latencies = [elapsed_us for _, _, elapsed_us in results]
+    percentiles = statistics.quantiles(latencies, n=100)
+    cached_count = sum(1 for _, cached, _ in results if cached)
+    
+    emit(f"✅ {FLOOD_REQUESTS} requests in {duration:.2f}s ({FLOOD_REQUESTS / duration:.0f} req/s)")
+    emit(f"   Latency: p50 {percentiles[49]:.1f}µs, p99 {percentiles[98]:.1f}µs")
+    emit(f"   First response cached: {results[0][1]}")
+    emit(f"   Cached responses: {cached_count}/{FLOOD_REQUESTS}")
+
+
+def test_cache_expiration(slow=False):
+    """
+    Test 4: Cache expiration after TTL
+    
+    By default the cached entry's TTL is shortened to FORCED_TTL_MS through
+    Redis, so expiry is observed in under a second; with slow=True the
+    test waits for the real 60s TTL.
+    """
     print_section("TEST 4: Cache Expiration (TTL 60s)")
     
     params = {
@@ -131,75 +412,94 @@ def test_cache_expiration():
     }
     
     # First request
-    print("📤 First request (Cache MISS expected)...")
-    response1 = requests.get(BASE_URL, params=params)
+    emit("📤 First request (Cache MISS expected)...")
+    response1 = SESSION.get(BASE_URL, params=params)
     if response1.status_code == 200:
         cached1 = response1.json()['data'].get('cached', False)
-        print(f"   Cached: {cached1} (Expected: False)")
+        emit(f"   Cached: {cached1} (Expected: False)")
     
     # Immediate second request
-    print("\n📤 Second request (Cache HIT expected)...")
-    response2 = requests.get(BASE_URL, params=params)
+    emit("\n📤 Second request (Cache HIT expected)...")
+    response2 = SESSION.get(BASE_URL, params=params)
     if response2.status_code == 200:
         cached2 = response2.json()['data'].get('cached', False)
-        print(f"   Cached: {cached2} (Expected: True)")
-    
-    # Wait for cache expiration
-    print("\n⏱️  Waiting 61 seconds for cache expiration...")
-    print("   (TTL is 60 seconds)")
-    for i in range(61, 0, -10):
-        print(f"   {i} seconds remaining...", end='\r')
-        time.sleep(10)
-    print("\n")
+        emit(f"   Cached: {cached2} (Expected: True)")
+    
+    key = cache_key_for(params)
+    redis_client = None
+    if not slow:
+        redis_client = redis_connection()
+        if redis_client is None:
+            emit("   Skipping fast expiration check")
+            emit("   (run with --slow to wait for the real TTL instead)")
+            return
+    
+    if redis_client is not None:
+        # Shorten the TTL of the entry the server just cached
+        emit(f"\n⏱️  Forcing {key} to expire in {FORCED_TTL_MS}ms...")
+        if not redis_client.pexpire(key, FORCED_TTL_MS):
+            emit("   ⚠️  Cache entry not found in Redis")
+        time.sleep(FORCED_TTL_MS / 1000 + 0.1)
+    else:
+        # Wait once for whatever is left of the real TTL
+        remaining = CACHE_TTL + 1
+        emit(f"\n⏱️  Waiting {remaining} seconds for cache expiration...")
+        emit(f"   (TTL is {CACHE_TTL} seconds)")
+        time.sleep(remaining)
     
     # Third request after expiration
-    print("📤 Third request after TTL (Cache MISS expected)...")
-    response3 = requests.get(BASE_URL, params=params)
+    emit("📤 Third request after TTL (Cache MISS expected)...")
+    response3 = SESSION.get(BASE_URL, params=params)
     if response3.status_code == 200:
         cached3 = response3.json()['data'].get('cached', False)
-        print(f"   Cached: {cached3} (Expected: False)")
+        emit(f"   Cached: {cached3} (Expected: False)")
         
         if not cached3:
-            print("   ✅ Cache expired correctly after 60s TTL")
+            emit("   ✅ Cache expired correctly after TTL")
         else:
-            print("   ⚠️  Cache still active after TTL")
+            emit("   ⚠️  Cache still active after TTL")
 
 
 def test_pagination_cache_keys():
     """Test 5: Different pages should have different cache keys"""
     print_section("TEST 5: Pagination Cache Keys")
     
-    # Page 1
-    print("📤 Request page 1...")
     params1 = {'q': 'test', 'page': 1, 'size': 10}
-    response1 = requests.get(BASE_URL, params=params1)
+    params2 = {'q': 'test', 'page': 2, 'size': 10}
+    assert cache_key_for(params1) != cache_key_for(params2), \
+        "Pages 1 and 2 share a cache key"
+    
+    # Page 1
+    emit("📤 Request page 1...")
+    response1 = SESSION.get(BASE_URL, params=params1)
     
     if response1.status_code == 200:
         data1 = response1.json()['data']
-        print(f"   Page 1 - Cached: {data1.get('cached', False)}")
+        emit(f"   Page 1 - Cached: {data1.get('cached', False)}")
+        check_cache_entry(params1)
     
     # Page 2
-    print("\n📤 Request page 2...")
-    params2 = {'q': 'test', 'page': 2, 'size': 10}
-    response2 = requests.get(BASE_URL, params=params2)
+    emit("\n📤 Request page 2...")
+    response2 = SESSION.get(BASE_URL, params=params2)
     
     if response2.status_code == 200:
         data2 = response2.json()['data']
-        print(f"   Page 2 - Cached: {data2.get('cached', False)}")
+        emit(f"   Page 2 - Cached: {data2.get('cached', False)}")
+        check_cache_entry(params2)
     
     # Repeat page 1 - should be cached
-    print("\n📤 Repeat page 1...")
-    response3 = requests.get(BASE_URL, params=params1)
+    emit("\n📤 Repeat page 1...")
+    response3 = SESSION.get(BASE_URL, params=params1)
     
     if response3.status_code == 200:
         data3 = response3.json()['data']
         cached = data3.get('cached', False)
-        print(f"   Page 1 - Cached: {cached}")
+        emit(f"   Page 1 - Cached: {cached}")
         
         if cached:
-            print("   ✅ Pagination cache working correctly")
+            emit("   ✅ Pagination cache working correctly")
         else:
-            print("   ⚠️  Page 1 should be cached on repeat")
+            emit("   ⚠️  Page 1 should be cached on repeat")
 
 
 def test_search_history_mongo():
@@ -215,27 +515,27 @@ def test_search_history_mongo():
         'size': 10
     }
     
-    print(f"📤 Executing search with unique query: {unique_query}")
-    response = requests.get(BASE_URL, params=params)
+    emit(f"📤 Executing search with unique query: {unique_query}")
+    response = SESSION.get(BASE_URL, params=params)
     
     if response.status_code == 200:
         data = response.json()['data']
         results_count = data.get('total', 0)
         
-        print(f"✅ Search executed successfully")
-        print(f"   Results count: {results_count}")
-        print(f"\n💡 Search history should be saved in MongoDB:")
-        print(f"   Collection: search_history")
-        print(f"   Document includes:")
-        print(f"   - timestamp: {datetime.utcnow().isoformat()}")
-        print(f"   - query: {unique_query}")
-        print(f"   - filters: level=INFO, service=test_service")
-        print(f"   - results_count: {results_count}")
-        print(f"   - user_ip: <request_ip>")
-        print(f"\n📊 To verify in MongoDB:")
-        print(f'   db.search_history.find({{query: "{unique_query}"}}).pretty()')
+        emit(f"✅ Search executed successfully")
+        emit(f"   Results count: {results_count}")
+        emit(f"\n💡 Search history should be saved in MongoDB:")
+        emit(f"   Collection: search_history")
+        emit(f"   Document includes:")
+        emit(f"   - timestamp: {datetime.utcnow().isoformat()}")
+        emit(f"   - query: {unique_query}")
+        emit(f"   - filters: level=INFO, service=test_service")
+        emit(f"   - results_count: {results_count}")
+        emit(f"   - user_ip: <request_ip>")
+        emit(f"\n📊 To verify in MongoDB:")
+        emit(f'   db.search_history.find({{query: "{unique_query}"}}).pretty()')
     else:
-        print(f"❌ Status: {response.status_code}")
+        emit(f"❌ Status: {response.status_code}")
 
 
 def test_combined_filters():
@@ -256,73 +556,101 @@ def test_combined_filters():
     }
     
     # First request
-    print("📤 First request with all filters (Cache MISS)...")
-    start_time = time.time()
-    response1 = requests.get(BASE_URL, params=params)
-    elapsed1 = (time.time() - start_time) * 1000
+    emit("📤 First request with all filters (Cache MISS)...")
+    warm_up()
+    response1, elapsed1_us = timed_get(params)
     
     if response1.status_code == 200:
         data1 = response1.json()['data']
-        print(f"✅ Status: 200 OK")
-        print(f"   Total: {data1.get('total', 0)}")
-        print(f"   Cached: {data1.get('cached', False)}")
-        print(f"   Response time: {elapsed1:.0f}ms")
+        emit(f"✅ Status: 200 OK")
+        emit(f"   Total: {data1.get('total', 0)}")
+        emit(f"   Cached: {data1.get('cached', False)}")
+        emit(f"   Response time: {elapsed1_us:.1f}µs")
     
     # Second request - should be cached
-    print("\n📤 Repeat same complex query (Cache HIT)...")
+    emit("\n📤 Repeat same complex query (Cache HIT)...")
     time.sleep(1)
-    start_time = time.time()
-    response2 = requests.get(BASE_URL, params=params)
-    elapsed2 = (time.time() - start_time) * 1000
+    warm_up()
+    response2, min2_us, median2_us = timed_get_repeated(params)
     
     if response2.status_code == 200:
         data2 = response2.json()['data']
         cached = data2.get('cached', False)
-        print(f"✅ Status: 200 OK")
-        print(f"   Cached: {cached}")
-        print(f"   Response time: {elapsed2:.0f}ms")
+        emit(f"✅ Status: 200 OK")
+        emit(f"   Cached: {cached}")
+        emit(f"   Response time: min {min2_us:.1f}µs, median {median2_us:.1f}µs "
+             f"over {TIMING_RUNS - 1} runs")
         
-        if cached and elapsed2 < elapsed1:
-            speedup = ((elapsed1 - elapsed2) / elapsed1) * 100
-            print(f"   ✅ Cache HIT with {speedup:.1f}% speedup")
+        if cached and median2_us < elapsed1_us:
+            speedup = ((elapsed1_us - median2_us) / elapsed1_us) * 100
+            emit(f"   ✅ Cache HIT with {speedup:.1f}% speedup")
         elif cached:
-            print(f"   ✅ Cache HIT confirmed")
+            emit(f"   ✅ Cache HIT confirmed")
         else:
-            print(f"   ⚠️  Expected cache HIT on repeat")
+            emit(f"   ⚠️  Expected cache HIT on repeat")
+
 
+def select_tests(tests, only):
+    """Keep the (name, func) pairs whose function name is listed in only"""
+    if only is None:
+        return tests
+    return [(name, func) for name, func in tests if func.__name__ in only]
 
-def main():
-    """Run all tests"""
+
+def main(slow=False, only=None, repeat=1, include_load=False):
+    """
+    Run all tests
+    
+    Args:
+        slow: Wait for the real cache TTL instead of shortening it in Redis
+        include_load: Also run the cache throughput flood
+        only: Test function names to run (all tests when None)
+        repeat: Number of times each selected test is run
+    """
     print("\n" + "="*70)
     print("  SEARCH API - Cache & History Test Suite")
     print("="*70)
     print(f"\nBase URL: {BASE_URL}")
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    check_keep_alive()
     
-    tests = [
+    # MISS then HIT on the same parameters: must run in this order
+    ordered_tests = select_tests([
         ("Basic Search (Cache MISS)", test_basic_search),
         ("Repeat Search (Cache HIT)", test_cache_hit),
+        ("Cache Payload Compression", test_cache_compression),
+    ], only)
+    # Each uses its own parameters, so they can run concurrently
+    independent_tests = select_tests([
         ("Different Params (Cache MISS)", test_different_params_cache_miss),
         ("Pagination Cache Keys", test_pagination_cache_keys),
         ("MongoDB History Tracking", test_search_history_mongo),
         ("Complex Multi-Filter Query", test_combined_filters),
-    ]
+    ], only)
     
-    for name, test_func in tests:
-        try:
-            test_func()
-        except Exception as e:
-            print(f"\n❌ Test failed: {str(e)}")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # executor.map submits every independent test up front
+        independent_outputs = executor.map(
+            run_test, [func for _, func in independent_tests for _ in range(repeat)]
+        )
+        
+        for _ in range(repeat):
+            for name, test_func in ordered_tests:
+                print(run_test(test_func)[1])
+        
+        # Outputs are printed in list order once each test finishes
+        for _, output in independent_outputs:
+            print(output)
     
-    # Optional: Cache expiration test (takes 60+ seconds)
-    print("\n" + "="*70)
-    print("  Optional: Cache Expiration Test (61 seconds)")
-    print("="*70)
-    run_expiration = input("\nRun cache expiration test? (y/N): ").lower()
-    if run_expiration == 'y':
-        test_cache_expiration()
-    else:
-        print("Skipped cache expiration test")
+    # Cache expiration: TTL shortened through Redis, or the real 61s wait
+    if only is None or test_cache_expiration.__name__ in only:
+        for _ in range(repeat):
+            print(run_test(lambda: test_cache_expiration(slow=slow))[1])
+    
+    # Flood runs alone so it does not skew the other timings
+    if include_load and (only is None or test_cache_throughput.__name__ in only):
+        for _ in range(repeat):
+            print(run_test(lambda: test_cache_throughput(include_load=True))[1])
     
     print("\n" + "="*70)
     print("  Test Suite Completed")
@@ -332,6 +660,9 @@ def main():
     print("   - Cache keys: MD5 hash of sorted parameters")
     print("   - History: MongoDB collection 'search_history'")
     print("   - Performance: Cached responses are faster")
+    if 'compression' in CACHE_STATS:
+        codec, ratio = CACHE_STATS['compression']
+        print(f"   - Cache payload: codec {codec or 'none'}, size ratio {ratio:.2f}")
     print("\nTo check MongoDB history:")
     print("   docker exec -it projet_bigdata-mongodb-1 mongosh")
     print("   use ecommerce_logs")
@@ -344,4 +675,24 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Search cache & history checks')
+    parser.add_argument('--slow', '--include-slow', action='store_true',
+                        help='Wait for the real 60s cache TTL instead of forcing expiry in Redis')
+    parser.add_argument('--include-load', action='store_true',
+                        help=f'Also flood the search endpoint with {FLOOD_REQUESTS} concurrent requests')
+    parser.add_argument('--only', nargs='+', metavar='TEST',
+                        help='Run only these test functions (space or comma separated), '
+                             'e.g. --only test_cache_hit,test_combined_filters')
+    parser.add_argument('--repeat', type=int, default=1, metavar='N',
+                        help='Run each selected test N times (default: 1)')
+    args = parser.parse_args()
+    
+    only = None
+    if args.only:
+        only = {name for names in args.only for name in names.split(',') if name}
+    
+    with SESSION:
+        main(slow=args.slow, only=only, repeat=max(1, args.repeat),
+             include_load=args.include_load)
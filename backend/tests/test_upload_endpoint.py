@@ -2,20 +2,43 @@
 Test script for POST /api/logs/upload endpoint
 """
 
+import os
+import sys
 import requests
 import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from io import BytesIO
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+# Add backend directory to path (shared test helpers)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tests.output_buffer import emit, run_test
 
 # Flask API URL
 BASE_URL = "http://localhost:5001"
 UPLOAD_ENDPOINT = f"{BASE_URL}/api/logs/upload"
 
-def test_upload_json():
-    """Test uploading a JSON file"""
-    print("\n=== Test 1: Upload JSON file ===")
-    
-    # Create sample JSON content
-    json_content = """{"timestamp":"2025-12-25T10:00:00Z","log_type":"transaction","user_id":"USER123","order_id":5001,"amount":99.99,"ip":"8.8.8.8"}
+# Answers HEAD with an X-Upload-Max-Files header once the endpoint accepts
+# several files per request
+CAPABILITIES_ENDPOINT = f"{UPLOAD_ENDPOINT}/capabilities"
+
+# One keep-alive session shared by every test
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0))
+
+# Upload rules enforced by the server (validate_log_file in the upload route)
+ALLOWED_EXTENSIONS = {'.json', '.csv'}
+MAX_UPLOAD_SIZE = 100 * 1024 * 1024
+
+# File bodies are streamed in slices of this size
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Sample file contents, encoded once at import
+JSON_CONTENT = """{"timestamp":"2025-12-25T10:00:00Z","log_type":"transaction","user_id":"USER123","order_id":5001,"amount":99.99,"ip":"8.8.8.8"}
 {"timestamp":"2025-12-25T10:01:00Z","log_type":"error","error_code":500,"endpoint":"/api/payment","user_id":"USER456"}
 {"timestamp":"2025-12-25T10:02:00Z","log_type":"fraud","transaction_id":"TXN789","fraud_score":85,"amount":5000.00}
 {"timestamp":"2025-12-25T10:03:00Z","log_type":"transaction","user_id":"USER789","order_id":5002,"amount":149.50,"ip":"1.1.1.1"}
@@ -26,37 +49,9 @@ def test_upload_json():
 {"timestamp":"2025-12-25T10:08:00Z","log_type":"transaction","user_id":"USER111","order_id":5004,"amount":49.99,"ip":"3.3.3.3"}
 {"timestamp":"2025-12-25T10:09:00Z","log_type":"fraud","transaction_id":"TXN999","fraud_score":90,"amount":10000.00}
 {"timestamp":"2025-12-25T10:10:00Z","log_type":"transaction","user_id":"USER222","order_id":5005,"amount":199.99,"ip":"4.4.4.4"}
-{"timestamp":"2025-12-25T10:11:00Z","log_type":"performance","endpoint":"/api/checkout","response_time":500}"""
-    
-    # Create file object
-    files = {
-        'file': ('test_logs.json', BytesIO(json_content.encode('utf-8')), 'application/json')
-    }
-    
-    try:
-        response = requests.post(UPLOAD_ENDPOINT, files=files, timeout=10)
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        
-        if response.status_code == 201:
-            print("✅ JSON upload successful!")
-            data = response.json()['data']
-            print(f"   - File ID: {data['file_id']}")
-            print(f"   - Job ID: {data['job_id']}")
-            print(f"   - Preview lines: {data['preview_lines']}")
-            print(f"   - Total lines: {data['total_lines']}")
-        else:
-            print("❌ JSON upload failed!")
-            
-    except Exception as e:
-        print(f"❌ Error: {str(e)}")
+{"timestamp":"2025-12-25T10:11:00Z","log_type":"performance","endpoint":"/api/checkout","response_time":500}""".encode('utf-8')
 
-def test_upload_csv():
-    """Test uploading a CSV file"""
-    print("\n=== Test 2: Upload CSV file ===")
-    
-    # Create sample CSV content
-    csv_content = """timestamp,level,service,user_id,order_id,amount,ip
+CSV_CONTENT = """timestamp,level,service,user_id,order_id,amount,ip
 2025-12-25T10:00:00Z,INFO,payment,1001,5001,149.99,203.0.113.10
 2025-12-25T10:01:00Z,ERROR,checkout,1002,5002,299.50,198.51.100.20
 2025-12-25T10:02:00Z,WARNING,inventory,1003,5003,99.99,192.0.2.30
@@ -67,116 +62,280 @@ def test_upload_csv():
 2025-12-25T10:07:00Z,INFO,checkout,1008,5008,349.50,203.0.113.80
 2025-12-25T10:08:00Z,ERROR,payment,1009,5009,599.99,192.0.2.90
 2025-12-25T10:09:00Z,INFO,payment,1010,5010,899.00,198.51.100.100
-2025-12-25T10:10:00Z,WARNING,inventory,1011,5011,49.99,203.0.113.110"""
+2025-12-25T10:10:00Z,WARNING,inventory,1011,5011,49.99,203.0.113.110""".encode('utf-8')
+
+# Number of uploads sent concurrently by main
+MAX_WORKERS = 8
+
+def iter_multipart(parts, boundary):
+    """
+    Yield a multipart/form-data body with one part per file
+    
+    Args:
+        parts: (field, filename, fileobj, content_type) tuples
+        boundary: Multipart boundary
+    
+    Files are read in UPLOAD_CHUNK_SIZE slices, so the body is never
+    built in memory; requests sends a generator body chunked.
+    """
+    for field, filename, fileobj, content_type in parts:
+        yield (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode('utf-8')
+        
+        while chunk := fileobj.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
+        
+        yield b"\r\n"
     
-    # Create file object
-    files = {
-        'file': ('test_logs.csv', BytesIO(csv_content.encode('utf-8')), 'text/csv')
-    }
+    yield f"--{boundary}--\r\n".encode('utf-8')
+
+def post_files(files):
+    """
+    Upload file objects in one streamed multipart request
+    
+    Args:
+        files: (filename, fileobj, content_type) tuples, all sent as 'file'
+    """
+    boundary = uuid.uuid4().hex
+    parts = [('file', filename, fileobj, content_type) for filename, fileobj, content_type in files]
+    return SESSION.post(
+        UPLOAD_ENDPOINT,
+        data=iter_multipart(parts, boundary),
+        headers={'Content-Type': f"multipart/form-data; boundary={boundary}"},
+        timeout=10
+    )
+
+def post_file(filename, fileobj, content_type):
+    """Upload a file object to the upload endpoint as a streamed multipart body"""
+    return post_files([(filename, fileobj, content_type)])
+
+def supports_multi_file():
+    """Whether the upload endpoint advertises several files per request"""
+    try:
+        response = SESSION.head(CAPABILITIES_ENDPOINT, timeout=5)
+    except requests.RequestException:
+        return False
+    
+    if response.status_code != 200:
+        return False
     
     try:
-        response = requests.post(UPLOAD_ENDPOINT, files=files, timeout=10)
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        return int(response.headers.get('X-Upload-Max-Files', 1)) > 1
+    except ValueError:
+        return False
+
+def should_reject(filename, size):
+    """Whether the server is expected to reject this file with a 400"""
+    extension = os.path.splitext(filename)[1].lower()
+    return extension not in ALLOWED_EXTENSIONS or size == 0 or size > MAX_UPLOAD_SIZE
+
+def check_preflight(filename, size, response):
+    """Report when the server disagrees with should_reject for a file"""
+    if should_reject(filename, size) != (response.status_code == 400):
+        emit(f"❌ Client preflight and server disagree on {filename} "
+             f"({size} bytes, status {response.status_code})")
+
+def scale_content(content, repeat):
+    """Repeat a newline-delimited file content `repeat` times (one buffer join)"""
+    return b"\n".join([content] * repeat)
+
+def test_upload_json(content=JSON_CONTENT):
+    """Test uploading a JSON file"""
+    emit("\n=== Test 1: Upload JSON file ===")
+    
+    try:
+        response = post_file('test_logs.json', BytesIO(content), 'application/json')
+        emit(f"Status Code: {response.status_code}")
+        emit(f"Response: {json.dumps(response.json(), indent=2)}")
+        
+        if response.status_code == 201:
+            emit("✅ JSON upload successful!")
+            data = response.json()['data']
+            emit(f"   - File ID: {data['file_id']}")
+            emit(f"   - Job ID: {data['job_id']}")
+            emit(f"   - Preview lines: {data['preview_lines']}")
+            emit(f"   - Total lines: {data['total_lines']}")
+        else:
+            emit("❌ JSON upload failed!")
+            
+    except Exception as e:
+        emit(f"❌ Error: {str(e)}")
+
+def test_upload_csv(content=CSV_CONTENT):
+    """Test uploading a CSV file"""
+    emit("\n=== Test 2: Upload CSV file ===")
+    
+    try:
+        response = post_file('test_logs.csv', BytesIO(content), 'text/csv')
+        emit(f"Status Code: {response.status_code}")
+        emit(f"Response: {json.dumps(response.json(), indent=2)}")
         
         if response.status_code == 201:
-            print("✅ CSV upload successful!")
+            emit("✅ CSV upload successful!")
             data = response.json()['data']
-            print(f"   - File ID: {data['file_id']}")
-            print(f"   - Job ID: {data['job_id']}")
-            print(f"   - Preview lines: {data['preview_lines']}")
-            print(f"   - Total lines: {data['total_lines']}")
+            emit(f"   - File ID: {data['file_id']}")
+            emit(f"   - Job ID: {data['job_id']}")
+            emit(f"   - Preview lines: {data['preview_lines']}")
+            emit(f"   - Total lines: {data['total_lines']}")
+        else:
+            emit("❌ CSV upload failed!")
+            
+    except Exception as e:
+        emit(f"❌ Error: {str(e)}")
+
+def test_upload_batch(json_content=JSON_CONTENT, csv_content=CSV_CONTENT):
+    """Test uploading the JSON and CSV files in a single request"""
+    emit("\n=== Test 1+2: Upload JSON and CSV files in one request ===")
+    
+    try:
+        response = post_files([
+            ('test_logs.json', BytesIO(json_content), 'application/json'),
+            ('test_logs.csv', BytesIO(csv_content), 'text/csv')
+        ])
+        emit(f"Status Code: {response.status_code}")
+        emit(f"Response: {json.dumps(response.json(), indent=2)}")
+        
+        if response.status_code == 201:
+            files = response.json()['data']['files']
+            if len(files) == 2 and all(f.get('file_id') and f.get('job_id') for f in files):
+                emit("✅ Batch upload successful!")
+            else:
+                emit("❌ Batch upload did not return a file_id/job_id per file!")
+            for data in files:
+                emit(f"   - {data.get('filename')}: file {data.get('file_id')}, job {data.get('job_id')}")
         else:
-            print("❌ CSV upload failed!")
+            emit("❌ Batch upload failed!")
             
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        emit(f"❌ Error: {str(e)}")
 
-def test_upload_invalid_extension():
+def test_upload_invalid_extension(fast=False):
     """Test uploading a file with invalid extension"""
-    print("\n=== Test 3: Upload file with invalid extension (.txt) ===")
+    emit("\n=== Test 3: Upload file with invalid extension (.txt) ===")
     
-    # Create file with .txt extension
-    files = {
-        'file': ('test_logs.txt', BytesIO(b'some log data'), 'text/plain')
-    }
+    filename, content = 'test_logs.txt', b'some log data'
+    if fast and should_reject(filename, len(content)):
+        emit("⏭️  Would-be 400 (skipped in --fast mode)")
+        return
     
+    # Create file with .txt extension
     try:
-        response = requests.post(UPLOAD_ENDPOINT, files=files, timeout=10)
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        response = post_file(filename, BytesIO(content), 'text/plain')
+        emit(f"Status Code: {response.status_code}")
+        check_preflight(filename, len(content), response)
+        emit(f"Response: {json.dumps(response.json(), indent=2)}")
         
         if response.status_code == 400:
-            print("✅ Invalid extension correctly rejected!")
+            emit("✅ Invalid extension correctly rejected!")
         else:
-            print("❌ Should have rejected .txt extension!")
+            emit("❌ Should have rejected .txt extension!")
             
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        emit(f"❌ Error: {str(e)}")
 
-def test_upload_empty_file():
+def test_upload_empty_file(fast=False):
     """Test uploading an empty file"""
-    print("\n=== Test 4: Upload empty file ===")
+    emit("\n=== Test 4: Upload empty file ===")
     
-    files = {
-        'file': ('empty.json', BytesIO(b''), 'application/json')
-    }
+    filename, content = 'empty.json', b''
+    if fast and should_reject(filename, len(content)):
+        emit("⏭️  Would-be 400 (skipped in --fast mode)")
+        return
     
     try:
-        response = requests.post(UPLOAD_ENDPOINT, files=files, timeout=10)
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        response = post_file(filename, BytesIO(content), 'application/json')
+        emit(f"Status Code: {response.status_code}")
+        check_preflight(filename, len(content), response)
+        emit(f"Response: {json.dumps(response.json(), indent=2)}")
         
         if response.status_code == 400:
-            print("✅ Empty file correctly rejected!")
+            emit("✅ Empty file correctly rejected!")
         else:
-            print("❌ Should have rejected empty file!")
+            emit("❌ Should have rejected empty file!")
             
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        emit(f"❌ Error: {str(e)}")
 
 def test_upload_no_file():
     """Test uploading without file"""
-    print("\n=== Test 5: Upload without file ===")
+    emit("\n=== Test 5: Upload without file ===")
     
     try:
-        response = requests.post(UPLOAD_ENDPOINT, timeout=10)
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        response = SESSION.post(UPLOAD_ENDPOINT, timeout=10)
+        emit(f"Status Code: {response.status_code}")
+        emit(f"Response: {json.dumps(response.json(), indent=2)}")
         
         if response.status_code == 400:
-            print("✅ No file correctly rejected!")
+            emit("✅ No file correctly rejected!")
         else:
-            print("❌ Should have rejected request without file!")
+            emit("❌ Should have rejected request without file!")
             
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        emit(f"❌ Error: {str(e)}")
 
-def main():
-    """Run all tests"""
+def main(repeat=1, fast=False):
+    """
+    Run all tests
+    
+    Args:
+        repeat: Number of copies of the sample rows in the JSON/CSV uploads
+        fast: Skip uploads the client already knows the server rejects
+    """
     print("=" * 60)
     print("Testing POST /api/logs/upload endpoint")
     print("=" * 60)
     
     # Test API availability
     try:
-        response = requests.get(BASE_URL, timeout=5)
+        response = SESSION.get(BASE_URL, timeout=5)
         print(f"✅ API is reachable at {BASE_URL}")
     except Exception as e:
         print(f"❌ Cannot reach API at {BASE_URL}")
         print(f"   Make sure Flask is running: docker-compose ps")
         return
     
-    # Run tests
-    test_upload_json()
-    test_upload_csv()
-    test_upload_invalid_extension()
-    test_upload_empty_file()
-    test_upload_no_file()
+    # Run tests: the uploads are independent, so send them concurrently
+    # and print each test's output in order once it finishes
+    # CSV copies after the first drop their header row
+    csv_header, _, csv_rows = CSV_CONTENT.partition(b"\n")
+    json_content = scale_content(JSON_CONTENT, repeat)
+    csv_content = csv_header + b"\n" + scale_content(csv_rows, repeat)
+    
+    # Both valid files go in one request when the endpoint supports it
+    if supports_multi_file():
+        upload_tests = [partial(test_upload_batch, json_content, csv_content)]
+    else:
+        upload_tests = [
+            partial(test_upload_json, json_content),
+            partial(test_upload_csv, csv_content)
+        ]
+    
+    tests = [
+        *upload_tests,
+        partial(test_upload_invalid_extension, fast=fast),
+        partial(test_upload_empty_file, fast=fast),
+        test_upload_no_file
+    ]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for _, output in executor.map(run_test, tests):
+            print(output)
     
     print("\n" + "=" * 60)
     print("Tests completed!")
     print("=" * 60)
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Upload endpoint checks')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Copies of the sample rows in the JSON/CSV uploads (default: 1)')
+    parser.add_argument('--fast', action='store_true',
+                        help='Skip invalid uploads the client can reject before sending them')
+    args = parser.parse_args()
+    
+    with SESSION:
+        main(repeat=max(1, args.repeat), fast=args.fast)
@@ -2,6 +2,8 @@
 Tests for utility functions
 """
 
+import hashlib
+import jwt
 import pytest
 from datetime import datetime, timedelta
 from io import BytesIO
@@ -33,6 +35,7 @@ from app.utils.helpers import (
     merge_dicts,
     calculate_percentage_change
 )
+from app.utils.jwt_utils import JWTManager
 
 
 class TestValidators:
@@ -65,6 +68,16 @@ class TestValidators:
         is_valid, error = validate_log_data([])
         assert is_valid is False
     
+    def test_validate_log_data_missing_fields(self, sample_log_data_mut):
+        """Test a log entry without message nor log_type is rejected"""
+        assert validate_log_data(sample_log_data_mut) == (True, None)
+        
+        del sample_log_data_mut['message']
+        del sample_log_data_mut['log_type']
+        is_valid, error = validate_log_data(sample_log_data_mut)
+        assert is_valid is False
+        assert 'message' in error
+    
     def test_validate_transaction_data(self):
         """Test transaction data validation"""
         valid_data = {
@@ -89,6 +102,15 @@ class TestValidators:
         long_text = "a" * 2000
         sanitized = sanitize_string(long_text, max_length=100)
         assert len(sanitized) == 100
+    
+    def test_validate_email_cached(self):
+        """Test repeated email validation is served from the cache"""
+        validate_email.cache_clear()
+        
+        for _ in range(10_000):
+            assert validate_email("test@example.com") is True
+        
+        assert validate_email.cache_info().hits >= 9999
 
 
 class TestFormatters:
@@ -153,7 +175,10 @@ class TestHelpers:
         
         assert hash1 == hash2
         assert hash1 != hash3
-        assert len(hash1) == 64  # SHA256 hash length
+        assert len(hash1) == 32  # 128-bit hex digest
+        
+        # Same algorithm everywhere, whatever optional packages are installed
+        assert hash1 == hashlib.blake2b(b"test", digest_size=16).hexdigest()
     
     def test_parse_time_range(self):
         """Test time range parsing"""
@@ -219,3 +244,37 @@ class TestHelpers:
         
         change = calculate_percentage_change(0, 100)
         assert change == 100.0
+
+
+@pytest.mark.usefixtures("app_ctx")
+class TestJWTManager:
+    """Test cases for JWT token generation and decoding"""
+    
+    def test_access_token_round_trip(self):
+        """Test an access token decodes back to its claims"""
+        token = JWTManager.generate_token('user-1', 'alice', 'analyst')
+        payload = JWTManager.decode_token(token)
+        
+        assert payload['user_id'] == 'user-1'
+        assert payload['username'] == 'alice'
+        assert payload['role'] == 'analyst'
+        assert payload['type'] == 'access'
+    
+    def test_refresh_token_type(self):
+        """Test refresh tokens are marked as such"""
+        token = JWTManager.generate_refresh_token('user-1', 'alice')
+        assert JWTManager.decode_token(token)['type'] == 'refresh'
+    
+    def test_expired_token_rejected(self):
+        """Test an expired token raises on decode"""
+        token = JWTManager.generate_token('user-1', 'alice', 'viewer', expires_in=-1)
+        
+        with pytest.raises(jwt.ExpiredSignatureError):
+            JWTManager.decode_token(token)
+    
+    def test_tampered_token_rejected(self):
+        """Test a token with a modified signature raises on decode"""
+        token = JWTManager.generate_token('user-1', 'alice', 'viewer')
+        
+        with pytest.raises(jwt.InvalidTokenError):
+            JWTManager.decode_token(token[:-2] + ('A' if token[-2] != 'A' else 'B') + token[-1])
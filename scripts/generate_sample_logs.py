@@ -3,160 +3,416 @@
 Script to generate sample logs for testing
 """
 
-import json
-import random
+import gzip
+import itertools
+import multiprocessing
+import os
+import shutil
 import sys
-from datetime import datetime, timedelta
+from collections import Counter
 from pathlib import Path
 
+import numpy as np
+import orjson
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
 
+# Log types in the order used by the type codes drawn below
+LOG_TYPES = ('transaction', 'error', 'user_behavior', 'performance', 'fraud')
+
+# Share of each log type, aligned with LOG_TYPES
+LOG_TYPE_WEIGHTS = (0.4, 0.15, 0.25, 0.15, 0.05)
+
+# Logs generated and written per batch (bounds memory use)
+BATCH_SIZE = 10_000
+
+# Compression level for .gz output (6 trades little size for much less CPU than 9)
+GZIP_COMPRESS_LEVEL = 6
+
+# Buffer used when concatenating the shard files
+COPY_BUFFER_SIZE = 1 << 20
+
+# Window the generated timestamps are spread over
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+FRAUD_INDICATORS = (
+    'high_amount',
+    'rapid_transactions',
+    'suspicious_location',
+    'ip_mismatch',
+    'multiple_failed_attempts'
+)
+
+# Most indicators attached to one fraud log
+MAX_FRAUD_INDICATORS = 3
+
+# Every subset of 1 to MAX_FRAUD_INDICATORS indicators encoded as a bit mask
+# (bit i set means FRAUD_INDICATORS[i] is present), with the indicators it
+# decodes to
+FRAUD_INDICATOR_MASKS = np.array(
+    [m for m in range(1, 1 << len(FRAUD_INDICATORS)) if m.bit_count() <= MAX_FRAUD_INDICATORS],
+    dtype=np.uint8
+)
+FRAUD_INDICATOR_SETS = {
+    m: tuple(ind for i, ind in enumerate(FRAUD_INDICATORS) if m >> i & 1)
+    for m in FRAUD_INDICATOR_MASKS.tolist()
+}
+
+# Pick the subset size uniformly, then a subset of that size uniformly
+_MASK_SIZES = np.array([m.bit_count() for m in FRAUD_INDICATOR_MASKS.tolist()])
+_SUBSETS_PER_SIZE = np.bincount(_MASK_SIZES)
+FRAUD_INDICATOR_MASK_WEIGHTS = 1 / (MAX_FRAUD_INDICATORS * _SUBSETS_PER_SIZE[_MASK_SIZES])
+
 
-def generate_transaction_log():
-    """Generate a sample transaction log"""
-    transaction_types = ['purchase', 'refund', 'subscription']
-    payment_methods = ['credit_card', 'debit_card', 'paypal', 'apple_pay']
-    statuses = ['completed', 'pending', 'failed', 'declined']
-    currencies = ['USD', 'EUR', 'GBP']
-    
-    return {
-        '@timestamp': datetime.utcnow().isoformat(),
-        'log_type': 'transaction',
-        'transaction_id': f"TXN{random.randint(10000, 99999)}",
-        'user_id': f"USER{random.randint(1000, 9999)}",
-        'amount': round(random.uniform(10, 5000), 2),
-        'currency': random.choice(currencies),
-        'payment_method': random.choice(payment_methods),
-        'status': random.choice(statuses),
-        'transaction_type': random.choice(transaction_types),
-        'merchant_id': f"MERCHANT{random.randint(100, 999)}"
-    }
-
-
-def generate_error_log():
-    """Generate a sample error log"""
-    error_codes = [400, 404, 500, 502, 503]
-    error_types = ['ValidationError', 'DatabaseError', 'NetworkError', 'AuthenticationError']
-    
-    return {
-        '@timestamp': datetime.utcnow().isoformat(),
-        'log_type': 'error',
-        'error_code': random.choice(error_codes),
-        'error_type': random.choice(error_types),
-        'error_message': 'An error occurred during processing',
-        'endpoint': f"/api/{random.choice(['users', 'transactions', 'products'])}",
-        'user_id': f"USER{random.randint(1000, 9999)}",
-        'stack_trace': 'Error stack trace here...'
-    }
-
-
-def generate_user_behavior_log():
-    """Generate a sample user behavior log"""
-    actions = ['page_view', 'add_to_cart', 'remove_from_cart', 'checkout', 'cart_abandoned']
-    pages = ['/home', '/products', '/cart', '/checkout', '/profile']
-    
-    return {
-        '@timestamp': datetime.utcnow().isoformat(),
-        'log_type': 'user_behavior',
-        'user_id': f"USER{random.randint(1000, 9999)}",
-        'action': random.choice(actions),
-        'page': random.choice(pages),
-        'session_id': f"SESSION{random.randint(100000, 999999)}",
-        'duration_ms': random.randint(100, 30000),
-        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-
-
-def generate_performance_log():
-    """Generate a sample performance log"""
-    endpoints = ['/api/users', '/api/products', '/api/transactions', '/api/search']
-    methods = ['GET', 'POST', 'PUT', 'DELETE']
-    
-    return {
-        '@timestamp': datetime.utcnow().isoformat(),
-        'log_type': 'performance',
-        'endpoint': random.choice(endpoints),
-        'method': random.choice(methods),
-        'response_time': round(random.uniform(10, 2000), 2),
-        'status_code': random.choice([200, 201, 400, 404, 500]),
-        'db_query_time': round(random.uniform(5, 500), 2),
-        'cache_hit': random.choice([True, False])
-    }
-
-
-def generate_fraud_log():
-    """Generate a sample fraud detection log"""
-    indicators = [
-        'high_amount',
-        'rapid_transactions',
-        'suspicious_location',
-        'ip_mismatch',
-        'multiple_failed_attempts'
+# Every combination of the categorical fields of a log type. Drawing one
+# combination uniformly is the same as drawing each field independently,
+# with a single random draw per log instead of one per field.
+TRANSACTION_CHOICES = tuple(itertools.product(
+    ('USD', 'EUR', 'GBP'),                                  # currency
+    ('credit_card', 'debit_card', 'paypal', 'apple_pay'),   # payment_method
+    ('completed', 'pending', 'failed', 'declined'),         # status
+    ('purchase', 'refund', 'subscription')                  # transaction_type
+))
+ERROR_CHOICES = tuple(itertools.product(
+    (400, 404, 500, 502, 503),                                                    # error_code
+    ('ValidationError', 'DatabaseError', 'NetworkError', 'AuthenticationError'),  # error_type
+    ('users', 'transactions', 'products')                                         # endpoint resource
+))
+USER_BEHAVIOR_CHOICES = tuple(itertools.product(
+    ('page_view', 'add_to_cart', 'remove_from_cart', 'checkout', 'cart_abandoned'),  # action
+    ('/home', '/products', '/cart', '/checkout', '/profile')                        # page
+))
+PERFORMANCE_CHOICES = tuple(itertools.product(
+    ('/api/users', '/api/products', '/api/transactions', '/api/search'),  # endpoint
+    ('GET', 'POST', 'PUT', 'DELETE'),                                    # method
+    (200, 201, 400, 404, 500),                                           # status_code
+    (True, False)                                                        # cache_hit
+))
+
+
+def pick(rng, options, size):
+    """
+    Draw `size` values uniformly from a sequence of options
+    
+    Args:
+        rng: numpy random Generator
+        options: Sequence of values to choose from
+        size: Number of values to draw
+    
+    Returns:
+        list: Plain Python values (serializable by orjson)
+    """
+    return [options[i] for i in rng.integers(0, len(options), size=size).tolist()]
+
+
+def draw_decimal(rng, low, high, size):
+    """
+    Draw values with 2 decimals uniformly in [low, high]
+    
+    Values are drawn as integer hundredths and divided once, instead of
+    rounding uniform floats.
+    
+    Args:
+        rng: numpy random Generator
+        low: Smallest value
+        high: Largest value
+        size: Number of values to draw
+    
+    Returns:
+        numpy.ndarray: float64 values with at most 2 decimals
+    """
+    return rng.integers(round(low * 100), round(high * 100) + 1, size=size) / 100
+
+
+def generate_transaction_logs(rng, count, timestamps, txn_ids, user_ids, amounts):
+    """Generate `count` sample transaction logs from pre-drawn ids and amounts"""
+    columns = zip(
+        timestamps, txn_ids, user_ids, amounts,
+        pick(rng, TRANSACTION_CHOICES, count),
+        rng.integers(100, 1000, size=count).tolist()
+    )
+    
+    return [
+        {
+            '@timestamp': timestamp,
+            'log_type': 'transaction',
+            'transaction_id': f"TXN{txn_id}",
+            'user_id': f"USER{user_id}",
+            'amount': amount,
+            'currency': currency,
+            'payment_method': payment_method,
+            'status': status,
+            'transaction_type': transaction_type,
+            'merchant_id': f"MERCHANT{merchant_id}"
+        }
+        for timestamp, txn_id, user_id, amount, (currency, payment_method, status, transaction_type), merchant_id
+        in columns
+    ]
+
+
+def generate_error_logs(rng, count, timestamps, user_ids):
+    """Generate `count` sample error logs from pre-drawn user ids"""
+    columns = zip(timestamps, user_ids, pick(rng, ERROR_CHOICES, count))
+    
+    return [
+        {
+            '@timestamp': timestamp,
+            'log_type': 'error',
+            'error_code': error_code,
+            'error_type': error_type,
+            'error_message': 'An error occurred during processing',
+            'endpoint': f"/api/{resource}",
+            'user_id': f"USER{user_id}",
+            'stack_trace': 'Error stack trace here...'
+        }
+        for timestamp, user_id, (error_code, error_type, resource) in columns
+    ]
+
+
+def generate_user_behavior_logs(rng, count, timestamps, user_ids):
+    """Generate `count` sample user behavior logs from pre-drawn user ids"""
+    columns = zip(
+        timestamps, user_ids,
+        pick(rng, USER_BEHAVIOR_CHOICES, count),
+        rng.integers(100000, 1000000, size=count).tolist(),
+        rng.integers(100, 30001, size=count).tolist()
+    )
+    
+    return [
+        {
+            '@timestamp': timestamp,
+            'log_type': 'user_behavior',
+            'user_id': f"USER{user_id}",
+            'action': action,
+            'page': page,
+            'session_id': f"SESSION{session_id}",
+            'duration_ms': duration_ms,
+            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        for timestamp, user_id, (action, page), session_id, duration_ms in columns
     ]
+
+
+def generate_performance_logs(rng, count, timestamps):
+    """Generate `count` sample performance logs"""
+    columns = zip(
+        timestamps,
+        pick(rng, PERFORMANCE_CHOICES, count),
+        draw_decimal(rng, 10, 2000, count).tolist(),
+        draw_decimal(rng, 5, 500, count).tolist()
+    )
     
-    return {
-        '@timestamp': datetime.utcnow().isoformat(),
-        'log_type': 'fraud',
-        'transaction_id': f"TXN{random.randint(10000, 99999)}",
-        'user_id': f"USER{random.randint(1000, 9999)}",
-        'fraud_score': random.randint(50, 100),
-        'fraud_detected': random.choice([True, False]),
-        'fraud_indicators': random.sample(indicators, random.randint(1, 3)),
-        'amount': round(random.uniform(1000, 20000), 2),
-        'location': random.choice(['US', 'UK', 'XX', 'YY'])
-    }
+    return [
+        {
+            '@timestamp': timestamp,
+            'log_type': 'performance',
+            'endpoint': endpoint,
+            'method': method,
+            'response_time': response_time,
+            'status_code': status_code,
+            'db_query_time': db_query_time,
+            'cache_hit': cache_hit
+        }
+        for timestamp, (endpoint, method, status_code, cache_hit), response_time, db_query_time in columns
+    ]
 
 
-def generate_logs(num_logs=1000, output_file='sample_logs.json'):
+def generate_fraud_logs(rng, count, timestamps, txn_ids, user_ids):
+    """Generate `count` sample fraud detection logs from pre-drawn ids"""
+    locations = ('US', 'UK', 'XX', 'YY')
+    
+    # 1 to 3 distinct indicators per log, drawn as bit masks in one call
+    masks = rng.choice(FRAUD_INDICATOR_MASKS, size=count, p=FRAUD_INDICATOR_MASK_WEIGHTS)
+    indicators = [FRAUD_INDICATOR_SETS[m] for m in masks.tolist()]
+    
+    columns = zip(
+        timestamps, txn_ids, user_ids,
+        rng.integers(50, 101, size=count).tolist(),
+        (rng.random(count) < 0.5).tolist(),
+        indicators,
+        draw_decimal(rng, 1000, 20000, count).tolist(),
+        pick(rng, locations, count)
+    )
+    
+    return [
+        {
+            '@timestamp': timestamp,
+            'log_type': 'fraud',
+            'transaction_id': f"TXN{txn_id}",
+            'user_id': f"USER{user_id}",
+            'fraud_score': fraud_score,
+            'fraud_detected': fraud_detected,
+            'fraud_indicators': fraud_indicators,
+            'amount': amount,
+            'location': location
+        }
+        for timestamp, txn_id, user_id, fraud_score, fraud_detected, fraud_indicators, amount, location in columns
+    ]
+
+
+def generate_batch(rng, size, now):
     """
-    Generate sample logs
+    Generate one batch of sample logs
+    
+    All random fields (timestamps included) are drawn in bulk with numpy,
+    then each log type is assembled from its slice of the arrays.
     
     Args:
-        num_logs: Number of logs to generate
-        output_file: Output file path
+        rng: numpy random Generator
+        size: Number of logs in the batch
+        now: datetime64 the timestamps are counted back from
+    
+    Returns:
+        tuple: (list of log dicts in drawn order, array of log type codes)
     """
-    log_generators = [
-        (generate_transaction_log, 0.4),  # 40% transactions
-        (generate_error_log, 0.15),       # 15% errors
-        (generate_user_behavior_log, 0.25),  # 25% user behavior
-        (generate_performance_log, 0.15),  # 15% performance
-        (generate_fraud_log, 0.05)        # 5% fraud
+    # Select log types based on distribution
+    types = rng.choice(len(LOG_TYPES), size=size, p=LOG_TYPE_WEIGHTS)
+    
+    # Fields shared by several log types, drawn once for all rows
+    txn_ids = rng.integers(10000, 100000, size=size)
+    user_ids = rng.integers(1000, 10000, size=size)
+    amounts = draw_decimal(rng, 10, 5000, size)
+    
+    # Timestamps spread over the last 24 hours, formatted in one numpy call
+    offsets = rng.integers(0, MICROSECONDS_PER_DAY, size=size).astype('timedelta64[us]')
+    stamps = (now - offsets).astype(str)
+    
+    txn_idx, error_idx, behavior_idx, perf_idx, fraud_idx = (
+        np.flatnonzero(types == code) for code in range(len(LOG_TYPES))
+    )
+    
+    batches = [
+        (txn_idx, generate_transaction_logs(
+            rng, len(txn_idx), stamps[txn_idx].tolist(),
+            txn_ids[txn_idx].tolist(), user_ids[txn_idx].tolist(), amounts[txn_idx].tolist()
+        )),
+        (error_idx, generate_error_logs(
+            rng, len(error_idx), stamps[error_idx].tolist(), user_ids[error_idx].tolist()
+        )),
+        (behavior_idx, generate_user_behavior_logs(
+            rng, len(behavior_idx), stamps[behavior_idx].tolist(), user_ids[behavior_idx].tolist()
+        )),
+        (perf_idx, generate_performance_logs(
+            rng, len(perf_idx), stamps[perf_idx].tolist()
+        )),
+        (fraud_idx, generate_fraud_logs(
+            rng, len(fraud_idx), stamps[fraud_idx].tolist(),
+            txn_ids[fraud_idx].tolist(), user_ids[fraud_idx].tolist()
+        ))
     ]
     
-    logs = []
+    # Put every log back at its drawn position so types stay interleaved
+    logs = [None] * size
+    for indices, batch in batches:
+        for i, log in zip(indices.tolist(), batch):
+            logs[i] = log
     
-    for i in range(num_logs):
-        # Select log type based on distribution
-        rand = random.random()
-        cumulative = 0
-        
-        for generator, weight in log_generators:
-            cumulative += weight
-            if rand <= cumulative:
-                logs.append(generator())
-                break
-        
-        # Progress indicator
-        if (i + 1) % 100 == 0:
-            print(f"Generated {i + 1}/{num_logs} logs...")
+    return logs, types
+
+
+def open_output(path):
+    """Open an output file for writing, gzip-compressed when it ends in .gz"""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'wb', compresslevel=GZIP_COMPRESS_LEVEL)
+    return open(path, 'wb')
+
+
+def write_shard(shard):
+    """
+    Generate one shard of sample logs into its own file
+    
+    Runs in a worker process; logs are generated and written one batch at
+    a time, so memory use is bounded by the batch size. The shard is
+    gzip-compressed when its path ends in .gz.
+    
+    Args:
+        shard: (shard index, SeedSequence, number of logs, output path,
+            batch size, datetime64 the timestamps are counted back from)
+    
+    Returns:
+        Counter: Number of logs written per log type
+    """
+    index, seed_seq, num_logs, path, batch_size, now = shard
+    rng = np.random.default_rng(seed_seq)
+    counter = Counter()
+    
+    with open_output(path) as f:
+        for start in range(0, num_logs, batch_size):
+            size = min(batch_size, num_logs - start)
+            logs, types = generate_batch(rng, size, now)
+            
+            f.writelines(orjson.dumps(log, option=orjson.OPT_APPEND_NEWLINE) for log in logs)
+            counter.update(dict(zip(LOG_TYPES, np.bincount(types, minlength=len(LOG_TYPES)).tolist())))
+            
+            # Progress indicator
+            print(f"Shard {index}: generated {start + size}/{num_logs} logs...")
+    
+    return counter
+
+
+def generate_logs(num_logs=1000, output_file='sample_logs.json', seed=None, batch_size=BATCH_SIZE,
+                  workers=None):
+    """
+    Generate sample logs
+    
+    The logs are split into one shard per worker process, each written to
+    a part file with its own independent random stream, then the parts are
+    concatenated into the output file.
+    
+    Args:
+        num_logs: Number of logs to generate
+        output_file: Output file path (gzip-compressed NDJSON if it ends in .gz)
+        seed: Optional seed for reproducible output (for a given worker count)
+        batch_size: Number of logs generated and written per batch
+        workers: Number of worker processes (default: CPU count)
+    """
+    # No more shards than batches: tiny runs stay in a single process
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, -(-num_logs // batch_size)))
+    
+    now = np.datetime64('now', 'us')
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    per_shard, extra = divmod(num_logs, workers)
+    sizes = [per_shard + (1 if i < extra else 0) for i in range(workers)]
     
-    # Write to file
     output_path = Path(__file__).parent / output_file
-    with open(output_path, 'w') as f:
-        for log in logs:
-            f.write(json.dumps(log) + '\n')
+    counter = Counter()
     
-    print(f"\nGenerated {num_logs} logs to {output_path}")
+    if workers == 1:
+        counter.update(write_shard((0, seeds[0], num_logs, output_path, batch_size, now)))
+    else:
+        # Part files keep the output suffix: each .gz part is a complete gzip
+        # member, and concatenated members form a valid gzip file
+        parts = [
+            output_path.with_name(f"{output_path.stem}.part{i}{output_path.suffix}")
+            for i in range(workers)
+        ]
+        shards = [
+            (i, seeds[i], sizes[i], parts[i], batch_size, now)
+            for i in range(workers)
+        ]
+        
+        try:
+            with multiprocessing.Pool(workers) as pool:
+                for shard_counter in pool.map(write_shard, shards):
+                    counter.update(shard_counter)
+            
+            with open(output_path, 'wb') as out:
+                for part in parts:
+                    with open(part, 'rb') as f:
+                        shutil.copyfileobj(f, out, COPY_BUFFER_SIZE)
+        finally:
+            for part in parts:
+                part.unlink(missing_ok=True)
     
-    # Print summary
-    log_types = {}
-    for log in logs:
-        log_type = log.get('log_type', 'unknown')
-        log_types[log_type] = log_types.get(log_type, 0) + 1
+    print(f"\nGenerated {num_logs} logs to {output_path} ({workers} worker(s))")
     
+    # Print summary
     print("\nLog type distribution:")
-    for log_type, count in sorted(log_types.items()):
+    for log_type, count in sorted(counter.items()):
+        if count == 0:
+            continue
         percentage = (count / num_logs) * 100
         print(f"  {log_type}: {count} ({percentage:.1f}%)")
 
@@ -168,8 +424,16 @@ if __name__ == '__main__':
     parser.add_argument('-n', '--num-logs', type=int, default=1000,
                         help='Number of logs to generate (default: 1000)')
     parser.add_argument('-o', '--output', type=str, default='sample_logs.json',
-                        help='Output file name (default: sample_logs.json)')
+                        help='Output file name, gzip-compressed if it ends in .gz '
+                             '(default: sample_logs.json)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed for reproducible output (default: none)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f'Logs generated per batch (default: {BATCH_SIZE})')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
     
     args = parser.parse_args()
     
-    generate_logs(num_logs=args.num_logs, output_file=args.output)
+    generate_logs(num_logs=args.num_logs, output_file=args.output, seed=args.seed,
+                  batch_size=args.batch_size, workers=args.workers)
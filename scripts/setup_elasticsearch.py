@@ -1,8 +1,20 @@
 #!/usr/bin/env python3
 """
 Script to initialize Elasticsearch indices and Kibana dashboards
+
+For a large initial load, install the template in bulk-load mode, ingest,
+then finalize the indices:
+
+    python setup_elasticsearch.py --bulk-load
+    (bulk ingest)
+    python setup_elasticsearch.py --finalize
+
+Bulk-load mode creates indices without refreshes or replicas and with an
+async translog. --finalize restores the steady settings on the template
+and on the loaded indices, then force-merges them to one segment.
 """
 
+import argparse
 import sys
 import time
 from pathlib import Path
@@ -10,38 +22,36 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
 
+from elasticsearch import exceptions as es_exceptions
+
 from app.services.elasticsearch_service import ElasticsearchService
 
+# Server-side wait for a yellow cluster, per health request (seconds)
+HEALTH_TIMEOUT = 30
 
-def create_indices(es_service):
-    """Create Elasticsearch indices with mappings"""
-    
-    # Logs index mapping
-    logs_mapping = {
+# Total time spent retrying pings while Elasticsearch is unreachable (seconds)
+MAX_WAIT = 30
+
+# Ping backoff: first delay, doubled after each attempt up to the cap (seconds)
+BACKOFF_INITIAL = 0.1
+BACKOFF_MAX = 5
+
+
+# Keyword field with the ".keyword" subfield the app queries and aggregates
+# on, as dynamic mapping used to create it
+KEYWORD = {"type": "keyword", "fields": {"keyword": {"type": "keyword"}}}
+
+# Full-text field with a ".keyword" subfield, as dynamically mapped strings
+TEXT = {
+    "type": "text",
+    "fields": {"keyword": {"type": "keyword", "ignore_above": 256}}
+}
+
+
+# Field groups shared by several log types, pushed as component templates
+COMPONENT_TEMPLATES = {
+    "geoip-mapping": {
         "properties": {
-            "@timestamp": {"type": "date"},
-            "log_type": {"type": "keyword"},
-            "level": {"type": "keyword"},
-            "message": {"type": "text"},
-            "user_id": {"type": "keyword"},
-            "transaction_id": {"type": "keyword"},
-            "amount": {"type": "float"},
-            "currency": {"type": "keyword"},
-            "payment_method": {"type": "keyword"},
-            "status": {"type": "keyword"},
-            "error_code": {"type": "integer"},
-            "error_type": {"type": "keyword"},
-            "error_message": {"type": "text"},
-            "endpoint": {"type": "keyword"},
-            "method": {"type": "keyword"},
-            "response_time": {"type": "float"},
-            "db_query_time": {"type": "float"},
-            "fraud_score": {"type": "integer"},
-            "fraud_detected": {"type": "boolean"},
-            "fraud_indicators": {"type": "keyword"},
-            "action": {"type": "keyword"},
-            "page": {"type": "keyword"},
-            "session_id": {"type": "keyword"},
             "geoip": {
                 "properties": {
                     "location": {"type": "geo_point"},
@@ -50,17 +60,234 @@ def create_indices(es_service):
                 }
             }
         }
+    },
+    "transaction-mapping": {
+        "properties": {
+            "transaction_id": {"type": "keyword"},
+            "amount": {"type": "float"},
+            "currency": {"type": "keyword"},
+            "payment_method": KEYWORD,
+            "status": KEYWORD
+        }
+    },
+    "error-mapping": {
+        "properties": {
+            "error_code": {"type": "integer"},
+            "error_type": KEYWORD,
+            "error_message": {"type": "text"}
+        }
+    }
+}
+
+# Above the built-in "logs-*-*" template (100), which would otherwise turn
+# a "logs-ecom-*" prefix into data streams
+INDEX_TEMPLATE_PRIORITY = 200
+
+# Dead-letter indices hold documents that failed parsing: they get their own,
+# untyped template so that the typed mapping does not reject them too
+DEAD_LETTER_SUFFIX = "errors"
+
+
+# Fields not covered by a component template
+LOGS_MAPPING = {
+    "properties": {
+        "@timestamp": {"type": "date"},
+        "log_type": KEYWORD,
+        "level": KEYWORD,
+        "message": TEXT,
+        "user_id": KEYWORD,
+        "endpoint": KEYWORD,
+        "method": {"type": "keyword"},
+        "response_time": {"type": "float"},
+        "db_query_time": {"type": "float"},
+        "fraud_score": {"type": "integer"},
+        "fraud_detected": {"type": "boolean"},
+        "fraud_indicators": KEYWORD,
+        "action": KEYWORD,
+        "page": KEYWORD,
+        "session_id": {"type": "keyword"}
     }
+}
+
+# Steady-state settings of every log index (1s refresh: new logs must show up
+# on the monitoring dashboards right away)
+LOGS_SETTINGS = {
+    "number_of_shards": 1,
+    "number_of_replicas": 1,
+    "refresh_interval": "1s",
+    "codec": "best_compression"
+}
+
+# Settings while the initial bulk load runs (restored by finalize_indices)
+BULK_LOAD_SETTINGS = {
+    **LOGS_SETTINGS,
+    "number_of_replicas": 0,
+    "refresh_interval": "-1",
+    "translog.durability": "async",
+    "translog.sync_interval": "30s"
+}
+
+# Dynamic settings put back on the indices created in bulk-load mode
+FINALIZE_SETTINGS = {
+    "number_of_replicas": LOGS_SETTINGS["number_of_replicas"],
+    "refresh_interval": LOGS_SETTINGS["refresh_interval"],
+    "translog.durability": "request"
+}
+
+
+def put_logs_template(es_service, settings):
+    """
+    Install the component templates and the logs index templates
+    
+    Only the highest-priority matching template applies, so the dead-letter
+    template takes the "<prefix>-errors-*" indices out of the typed one.
+    
+    Args:
+        es_service: ElasticsearchService instance
+        settings: Index settings applied to newly created log indices
+    """
+    for name, mappings in COMPONENT_TEMPLATES.items():
+        print(f"Creating component template {name}...")
+        es_service.client.cluster.put_component_template(
+            name=name,
+            template={"mappings": mappings}
+        )
+    
+    index_pattern = f"{es_service.index_prefix}-*"
+    print(f"Creating index template for {index_pattern}...")
+    es_service.client.indices.put_index_template(
+        name=es_service.index_prefix,
+        index_patterns=[index_pattern],
+        priority=INDEX_TEMPLATE_PRIORITY,
+        composed_of=list(COMPONENT_TEMPLATES),
+        template={
+            "settings": settings,
+            "mappings": LOGS_MAPPING
+        }
+    )
     
-    print("Creating logs index...")
-    if es_service.create_index('logs', logs_mapping):
-        print("✓ Logs index created successfully")
-    else:
-        print("✗ Failed to create logs index")
+    dead_letter_pattern = f"{es_service.index_prefix}-{DEAD_LETTER_SUFFIX}-*"
+    print(f"Creating index template for {dead_letter_pattern}...")
+    es_service.client.indices.put_index_template(
+        name=f"{es_service.index_prefix}-{DEAD_LETTER_SUFFIX}",
+        index_patterns=[dead_letter_pattern],
+        priority=INDEX_TEMPLATE_PRIORITY + 1,
+        template={"settings": settings}
+    )
+
+
+def create_indices(es_service, bulk_load=False):
+    """
+    Install the index template every log index is created from
+    
+    Indices are no longer created one by one: Elasticsearch applies the
+    template when Logstash or the API first writes to a matching index.
+    
+    Args:
+        es_service: ElasticsearchService instance
+        bulk_load: Create indices with BULK_LOAD_SETTINGS until
+            finalize_indices runs
+    """
+    settings = BULK_LOAD_SETTINGS if bulk_load else LOGS_SETTINGS
+    
+    try:
+        put_logs_template(es_service, settings)
+        print("✓ Logs index template created successfully")
+        
+    except Exception as e:
+        print(f"✗ Failed to create logs index template: {str(e)}")
+
+
+def finalize_indices(es_service):
+    """
+    Restore steady-state settings after a bulk load
+    
+    Puts the template back to LOGS_SETTINGS, re-enables refreshes, replicas
+    and per-request translog syncs on the loaded indices, then merges each
+    shard down to a single segment.
+    
+    Args:
+        es_service: ElasticsearchService instance
+    
+    Returns:
+        bool: Success status
+    """
+    index_pattern = f"{es_service.index_prefix}-*"
+    
+    try:
+        put_logs_template(es_service, LOGS_SETTINGS)
+        
+        print(f"Restoring settings on {index_pattern}...")
+        es_service.client.indices.put_settings(
+            index=index_pattern,
+            settings={"index": FINALIZE_SETTINGS}
+        )
+        
+        print(f"Force-merging {index_pattern}...")
+        es_service.client.options(request_timeout=None).indices.forcemerge(
+            index=index_pattern,
+            max_num_segments=1
+        )
+        print("✓ Logs indices finalized successfully")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Failed to finalize logs indices: {str(e)}")
+        return False
+
+
+def wait_for_elasticsearch(es_service):
+    """
+    Wait until the cluster is at least yellow
+    
+    A single cluster health request long-polls server-side. While the node
+    does not accept connections yet, pings are retried with exponential
+    backoff before asking for the health again.
+    
+    Args:
+        es_service: ElasticsearchService instance
+    
+    Returns:
+        bool: True once the cluster is ready
+    """
+    client = es_service.client.options(request_timeout=HEALTH_TIMEOUT + 5)
+    deadline = time.monotonic() + MAX_WAIT
+    delay = BACKOFF_INITIAL
+    
+    while True:
+        try:
+            health = client.cluster.health(
+                wait_for_status='yellow',
+                timeout=f"{HEALTH_TIMEOUT}s"
+            )
+            return not health.get('timed_out', False)
+        except es_exceptions.ConnectionError:
+            pass
+        
+        while True:
+            if time.monotonic() >= deadline:
+                return False
+            
+            time.sleep(delay)
+            delay = min(delay * 2, BACKOFF_MAX)
+            
+            try:
+                if es_service.client.ping():
+                    break
+            except Exception:
+                pass
 
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description='Initialize Elasticsearch indices')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--bulk-load', action='store_true',
+                      help='Create indices without refreshes or replicas for an initial load')
+    mode.add_argument('--finalize', action='store_true',
+                      help='Restore index settings and force-merge after a bulk load')
+    args = parser.parse_args()
+    
     # Configuration
     config = {
         'host': 'localhost',
@@ -77,27 +304,17 @@ def main():
         
         # Wait for Elasticsearch to be ready
         print("Waiting for Elasticsearch to be ready...")
-        max_retries = 30
-        retry_count = 0
-        
-        while retry_count < max_retries:
-            try:
-                if es_service.client.ping():
-                    print("✓ Elasticsearch is ready")
-                    break
-            except Exception:
-                pass
-            
-            retry_count += 1
-            time.sleep(2)
-            print(f"Retry {retry_count}/{max_retries}...")
-        
-        if retry_count >= max_retries:
+        if not wait_for_elasticsearch(es_service):
             print("✗ Elasticsearch is not responding")
             return 1
         
+        print("✓ Elasticsearch is ready")
+        
+        if args.finalize:
+            return 0 if finalize_indices(es_service) else 1
+        
         # Create indices
-        create_indices(es_service)
+        create_indices(es_service, bulk_load=args.bulk_load)
         
         print("\n✓ Elasticsearch setup completed successfully!")
         return 0